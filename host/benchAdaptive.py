@@ -0,0 +1,110 @@
+"""
+Module      benchAdaptive.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Runs the AdaptiveScheduler on the simulated hardware (see sim) for
+            some hours of simulated time and compares it with the fixed cycle of
+            15 s, which main.py used before. The temperature is stable with some
+            noise, rises by 3 °C within 10 minutes after the first hour and drops
+            by 2 °C at once after the second hour. For every sensor it reports
+                samples/h   effective samples per hour (fixed cycle: 240)
+                ramp err    largest difference in °C between the last reading
+                            and the true temperature during the rise
+                step lag s  seconds from the drop until the reading follows
+            and the bytes per hour on the I2C and 1-Wire bus compared with the
+            fixed cycle.
+            The DS18B20 is set to 9 bit to keep the real time of the run short.
+
+Host        CPython 3
+
+Usage       python host/benchAdaptive.py [--hours 3] [--min-ms 5000] [--max-ms 300000]
+"""
+import sys
+import os
+import argparse
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sim
+sim.install()
+
+from machine import Pin, I2C
+from dht22Sensor import DHT22Sensor
+from ds18b20Sensor import DS18B20Sensor
+from sht31Sensor import SHT31Sensor
+from bme280Sensor import BME280Sensor
+from adaptiveScheduler import AdaptiveScheduler
+
+STEP_MS = 1000
+FIXED_MS = 15000
+
+def temperature(tS):
+    if tS < 3600:
+        return 22.5
+    if tS < 7200:
+        return 22.5 + 3.0 * min(1.0, (tS - 3600) / 600)
+    return 23.5
+
+async def run(scheduler, seconds):
+    env = sim.board.env
+    errors, lags, offsets = {}, {}, {}
+    t = 0
+    while t < seconds:
+        env.temperature = temperature(t)
+        await scheduler.runCycle()
+        for name, sensor, values in scheduler.results():
+            if values is None:
+                continue
+            if name not in offsets:     # the sensor's own offset from the true temperature
+                offsets[name] = values[0] - env.temperature
+            err = abs(values[0] - offsets[name] - env.temperature)
+            if 3600 <= t < 7200:
+                errors[name] = max(errors.get(name, 0.0), err)
+            elif t >= 7200 and name not in lags and err < 0.5:
+                lags[name] = t - 7200
+        sim.clock.advance(STEP_MS * 1000)
+        t += STEP_MS // 1000
+    return errors, lags
+
+def main():
+    parser = argparse.ArgumentParser(description='Adaptive sampling on simulated hardware')
+    parser.add_argument('--hours', type=float, default=3)
+    parser.add_argument('--min-ms', type=int, default=5000)
+    parser.add_argument('--max-ms', type=int, default=300000)
+    args = parser.parse_args()
+
+    sim.board.env.noise = 0.02
+    i2c = I2C(sda=Pin(4), scl=Pin(5))
+    ds18b20 = DS18B20Sensor(Pin(0), resolution=9)
+    sensors = {
+        'DHT22': (DHT22Sensor(Pin(13)), (), {0: 0.2, 2: 1.0}),
+        'DS18B20': (ds18b20, (0,), {0: 0.1}),
+        'SHT31': (SHT31Sensor(i2c), (), {0: 0.1, 2: 0.5}),
+        'BME280': (BME280Sensor(i2c=i2c), (), {0: 0.1, 2: 1.0, 4: 0.2}),
+    }
+    scheduler = AdaptiveScheduler(minMs=args.min_ms, maxMs=args.max_ms)
+    for name, (sensor, sensorArgs, deadband) in sensors.items():
+        scheduler.add(name, sensor, *sensorArgs, deadband=deadband)
+
+    i2c0, ow0 = i2c.bytes, ds18b20.ow.bytes
+    errors, lags = asyncio.run(run(scheduler, int(args.hours * 3600)))
+    i2cBytes, owBytes = i2c.bytes - i2c0, ds18b20.ow.bytes - ow0
+
+    print('%-8s %10s %10s %10s %10s' % ('sensor', 'period ms', 'samples/h', 'ramp err', 'step lag s'))
+    rates = {}
+    for name, period, rate in scheduler.rates():
+        rates[name] = rate
+        lag = lags.get(name)
+        print('%-8s %10d %10.1f %10.2f %10s' % (
+            name, period, rate, errors.get(name, 0.0), '-' if lag is None else lag))
+    fixed = 3600000 / FIXED_MS
+    i2cRate = i2cBytes / args.hours
+    owRate = owBytes / args.hours
+    i2cFixed = i2cRate * fixed / (rates['SHT31'] + rates['BME280']) * 2
+    owFixed = owRate * fixed / rates['DS18B20']
+    print('\nbus      adaptive B/h   fixed %d ms B/h' % FIXED_MS)
+    print('I2C      %12.0f %17.0f' % (i2cRate, i2cFixed))
+    print('1-Wire   %12.0f %17.0f' % (owRate, owFixed))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Module      benchCollector.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Benchmark of host/collector.py and host/columnStore.py.
+
+            Ingest: the simulated boards of host/loadGenerator.py send
+            --records records in total over TCP to a collector on 127.0.0.1,
+            for every number of nodes and of decoding workers. It reports the
+            records and sensor rows stored per second, from the start of the
+            sending until everything is stored, and checks that every record
+            arrived. The nodes and the collector share the CPUs. One UDP run
+            shows the share of datagrams received when the nodes send without
+            pause.
+
+            Queries: for every retention (days of 1 record per minute of
+            --query-nodes nodes) a store of the SHT31 columns is filled and
+            the median latency of
+                last hour       aggregate of the last hour of all nodes
+                last hour scan  the same without the block time ranges
+                node day        rows of one node of the last day
+                hourly          hourly aggregates over the whole retention
+            is measured.
+
+Host        CPython 3 with numpy
+
+Usage       python host/benchCollector.py [--records 400000] [--nodes 8 32 128]
+                                          [--workers 0 4] [--days 1 7 30] [--query-nodes 64]
+"""
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadGenerator import generate, START
+from columnStore import ColumnStore, SENSOR_FLAGS
+from collector import Collector
+
+async def ingest(directory, nodes, records, workers, tcp=True):
+    """ Returns (records sent, records stored, rows stored, seconds) """
+    store = ColumnStore(directory)
+    collector = Collector(store, workers=workers)
+    ports = await collector.start('127.0.0.1', 0, udp=not tcp, tcp=tcp)
+    port = ports['tcp' if tcp else 'udp']
+    loop = asyncio.get_running_loop()
+    sent, started = await loop.run_in_executor(None, lambda: generate('127.0.0.1', port, nodes, records // nodes, tcp))
+    if tcp:
+        while collector.records + (collector.bad + collector.droppedBatches) * 50 < sent:
+            await asyncio.sleep(0.005)
+    else:
+        await asyncio.sleep(0.2)    # the datagrams still in the socket buffer
+    await collector.drain()
+    seconds = time.perf_counter() - min(started, collector.firstReceived or started)
+    await collector.close()
+    rows = sum(store.rows(sensor) for sensor, _ in SENSOR_FLAGS)
+    store.close()
+    return sent, collector.records, rows, seconds
+
+def median(fn, runs=5):
+    fn()    # warm up: page cache, block time ranges
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return sorted(times)[runs // 2] * 1000
+
+def fill(directory, days, nodes):
+    """ Appends days of 1 record per minute of nodes to the SHT31 columns, returns the last time """
+    store = ColumnStore(directory)
+    rnd = np.random.default_rng(1)
+    perDay = 1440 * nodes
+    for day in range(days):
+        i = np.arange(day * perDay, (day + 1) * perDay)
+        store.append({'sht31': {
+            'time': START + (i // nodes) * 60,
+            'node': i % nodes,
+            'tC': rnd.integers(1500, 3000, perDay),
+            'rH': rnd.integers(3000, 7000, perDay)}})
+    store.close()
+    return START + days * 86400 - 60
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the collector and the column store')
+    parser.add_argument('--records', type=int, default=400000, help='records per ingest run')
+    parser.add_argument('--nodes', type=int, nargs='+', default=[8, 32, 128])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 4])
+    parser.add_argument('--days', type=int, nargs='+', default=[1, 7, 30])
+    parser.add_argument('--query-nodes', type=int, default=64)
+    args = parser.parse_args()
+    root = tempfile.mkdtemp()
+    ok = True
+
+    print('%6s %8s %10s %10s %12s %12s' % ('nodes', 'workers', 'records', 'stored', 'records/s', 'rows/s'))
+    for nodes in args.nodes:
+        for workers in args.workers:
+            directory = os.path.join(root, 'ingest')
+            sent, stored, rows, seconds = asyncio.run(ingest(directory, nodes, args.records, workers))
+            ok &= stored == sent
+            print('%6d %8d %10d %10d %12.0f %12.0f' % (nodes, workers, sent, stored, stored / seconds, rows / seconds))
+            shutil.rmtree(directory)
+    nodes = args.nodes[-1]
+    sent, stored, rows, seconds = asyncio.run(ingest(os.path.join(root, 'udp'), nodes, args.records,
+                                                     args.workers[-1], tcp=False))
+    print('UDP, %d nodes without pause: %.1f %% of %d records received' % (nodes, 100 * stored / sent, sent))
+
+    print()
+    print('%5s %10s %8s %11s %15s %10s %10s' % ('days', 'rows', 'MB', 'last hour', 'last hour scan', 'node day', 'hourly'))
+    for days in args.days:
+        directory = os.path.join(root, 'query%d' % days)
+        last = fill(directory, days, args.query_nodes)
+        store = ColumnStore(directory)
+        scan = ColumnStore(directory, blockRows=1 << 40)
+        rows = store.rows('sht31')
+        size = sum(os.path.getsize(os.path.join(directory, 'sht31', f)) for f in os.listdir(os.path.join(directory, 'sht31')))
+        hour = last - 3599     # the last 60 minutes
+        lastHour = median(lambda: store.aggregate('sht31', 'tC', hour, last + 1))
+        lastHourScan = median(lambda: scan.aggregate('sht31', 'tC', hour, last + 1))
+        nodeDay = median(lambda: store.query('sht31', last - 86400, last + 1, node=7))
+        hourly = median(lambda: store.aggregate('sht31', 'tC', START, last + 1, bucketS=3600), runs=3)
+        check = store.aggregate('sht31', 'tC', hour, last + 1)
+        ok &= check[0] == 60 * args.query_nodes
+        print('%5d %10d %8.1f %9.2fms %13.2fms %8.2fms %8.1fms' % (
+            days, rows, size / 1e6, lastHour, lastHourScan, nodeDay, hourly))
+        store.close()
+        scan.close()
+        shutil.rmtree(directory)
+    shutil.rmtree(root)
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
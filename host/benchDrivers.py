@@ -0,0 +1,171 @@
+"""
+Module      benchDrivers.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Benchmark of the sensor drivers on the simulated hardware (see sim).
+            For every driver and for a full cycle of main.py it reports
+                reads/s     reads per second of cpu time on the host (sleeps excluded,
+                            the simulated devices included)
+                I2C B       bytes on the I2C bus per read (address, register and data)
+                1W B        bytes on the 1-Wire bus per read
+                sleep ms    simulated time in sleep_ms() / sleep_us() per read
+                bus ms      simulated time of the bus transfers per read
+                alloc B     peak heap allocated during a read (tracemalloc)
+                kept B      heap still held after the read (the new value objects)
+            alloc B includes the simulated devices and the int and float objects
+            of CPython, host/checkAllocations.py checks the BME280 driver alone.
+            The full cycle is measured once with the blocking getValues() of all
+            sensors, as main.py did before the scheduler, and once with a
+            SensorScheduler of the sensors of main.py in real time. For the
+            latter alloc B and kept B are those of a full cycle of main.py,
+            queryCycle() with all sensors due: measurement, output and log.
+
+Host        CPython 3
+
+Usage       python host/benchDrivers.py [--reads 200]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+import tracemalloc
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sim
+sim.install()
+
+from machine import Pin, I2C
+from dht11Sensor import DHT11Sensor
+from dht22Sensor import DHT22Sensor
+from ds18b20Sensor import DS18B20Sensor
+from sht31Sensor import SHT31Sensor
+from bme280Sensor import BME280Sensor
+from sensorScheduler import SensorScheduler
+from readingFormatter import ReadingFormatter, HUMAN
+
+PAUSE_US = 2100000      # between two reads, the DHT22 does not answer faster
+
+class NullOut:
+    """ Takes the output of main.py """
+    def write(self, data, n=None):
+        return len(data) if n is None else n
+
+class Counters:
+    def __init__(self, i2c=None, ow=None):
+        self.i2c = i2c
+        self.ow = ow
+
+    def snapshot(self):
+        return (self.i2c.bytes if self.i2c else 0, self.ow.bytes if self.ow else 0)
+
+def measure(name, read, counters, reads):
+    read()      # warm up, first allocations of lazily created objects
+    sim.clock.advance(PAUSE_US)
+    sim.clock.take()
+    i2c0, ow0 = counters.snapshot()
+    cpu = 0.0
+    for _ in range(reads):
+        t0 = time.perf_counter()
+        read()
+        cpu += time.perf_counter() - t0
+        sim.clock.advance(PAUSE_US)
+    slept, bus = sim.clock.take()
+    i2c1, ow1 = counters.snapshot()
+    # allocations are measured in a separate pass, tracemalloc slows down the reads
+    tracemalloc.start()
+    peak = kept = 0
+    for _ in range(min(reads, 20)):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        read()
+        current, p = tracemalloc.get_traced_memory()
+        peak = max(peak, p - before)
+        kept = max(kept, current - before)
+        sim.clock.advance(PAUSE_US)
+    tracemalloc.stop()
+    sim.clock.take()
+    print('%-16s %10.0f %8.1f %8.1f %9.2f %8.2f %8d %7d' % (
+        name, reads / cpu, (i2c1 - i2c0) / reads, (ow1 - ow0) / reads,
+        slept / reads / 1000, bus / reads / 1000, peak, kept))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the sensor drivers on simulated hardware')
+    parser.add_argument('--reads', type=int, default=200, help='reads per driver')
+    args = parser.parse_args()
+    reads = args.reads
+
+    i2c = I2C(sda=Pin(4), scl=Pin(5))
+    dht11 = DHT11Sensor(Pin(12))
+    dht22 = DHT22Sensor(Pin(13))
+    ds18b20 = DS18B20Sensor(Pin(0))
+    sht31 = SHT31Sensor(i2c)
+    bme280 = BME280Sensor(i2c=i2c)
+    bme280.localAltitude = 405
+
+    print('%-16s %10s %8s %8s %9s %8s %8s %7s' % (
+        'driver', 'reads/s', 'I2C B', '1W B', 'sleep ms', 'bus ms', 'alloc B', 'kept B'))
+    measure('DHT11', dht11.getValues, Counters(), reads)
+    measure('DHT22', dht22.getValues, Counters(), reads)
+    measure('DS18B20', lambda: ds18b20.getValues(0), Counters(ow=ds18b20.ow), reads)
+    measure('SHT31', sht31.getValues, Counters(i2c=i2c), reads)
+    measure('BME280 forced', bme280.getValues, Counters(i2c=i2c), reads)
+    bme280.setNormalMode()
+    time.sleep_ms(100)
+    measure('BME280 normal', bme280.getValues, Counters(i2c=i2c), reads)
+    bme280.setForcedMode()
+    sht31.startPeriodic(10)
+    time.sleep_ms(150)
+    measure('SHT31 periodic', sht31.getValues, Counters(i2c=i2c), reads)
+    sht31.stopPeriodic()
+
+    def blockingCycle():
+        dht11.getValues()
+        dht22.getValues()
+        ds18b20.getValues(0)
+        sht31.getValues()
+        bme280.getValues()
+    measure('cycle blocking', blockingCycle, Counters(i2c=i2c, ow=ds18b20.ow), reads)
+
+    os.chdir(tempfile.mkdtemp())    # main.py writes its flash log to ./log
+    import main as mainModule
+    scheduler = SensorScheduler()   # all sensors in every cycle, unlike the adaptive one of main.py
+    for name, sensor, args, values in (job[:4] for job in mainModule.scheduler._jobs):
+        scheduler.add(name, sensor, *args)
+    cycles = 3
+    sim.clock.advance(PAUSE_US)
+    t0 = time.perf_counter()
+    for _ in range(cycles):
+        asyncio.run(scheduler.runCycle())
+        sim.clock.advance(PAUSE_US)
+    wall = (time.perf_counter() - t0) / cycles
+    mainModule.output = ReadingFormatter([entry['name'] for entry, _ in mainModule.registry.sensors()],
+                                         HUMAN, out=NullOut())
+    peak, kept = asyncio.run(mainCycleAlloc(mainModule, cycles))
+    print('%-16s %10s %8s %8s %9s %8s %8d %7d  wall time per cycle %.0f ms (real time, conversions in parallel)' % (
+        'cycle scheduler', '', '', '', '', '', peak, kept, wall * 1000))
+
+""" Peak and kept heap of queryCycle() of main.py with all sensors due """
+async def mainCycleAlloc(mainModule, cycles):
+    def allDue():
+        for job in mainModule.scheduler._jobs:     # [.., [msPrevious, msPeriod], ..] of waitIsOver()
+            job[4][0] = time.ticks_add(time.ticks_ms(), -job[4][1])
+    allDue()
+    await mainModule.queryCycle()   # warm up
+    peak = kept = 0
+    tracemalloc.start()
+    for _ in range(cycles):
+        sim.clock.advance(PAUSE_US)
+        allDue()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await mainModule.queryCycle()
+        current, p = tracemalloc.get_traced_memory()
+        peak = max(peak, p - before)
+        kept = max(kept, current - before)
+    tracemalloc.stop()
+    return peak, kept
+
+if __name__ == '__main__':
+    main()
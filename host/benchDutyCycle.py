@@ -0,0 +1,80 @@
+"""
+Module      benchDutyCycle.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Runs the duty-cycle mode (lib/dutyCycle.py) with the sensors of
+            main.py on the simulated board (see sim) for a number of boots.
+            Every boot creates a new I2C bus and DutyCycle like a reset does,
+            deepsleep() ends the boot and machine.wake() starts the next one
+            with the RTC memory kept. For every cycle it reports
+                awake ms        from the creation of the DutyCycle to deep sleep
+                                (sim: virtual sleep and bus time plus real time)
+                I2C             transactions and bytes on the I2C bus
+                scans           bus scans of the registry
+                records         records in RTC memory after the cycle
+            and the mean current estimated from the awake and sleep currents,
+            compared with the continuous mode, which never sleeps.
+            The first boot creates the sensors with the registry, the wakes
+            restore addresses and calibration from RTC memory.
+
+Host        CPython 3
+
+Usage       python host/benchDutyCycle.py [--cycles 25] [--period 15000] [--flush 10]
+                                          [--awake-ma 70] [--sleep-ua 20]
+"""
+import sys
+import os
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sim
+sim.install()
+
+import machine
+from machine import I2C
+from dutyCycle import DutyCycle
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the deep-sleep duty cycle')
+    parser.add_argument('--cycles', type=int, default=25)
+    parser.add_argument('--period', type=int, default=15000, help='ms between two samples')
+    parser.add_argument('--flush', type=int, default=10, help='wakes between two flash writes')
+    parser.add_argument('--awake-ma', type=float, default=70.0, help='current while awake')
+    parser.add_argument('--sleep-ua', type=float, default=20.0, help='current in deep sleep')
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())    # main.py writes sensors.json and ./log
+    import main as mainModule
+    os.chdir(tempfile.mkdtemp())    # the duty cycle starts without a cache file
+
+    print('%5s %-10s %9s %8s %9s %6s %8s' % ('cycle', 'path', 'awake ms', 'I2C trx', 'I2C bytes', 'scans', 'records'))
+    awake = []
+    for cycle in range(args.cycles):
+        i2c = I2C()
+        duty = DutyCycle(mainModule.SENSORS, i2c, periodMs=args.period, flushEvery=args.flush,
+                         logged=mainModule.LOGGED)
+        path = 'first boot' if duty._setup is None else 'wake'
+        try:
+            duty.run()
+        except machine.DeepSleep as e:
+            sleptMs = e.ms
+        if duty._records == 0:
+            path += ' +flush'
+        awake.append(duty.lastAwakeMs)
+        print('%5d %-10s %9d %8d %9d %6d %8d' % (cycle, path, duty.lastAwakeMs, i2c.transactions,
+                                                 i2c.bytes, duty.registry.scans, duty._records))
+        machine.wake(sleptMs)
+
+    wakes = awake[1:] or awake
+    meanAwake = sum(wakes) / len(wakes)
+    dutyMa = (meanAwake * args.awake_ma + (args.period - meanAwake) * args.sleep_ua / 1000) / args.period
+    logBytes = sum(os.stat(os.path.join('log', name)).st_size for name in os.listdir('log')) \
+        if os.path.isdir('log') else 0
+    print('first boot %d ms, wakes %.0f ms mean, %d ms max, flash log %d bytes' % (
+        awake[0], meanAwake, max(wakes), logBytes))
+    print('mean current %.2f mA duty-cycled vs %.1f mA continuous (%.0fx less)' % (
+        dutyMa, args.awake_ma, args.awake_ma / dutyMa))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""
+Module      benchFormatter.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Benchmark of lib/readingFormatter.py against the output of
+            main.py before it, the name with an underline printed per sensor
+            and the %-string of showValues() of the drivers. A cycle has the
+            readings of the five sensors with values that change from cycle to
+            cycle. For every layout it reports per cycle
+                bytes       bytes of the output
+                writes      calls of write(), print() writes the text and
+                            the line end separately
+                alloc B     heap allocated (tracemalloc on CPython, gc.mem_alloc()
+                            with the collector disabled on MicroPython)
+                us          time to format the cycle, the writes go to a sink
+                            that only counts
+                UART ms     time to send the bytes at 115200 baud
+            and checks that HUMAN gives the same bytes as the %-strings in
+            every cycle.
+            On CPython the %-strings are checked against showValues() of the
+            drivers on simulated hardware (see sim).
+
+Host        MicroPython unix port or CPython 3
+
+Usage       micropython host/benchFormatter.py [cycles]
+            python host/benchFormatter.py [cycles]
+"""
+import sys
+import time
+import gc
+
+MICROPYTHON = sys.implementation.name == 'micropython'
+if MICROPYTHON:
+    sys.path.append(__file__.rsplit('/', 2)[0] + '/lib' if '/' in __file__ else '../lib')
+    def clockUs():
+        return time.ticks_us()
+else:
+    import os
+    import io
+    import tracemalloc
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import sim
+    sim.install()
+    def clockUs():
+        return int(time.perf_counter() * 1000000)
+
+from readingFormatter import ReadingFormatter, HUMAN, CSV, JSON
+
+NAMES = ('DHT11', 'DHT22', 'DS18B20', 'SHT31', 'BME280')
+# the %-strings of showValues() by number of values
+SHOW = {
+    2: 'tC = %4.1f °C\ntF = %4.1f °F\n',
+    4: 'tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\n',
+    7: 'tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\nairPres = %5.1f hPa\nlocalNP = %5.1f hPa\nlocAlt  = %d masl\n'}
+BAUD = 115200
+START = 1792200000
+
+def makeCycles(n):
+    """ Readings of n cycles, a failed DHT11 read every 10th cycle """
+    cycles = []
+    for i in range(n):
+        tC = 20 + (i * 37 % 1000) / 100
+        rH = 40 + (i * 53 % 2000) / 100
+        dP = tC - (100 - rH) / 5
+        cycles.append((
+            ('DHT11', None if i % 10 == 9 else [int(tC), int(tC) * 1.8 + 32, int(rH), dP]),
+            ('DHT22', [tC + 0.3, (tC + 0.3) * 1.8 + 32, rH + 0.7, dP + 0.2]),
+            ('DS18B20', [tC - 0.25, (tC - 0.25) * 1.8 + 32]),
+            ('SHT31', [tC + 0.11, (tC + 0.11) * 1.8 + 32, rH - 0.37, dP - 0.1]),
+            ('BME280', [tC - 1.3, (tC - 1.3) * 1.8 + 32, rH - 3.1, dP - 1.2,
+                        960 + (i % 97) / 10, 1008.43 + (i % 97) / 10, 405])))
+    return cycles
+
+class Sink:
+    """ Counts the bytes and calls of write(), the UTF-8 bytes of text only with encode """
+    def __init__(self):
+        self.bytes = 0
+        self.writes = 0
+        self.encode = True
+
+    def write(self, data, n=None):
+        if n is None:
+            n = len(data.encode() if self.encode and isinstance(data, str) else data)
+        self.bytes += n
+        self.writes += 1
+
+def legacyCycle(sink, readings):
+    """ The text of main.py before readingFormatter.py, print() writes the text and its end """
+    sink.write('')
+    sink.write('\n')
+    for name, values in readings:
+        sink.write('%s\n%s' % (name, '-' * len(name)))
+        sink.write('\n')
+        if values is None:
+            sink.write('no values\n')
+        else:
+            sink.write(SHOW[len(values)] % tuple(values))
+        sink.write('\n')
+
+def formatterCycle(formatter, readings):
+    formatter.begin(START)
+    for name, values in readings:
+        formatter.add(name, values)
+    formatter.write()
+
+def legacyText(readings):
+    parts = ['\n']
+    for name, values in readings:
+        parts.append('%s\n%s\n' % (name, '-' * len(name)))
+        parts.append('no values\n\n' if values is None else SHOW[len(values)] % tuple(values) + '\n')
+    return ''.join(parts).encode()
+
+def checkDrivers(readings):
+    """ Compares the %-strings with showValues() of the drivers, returns the sensors that differ """
+    from machine import Pin, I2C
+    from dht11Sensor import DHT11Sensor
+    from dht22Sensor import DHT22Sensor
+    from ds18b20Sensor import DS18B20Sensor
+    from sht31Sensor import SHT31Sensor
+    from bme280Sensor import BME280Sensor
+    i2c = I2C(sda=Pin(4), scl=Pin(5))
+    sensors = {'DHT11': DHT11Sensor(Pin(12)), 'DHT22': DHT22Sensor(Pin(13)), 'DS18B20': DS18B20Sensor(Pin(0)),
+               'SHT31': SHT31Sensor(i2c), 'BME280': BME280Sensor(i2c=i2c)}
+    differ = []
+    for name, values in readings:
+        if values is None:
+            continue
+        sensor = sensors[name]
+        if name == 'DS18B20':
+            sensor.tC, sensor.tF = values
+        else:
+            sensor._values[:] = values
+        out = io.StringIO()
+        stdout, sys.stdout = sys.stdout, out
+        try:
+            sensor.showValues()
+        finally:
+            sys.stdout = stdout
+        if out.getvalue() != SHOW[len(values)] % tuple(values) + '\n':
+            differ.append(name)
+    return differ
+
+def allocated(run, cycles):
+    """ Bytes allocated per cycle """
+    if MICROPYTHON:
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        for readings in cycles:
+            run(readings)
+        after = gc.mem_alloc()
+        gc.enable()
+        return (after - before) / len(cycles)
+    tracemalloc.start()
+    peak = 0
+    for readings in cycles[:20]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        run(readings)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return peak
+
+def measure(name, run, sink, cycles, rounds):
+    for readings in cycles:     # warm up, counts the bytes and writes of one round
+        run(readings)
+    bytes, writes = sink.bytes, sink.writes
+    sink.encode = False
+    alloc = allocated(run, cycles)
+    gc.collect()
+    t0 = clockUs()
+    for _ in range(rounds):
+        for readings in cycles:
+            run(readings)
+    us = (time.ticks_diff(clockUs(), t0) if hasattr(time, 'ticks_diff') else clockUs() - t0) / (rounds * len(cycles))
+    print('%-8s %8.0f %8.1f %10.0f %8.1f %8.1f' % (
+        name, bytes / len(cycles), writes / len(cycles), alloc, us, bytes * 10000 / BAUD / len(cycles)))
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cycles = makeCycles(100)
+    rounds = max(1, n // len(cycles))
+    print('%s, %d cycles of %s' % (sys.implementation.name, rounds * len(cycles), ', '.join(NAMES)))
+    print('%-8s %8s %8s %10s %8s %8s' % ('layout', 'bytes', 'writes', 'alloc B', 'us', 'UART ms'))
+    sink = Sink()
+    measure('legacy', lambda readings: legacyCycle(sink, readings), sink, cycles, rounds)
+    formatters = {}
+    for name, layout in (('HUMAN', HUMAN), ('CSV', CSV), ('JSON', JSON)):
+        sink = Sink()
+        formatter = formatters[name] = ReadingFormatter(NAMES, layout, out=sink)
+        measure(name, lambda readings: formatterCycle(formatter, readings), sink, cycles, rounds)
+
+    human = ReadingFormatter(NAMES, HUMAN, out=Sink())
+    same = 0
+    for readings in cycles:
+        human.begin(START)
+        for name, values in readings:
+            human.add(name, values)
+        text, legacy = bytes(human.pending()), legacyText(readings)
+        if text == legacy:
+            same += 1
+    print('HUMAN equals the %%-strings in %d of %d cycles' % (same, len(cycles)))
+    ok = same == len(cycles)
+    if not MICROPYTHON:
+        differ = checkDrivers(cycles[0])
+        print('%%-strings equal showValues() of the drivers: %s' % ('yes' if not differ else 'no, ' + ', '.join(differ)))
+        ok = ok and not differ
+    sys.exit(0 if ok else 1)
+
+main()
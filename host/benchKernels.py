@@ -0,0 +1,67 @@
+"""
+Module      benchKernels.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Microbenchmark of the compensation kernels (lib/compensation.py).
+            Reports the µs per call of the pure Python kernels and of the
+            native / viper kernels of compensationNative.py and the speedup.
+            Run it with the MicroPython unix port to see the gain of the code
+            emitters, on CPython both variants run as Python (see sim).
+
+Host        MicroPython unix port or CPython 3
+
+Usage       micropython host/benchKernels.py [calls]
+            python host/benchKernels.py [calls]
+"""
+import sys
+import time
+
+if sys.implementation.name == 'micropython':
+    sys.path.append(__file__.rsplit('/', 2)[0] + '/lib' if '/' in __file__ else '../lib')
+    def clockUs():
+        return time.ticks_us()
+else:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import sim
+    sim.install()
+    def clockUs():
+        return int(time.perf_counter() * 1000000)
+
+from array import array
+import compensation
+import compensationNative
+
+# calibration and raw values of the example of the datasheet
+CAL = compensation.bme280Calibration(27504, 26435, -1000, 36477, -10685, 3024, 2855, 140,
+                                     -7, 15500, -14600, 6000, 75, 362, 0, 313, 50, 30)
+RAW = array('i', [519888, 415148, 30000])
+
+def bme280Loop(kernel, calls):
+    result = array('i', [0, 0, 0])
+    raw, cal = RAW, CAL
+    t0 = clockUs()
+    for _ in range(calls):
+        kernel(raw, cal, result)
+    return time.ticks_diff(clockUs(), t0) if hasattr(time, 'ticks_diff') else clockUs() - t0
+
+def sht31Loop(kernel, calls):
+    result = array('i', [0, 0])
+    t0 = clockUs()
+    for i in range(calls):
+        kernel(i & 0xFFFF, 40000, result)
+    return time.ticks_diff(clockUs(), t0) if hasattr(time, 'ticks_diff') else clockUs() - t0
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print('%s, kernels in use: %s' % (sys.implementation.name, compensation.BACKEND))
+    print('%-18s %10s %10s %8s' % ('kernel', 'python us', 'native us', 'speedup'))
+    for name, loop, python, native in (
+            ('bme280Compensate', bme280Loop, compensation.bme280CompensatePy, compensationNative.bme280Compensate),
+            ('sht31Fixed', sht31Loop, compensation.sht31FixedPy, compensationNative.sht31Fixed)):
+        loop(python, calls // 10)    # warm up
+        tPython = loop(python, calls) / calls
+        tNative = loop(native, calls) / calls
+        print('%-18s %10.2f %10.2f %7.1fx' % (name, tPython, tNative, tPython / tNative if tNative else 0))
+
+main()
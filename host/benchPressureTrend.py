@@ -0,0 +1,130 @@
+"""
+Module      benchPressureTrend.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Accuracy and throughput of lib/pressureTrend.py on a synthetic
+            pressure series sampled at 1 Hz: a slow weather wave, the
+            semidiurnal tide, a cold front falling 6 hPa in 6 h and sensor
+            noise. For every window it reports
+                exact       the largest difference to a least-squares fit
+                            recomputed from all buckets of the window
+                rms, lag    the rms difference to the true derivative at the
+                            end of the window and at its middle (the fit lags
+                            by half a window)
+            and the agreement of tendency() with the sign of the true change
+            over 3 h, the forecasts during the front and the µs per add().
+
+Host        CPython 3 or the micropython unix port
+
+Usage       python host/benchPressureTrend.py [days]
+            micropython host/benchPressureTrend.py [days]
+"""
+import sys
+import time
+import math
+import random
+
+if sys.implementation.name == 'micropython':
+    sys.path.append(__file__.rsplit('/', 2)[0] + '/lib' if '/' in __file__ else '../lib')
+    def clockUs():
+        return time.ticks_us()
+else:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import sim
+    sim.install()
+    def clockUs():
+        return int(time.perf_counter() * 1000000)
+
+from pressureTrend import PressureTrend, WINDOWS, FALLING, STEADY, RISING, STEADY_HPA_3H
+
+DAY = 86400
+FRONT = (int(1.5 * DAY), int(1.5 * DAY) + 6 * 3600)    # start and end of the front in s
+
+def pressure(t):
+    """ Clean sea level pressure in hPa at t seconds """
+    p = 1013 + 8 * math.sin(2 * math.pi * t / (3.5 * DAY)) + 0.8 * math.sin(2 * math.pi * t / (DAY / 2))
+    if t > FRONT[0]:
+        p -= 6 * (min(t, FRONT[1]) - FRONT[0]) / (FRONT[1] - FRONT[0])
+    return p
+
+def derivative(t):
+    """ True slope in hPa per hour """
+    return (pressure(t + 30) - pressure(t - 30)) * 60
+
+def noise():
+    """ About gaussian with a standard deviation of 0.013 hPa (BME280, oversampling 1) """
+    return (random.random() + random.random() + random.random() + random.random() - 2) * 0.0225
+
+def batchSlope(buckets, n):
+    """ Least-squares slope in hPa/h of the last n bucket means, recomputed from scratch """
+    ys = buckets[-n:]
+    mx = (n - 1) / 2
+    my = sum(ys) / n
+    num = sum((x - mx) * (y - my) for x, y in enumerate(ys))
+    den = sum((x - mx) ** 2 for x in range(n))
+    return num / den * 60 / 1000
+
+def tendencyOf(change):
+    return FALLING if change <= -STEADY_HPA_3H else RISING if change >= STEADY_HPA_3H else STEADY
+
+def main():
+    days = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    seconds = int(days * DAY)
+    random.seed(1)
+    trend = PressureTrend()
+    values = [0, 0, 0, 0, 0.0, 1013.25, 0]  # BME280 values, localNP 1013.25: at sea level
+    buckets = []                            # bucket means of the reference
+    bucketSum = bucketN = 0
+    reference = None
+    exact = [0.0] * len(WINDOWS)
+    sq = [0.0] * len(WINDOWS)
+    sqLag = [0.0] * len(WINDOWS)
+    checked = [0] * len(WINDOWS)
+    agree = total = 0
+    forecasts = {}
+    addUs = 0
+    for t in range(seconds):
+        values[4] = pressure(t) + noise()
+        t0 = clockUs()
+        trend.add(values, t)
+        addUs += clockUs() - t0
+
+        p = round(values[4] * 1013250 / values[5])
+        if reference is None:
+            reference = p
+        if t % 60 == 0 and bucketN:
+            buckets.append((2 * bucketSum + bucketN) // (2 * bucketN))
+            bucketSum = bucketN = 0
+            end = t - 30    # middle of the last bucket
+            for w, size in enumerate(WINDOWS):
+                n = min(size, len(buckets))
+                if n < size:
+                    continue
+                slope = trend.slope(w)
+                exact[w] = max(exact[w], abs(slope - batchSlope(buckets, n)))
+                sq[w] += (slope - derivative(end)) ** 2
+                sqLag[w] += (slope - derivative(end - size * 30)) ** 2
+                checked[w] += 1
+            tendency = trend.tendency()
+            if tendency is not None and t >= 3 * 3600:
+                total += 1
+                agree += tendency == tendencyOf(pressure(end) - pressure(end - 3 * 3600))
+            if FRONT[0] <= t <= FRONT[1] + 3 * 3600 and trend.forecast() is not None:
+                code = trend.forecast()
+                forecasts[code] = forecasts.get(code, 0) + 1
+        bucketSum += p - reference
+        bucketN += 1
+
+    print('%s, %.1f days at 1 Hz, %d buckets' % (sys.implementation.name, days, len(buckets)))
+    print('%-8s %12s %12s %12s' % ('window', 'exact hPa/h', 'rms hPa/h', 'lag rms'))
+    for w, size in enumerate(WINDOWS):
+        c = max(1, checked[w])
+        print('%-8s %12.2e %12.3f %12.3f' % ('%d min' % size, exact[w], math.sqrt(sq[w] / c), math.sqrt(sqLag[w] / c)))
+    print('tendency agrees with the true 3 h change in %.1f %% of %d buckets' % (100 * agree / max(1, total), total))
+    for code in sorted(forecasts):
+        print('front: forecast %2d %-36s %4d min' % (code, trend.forecastText(code), forecasts[code]))
+    print('add() %.2f us per sample, %.4f %% of the time at 1 Hz' % (addUs / seconds, addUs / seconds / 10000))
+    sys.exit(0 if max(exact) < 1e-6 else 1)
+
+main()
@@ -0,0 +1,61 @@
+"""
+Module      benchPsychrometrics.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Measures the throughput of the dew point of psychrometrics.py over
+            -40..60 °C and 0..100 %rH, and compares the numpy batch path of
+            psychrometricsArray.py with it when numpy is installed.
+
+Host        CPython 3 or the micropython unix port
+
+Usage       python host/benchPsychrometrics.py
+            micropython host/benchPsychrometrics.py
+"""
+import sys
+import time
+sys.path.insert(0, (__file__.rsplit('/', 1)[0] if '/' in __file__ else '.') + '/../lib')
+import psychrometrics as psy
+try:
+    import numpy as np
+    from psychrometricsArray import dewPointArray
+except ImportError:
+    np = None
+
+def _grid():
+    grid = []
+    for t in range(-40, 61):
+        for h in range(0, 1001, 5):
+            grid.append((float(t), h / 10))
+    return grid
+
+def _ticks():
+    if hasattr(time, 'ticks_us'):
+        return time.ticks_us()
+    return int(time.perf_counter() * 1000000)
+
+def _throughput(fn, grid):
+    t0 = _ticks()
+    for t, h in grid:
+        fn(t, h)
+    us = _ticks() - t0
+    return len(grid) * 1000000 / us if us else 0
+
+def main():
+    grid = _grid()
+    print('samples              %d' % len(grid))
+    print('dewPoint             %10.0f dew points/s' % _throughput(psy.dewPoint, grid))
+
+    if np is not None:
+        n = 1000000
+        tC = np.random.uniform(-40, 60, n)
+        rH = np.random.uniform(0, 100, n)
+        t0 = time.perf_counter()
+        dP = dewPointArray(tC, rH)
+        dt = time.perf_counter() - t0
+        print('numpy                %10.0f dew points/s (%d rows)' % (n / dt, n))
+        check = max(abs(dP[i] - psy.dewPoint(tC[i], rH[i])) for i in range(0, n, n // 1000))
+        print('max |numpy - scalar| %.2e °C' % check)
+    else:
+        print('numpy                not installed, batch path skipped')
+
+main()
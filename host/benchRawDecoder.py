@@ -0,0 +1,125 @@
+"""
+Module      benchRawDecoder.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Benchmark of host/rawDecoder.py. Records frames of the simulated
+            BME280 and SHT31 (see sim) with lib/rawCapture.py, replicates them
+            with random raw values of real measurements to the given number
+            of frames per sensor and converts them
+                - vectorized with numpy (decodeBME280(), decodeSHT31())
+                - frame by frame with the kernels of the driver (a sample)
+            It checks that both give the same integers (BME280) and floats
+            (SHT31) bit by bit and reports the frames per second and the time
+            for a month of 1 Hz data of one node (2.6 million frames per sensor).
+
+Host        CPython 3 with numpy
+
+Usage       python host/benchRawDecoder.py [--frames 1000000] [--sample 50000]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sim
+sim.install()
+
+import numpy as np
+from machine import I2C
+from bme280Sensor import BME280Sensor
+from sht31Sensor import SHT31Sensor
+from rawCapture import RawCapture, KIND_BME280, KIND_SHT31, FRAME_SIZE
+from rawDecoder import (readFrames, decodeBME280, decodeSHT31, decodeBME280Scalar,
+                        decodeSHT31Scalar, CRC8_TABLE)
+
+MONTH = 30 * 24 * 3600
+
+def record(path):
+    """ Records the calibration and a few real frames of the simulated sensors """
+    i2c = I2C()
+    bme280 = BME280Sensor(i2c=i2c)
+    sht31 = SHT31Sensor(i2c)
+    capture = RawCapture(path)
+    capture.attach(bme280)
+    capture.attach(sht31)
+    for _ in range(10):
+        bme280.getValues()
+        sht31.getValues()
+    capture.flush()
+
+def replicate(path, frames, rnd):
+    """ Appends random frames of real measurements """
+    data = np.zeros(2 * frames, dtype=readFrames(path).dtype)
+    data['kind'][0::2] = KIND_BME280
+    data['kind'][1::2] = KIND_SHT31
+    data['address'][0::2] = 0x76
+    data['address'][1::2] = 0x44
+    data['seq'] = np.arange(2 * frames) & 0xFFFF
+    data['time'] = 1700000000 + np.arange(2 * frames) // 2
+    adcT = rnd.integers(380000, 620000, frames)
+    adcP = rnd.integers(250000, 600000, frames)
+    adcH = rnd.integers(15000, 45000, frames)
+    b = data['payload'][0::2]
+    b[:, 0], b[:, 1], b[:, 2] = adcP >> 12, (adcP >> 4) & 0xFF, (adcP & 0xF) << 4
+    b[:, 3], b[:, 4], b[:, 5] = adcT >> 12, (adcT >> 4) & 0xFF, (adcT & 0xF) << 4
+    b[:, 6], b[:, 7] = adcH >> 8, adcH & 0xFF
+    table = np.array(CRC8_TABLE, dtype=np.uint8)
+    s = data['payload'][1::2]
+    s[:, 0], s[:, 1] = rnd.integers(0, 256, frames), rnd.integers(0, 256, frames)
+    s[:, 3], s[:, 4] = rnd.integers(0, 256, frames), rnd.integers(0, 256, frames)
+    s[:, 2] = table[table[0xFF ^ s[:, 0]] ^ s[:, 1]]
+    s[:, 5] = table[table[0xFF ^ s[:, 3]] ^ s[:, 4]]
+    with open(path, 'ab') as f:
+        f.write(data.tobytes())
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the raw frame decoder')
+    parser.add_argument('--frames', type=int, default=1000000, help='frames per sensor')
+    parser.add_argument('--sample', type=int, default=50000, help='frames per sensor for the scalar decoder')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'raw.bin')
+    record(path)
+    replicate(path, args.frames, np.random.default_rng(1))
+    frames = readFrames(path)
+    print('%d frames, %.1f MB' % (len(frames), len(frames) * FRAME_SIZE / 1e6))
+
+    t0 = time.perf_counter()
+    bme = decodeBME280(frames)
+    tBME = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    sht = decodeSHT31(frames)
+    tSHT = time.perf_counter() - t0
+
+    # scalar reference over the first frames
+    sample = frames[:2 * args.sample + 20].tobytes()
+    t0 = time.perf_counter()
+    scalarBME = list(decodeBME280Scalar(sample))
+    tBMEScalar = (time.perf_counter() - t0) / len(scalarBME)
+    t0 = time.perf_counter()
+    scalarSHT = list(decodeSHT31Scalar(sample))
+    tSHTScalar = (time.perf_counter() - t0) / len(scalarSHT)
+
+    n = len(scalarBME)
+    ref = np.array([r[2:] for r in scalarBME], dtype=np.int64)
+    vec = np.stack([bme['temp'][:n], bme['press'][:n], bme['hum'][:n]], axis=1)
+    diffBME = int(np.count_nonzero((ref != vec).any(axis=1)))
+    m = len(scalarSHT)
+    diffSHT = sum(1 for i, r in enumerate(scalarSHT)
+                  if r[2] != sht['valid'][i] or r[3] != sht['tC'][i] or r[4] != sht['rH'][i])
+
+    print('%-8s %12s %12s %10s %12s %12s %8s' % (
+        'sensor', 'numpy fr/s', 'scalar fr/s', 'speedup', 'month numpy', 'month scalar', 'differ'))
+    for name, count, tVec, tScalar, diff, checked in (
+            ('BME280', len(bme['temp']), tBME, tBMEScalar, diffBME, n),
+            ('SHT31', len(sht['tC']), tSHT, tSHTScalar, diffSHT, m)):
+        rate = count / tVec
+        print('%-8s %12.0f %12.0f %9.0fx %11.2fs %11.0fs %3d/%d' % (
+            name, rate, 1 / tScalar, rate * tScalar, MONTH / rate, MONTH * tScalar, diff, checked))
+    sys.exit(1 if diffBME or diffSHT else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Module      benchTelemetry.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Loopback benchmark of lib/telemetryServer.py. The server runs in
+            an asyncio event loop together with a SensorScheduler, which
+            measures the simulated sensors of main.py (see sim) in a loop in
+            real time and publishes every cycle. Client processes connect over
+            127.0.0.1, keep their connection open and send requests one after
+            the other for the given time. For both formats and every number
+            of clients it reports the requests per second, the latency
+            percentiles and the bytes per response, compared with the duration
+            of a sensor cycle, the latency of a server that reads the sensors
+            on request. Finally it checks that a connection beyond maxClients
+            is refused.
+
+Host        CPython 3
+
+Usage       python host/benchTelemetry.py [--seconds 2] [--clients 1 4 16]
+"""
+import sys
+import os
+import time
+import socket
+import struct
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sim
+sim.install()
+
+from sensorScheduler import SensorScheduler
+from telemetryServer import TelemetryServer, HEADER_FORMAT, HEADER_SIZE
+
+def complete(command, data):
+    if command == b'b':
+        return len(data) >= HEADER_SIZE and \
+            len(data) == HEADER_SIZE + struct.unpack_from(HEADER_FORMAT, data)[2]
+    return data.endswith(b'\n\n')
+
+def client(port, command, seconds):
+    """ Sends requests over one connection for seconds, returns (latencies in µs, bytes per response) """
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    request = command + b'\n'
+    latencies = []
+    size = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        t0 = time.perf_counter()
+        sock.sendall(request)
+        data = b''
+        while not complete(command, data):
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionError('closed by the server')
+            data += chunk
+        latencies.append((time.perf_counter() - t0) * 1000000)
+        size = len(data)
+    sock.sendall(b'q\n')
+    sock.close()
+    return latencies, size
+
+def percentile(sortedValues, p):
+    return sortedValues[min(len(sortedValues) - 1, int(len(sortedValues) * p / 100))]
+
+async def measureSensors(scheduler, telemetry, cycles):
+    while True:
+        t0 = time.perf_counter()
+        await scheduler.runCycle()
+        cycles.append(time.perf_counter() - t0)
+        for name, _, values in scheduler.results():
+            telemetry.update(name, values)
+        telemetry.publish()
+
+async def bench(args):
+    os.chdir(tempfile.mkdtemp())    # main.py writes sensors.json and ./log
+    import main as mainModule
+    scheduler = SensorScheduler()   # all sensors in every cycle
+    for name, sensor, sensorArgs in (job[:3] for job in mainModule.scheduler._jobs):
+        scheduler.add(name, sensor, *sensorArgs)
+    telemetry = TelemetryServer(mainModule.LOGGED, port=0, host='127.0.0.1',
+                                maxClients=max(args.clients))
+    server = await telemetry.start()
+    port = server.sockets[0].getsockname()[1]
+    cycles = []
+    task = asyncio.create_task(measureSensors(scheduler, telemetry, cycles))
+    loop = asyncio.get_running_loop()
+
+    print('%-6s %7s %9s %8s %8s %9s %6s' % ('format', 'clients', 'req/s', 'p50 us', 'p99 us', 'p99.9 us', 'bytes'))
+    with multiprocessing.Pool(max(args.clients)) as pool:
+        for command, label in ((b'b', 'binary'), (b'j', 'json')):
+            for n in args.clients:
+                result = pool.starmap_async(client, [(port, command, args.seconds)] * n)
+                while not result.ready():
+                    await asyncio.sleep(0.01)
+                results = result.get()
+                latencies = sorted(l for r in results for l in r[0])
+                print('%-6s %7d %9.0f %8.0f %8.0f %9.0f %6d' % (
+                    label, n, len(latencies) / args.seconds, percentile(latencies, 50),
+                    percentile(latencies, 99), percentile(latencies, 99.9), results[0][1]))
+
+        # one connection more than maxClients is refused
+        held = [await asyncio.open_connection('127.0.0.1', port) for _ in range(telemetry.maxClients)]
+        await asyncio.sleep(0.1)
+        refused = await loop.run_in_executor(None, lambda: socket.create_connection(('127.0.0.1', port)).recv(16))
+        for reader, writer in held:
+            writer.close()
+            await writer.wait_closed()
+    task.cancel()
+    telemetry.close()
+    await asyncio.sleep(0.1)    # lets the server tasks see the closed connections
+    meanCycle = sum(cycles[1:]) / max(1, len(cycles) - 1)
+    print('sensor cycle %.0f ms (%d cycles published), requests %d, connections %d, refused %d (%r)' % (
+        meanCycle * 1000, len(cycles), telemetry.requests, telemetry.clients, telemetry.rejected, refused))
+    return refused == b'busy\n'
+
+def main():
+    parser = argparse.ArgumentParser(description='Loopback benchmark of the telemetry server')
+    parser.add_argument('--seconds', type=float, default=2.0, help='duration of every run')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(bench(args)) else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Module      checkAllocations.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Checks that a read of the BME280 driver does not grow the heap.
+            The driver reads a fixed I2C device (the calibration and raw
+            values of the example of the datasheet), so only the allocations
+            of the driver are counted, not those of a simulated bus. For
+            every read path it reports the bytes allocated per read:
+                - on MicroPython gc.mem_alloc() with the collector disabled.
+                  getFixedValues(result) and read_compensated_data(result)
+                  must not allocate. collectValues() and getValues() return
+                  floats, which the ESP8266 port keeps in the object itself,
+                  the unix port allocates them.
+                - on CPython the heap still held after all reads (tracemalloc),
+                  every int and float is an object there, so only what is
+                  kept is checked: state replaced by every read, e.g. t_fine,
+                  stays below HELD bytes however many reads there are, a leak
+                  of one object per read does not.
+            read_compensated_data() without result allocates a new array per
+            call by design, it is reported for comparison.
+            The exit code is 1 when a path that must not allocate does.
+
+Host        MicroPython unix port or CPython 3
+
+Usage       micropython host/checkAllocations.py [reads]
+            python host/checkAllocations.py [reads]
+"""
+import sys
+import gc
+
+MICROPYTHON = sys.implementation.name == 'micropython'
+if MICROPYTHON:
+    sys.path.append(__file__.rsplit('/', 2)[0] + '/lib' if '/' in __file__ else '../lib')
+else:
+    import os
+    import tracemalloc
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import sim
+    sim.install()       # ustruct, const() and time.sleep_us() of MicroPython
+
+from array import array
+from struct import pack
+from bme280Sensor import BME280Sensor
+
+# calibration and raw values of the example of the datasheet
+T = (27504, 26435, -1000)
+P = (36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+H = (75, 362, 0, 313, 50, 30)
+RAW_TEMP, RAW_PRESS, RAW_HUM = 519888, 415148, 30000
+HELD = 512      # bytes of state the reads may keep on CPython
+
+class FixedBME280Bus:
+    """ I2C with a BME280 whose registers never change """
+    def __init__(self):
+        regs = bytearray(256)
+        regs[0x88:0x88 + 26] = pack('<HhhHhhhhhhhhBB', *(T + P + (0, H[0])))
+        h2, h3, h4, h5, h6 = H[1:]
+        regs[0xE1:0xE8] = pack('<hBbBbb', h2, h3, h4 >> 4, (h4 & 0xF) | ((h5 & 0xF) << 4), h5 >> 4, h6)
+        regs[0xF7:0xFA] = bytes(((RAW_PRESS >> 12) & 0xFF, (RAW_PRESS >> 4) & 0xFF, (RAW_PRESS & 0xF) << 4))
+        regs[0xFA:0xFD] = bytes(((RAW_TEMP >> 12) & 0xFF, (RAW_TEMP >> 4) & 0xFF, (RAW_TEMP & 0xF) << 4))
+        regs[0xFD:0xFF] = bytes(((RAW_HUM >> 8) & 0xFF, RAW_HUM & 0xFF))
+        self.regs = regs
+
+    def readfrom_mem(self, addr, reg, n):
+        return bytes(self.regs[reg:reg + n])
+
+    def readfrom_mem_into(self, addr, reg, buf):
+        for i in range(len(buf)):
+            buf[i] = self.regs[reg + i]
+
+    def writeto_mem(self, addr, reg, buf):
+        pass
+
+def allocated(read, reads):
+    """ Bytes allocated per read on MicroPython, bytes held after the reads on CPython """
+    if MICROPYTHON:
+        read()      # warm up, e.g. the pooled buffer of the bus
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        for _ in range(reads):
+            read()
+        after = gc.mem_alloc()
+        gc.enable()
+        return (after - before) / reads
+    tracemalloc.start()
+    read()          # warm up after start, the objects it replaces were not traced
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(reads):
+        read()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sensor = BME280Sensor(i2c=FixedBME280Bus())
+    fixed = array('i', [0] * 5)
+    compensated = array('i', [0, 0, 0])
+    print('%s, %d reads per path' % (sys.implementation.name, reads))
+    print('%-30s %10s' % ('path', 'B/read' if MICROPYTHON else 'B held'))
+    ok = True
+    for name, read, mustNotAllocate in (
+            ('getFixedValues(result)', lambda: sensor.getFixedValues(fixed), True),
+            ('read_compensated_data(result)', lambda: sensor.read_compensated_data(compensated), True),
+            ('collectValues()', sensor.collectValues, not MICROPYTHON),
+            ('getValues()', sensor.getValues, not MICROPYTHON),
+            ('read_compensated_data()', sensor.read_compensated_data, not MICROPYTHON)):
+        n = allocated(read, reads)
+        failed = mustNotAllocate and n > (0 if MICROPYTHON else HELD)
+        ok = ok and not failed
+        print('%-30s %10.1f%s' % (name, n, '  FAILED' if failed else ''))
+    print('OK' if ok else 'FAILED')
+    sys.exit(0 if ok else 1)
+
+main()
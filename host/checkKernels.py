@@ -0,0 +1,156 @@
+"""
+Module      checkKernels.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Differential test of the compensation kernels (lib/compensation.py)
+                - the kernels of compensationNative.py against the pure Python
+                  kernels, bit by bit, over random raw values of the full 20 bit
+                  (16 bit for the humidity) range and random calibration sets
+                - the pure Python BME280 kernel against a transcription of the
+                  C code of the datasheet with 32 and 64 bit integers, over raw
+                  values and calibrations of real sensors
+                - the SHT31 kernel over all raw words against the float formula
+            On the MicroPython unix port the native and viper kernels are compiled
+            to machine code, on CPython they run as Python (see sim).
+            The exit code is 1 when a kernel differs.
+
+Host        MicroPython unix port or CPython 3
+
+Usage       micropython host/checkKernels.py [cases]
+            python host/checkKernels.py [cases]
+"""
+import sys
+
+if sys.implementation.name == 'micropython':
+    sys.path.append(__file__.rsplit('/', 2)[0] + '/lib' if '/' in __file__ else '../lib')
+else:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import sim
+    sim.install()
+
+from array import array
+import compensation
+import compensationNative
+
+class XorShift:
+    """ Deterministic random numbers, the same on MicroPython and CPython """
+    def __init__(self, seed=2463534242):
+        self.x = seed
+
+    def next(self):
+        x = self.x
+        x ^= (x << 13) & 0xFFFFFFFF
+        x ^= x >> 17
+        x ^= (x << 5) & 0xFFFFFFFF
+        self.x = x
+        return x
+
+    def range(self, lo, hi):
+        return lo + self.next() % (hi - lo + 1)
+
+def s32(x):
+    x &= 0xFFFFFFFF
+    return x - 0x100000000 if x & 0x80000000 else x
+
+def s64(x):
+    x &= 0xFFFFFFFFFFFFFFFF
+    return x - 0x10000000000000000 if x & 0x8000000000000000 else x
+
+def cdiv(a, b):
+    """ Division of C, truncates towards 0 """
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+def referenceBME280(adcT, adcP, adcH, c):
+    """ bme280_compensate_T_int32(), _P_int64() and _H_int32() of the datasheet """
+    T1, T2, T3, P1, P2, P3, P4, P5, P6, P7, P8, P9, H1, H2, H3, H4, H5, H6 = c
+    var1 = s32(s32(s32((adcT >> 3) - s32(T1 << 1)) * T2) >> 11)
+    var2 = s32(s32(s32(s32((adcT >> 4) - T1) * s32((adcT >> 4) - T1)) >> 12) * T3) >> 14
+    tFine = s32(var1 + var2)
+    T = s32(tFine * 5 + 128) >> 8
+
+    var1 = s64(tFine - 128000)
+    var2 = s64(var1 * var1 * P6)
+    var2 = s64(var2 + s64(s64(var1 * P5) << 17))
+    var2 = s64(var2 + s64(P4 << 35))
+    var1 = s64((s64(var1 * var1 * P3) >> 8) + s64(s64(var1 * P2) << 12))
+    var1 = s64(s64(((1 << 47) + var1) * P1) >> 33)
+    if var1 == 0:
+        P = 0
+    else:
+        p = 1048576 - adcP
+        p = cdiv(s64(s64(s64(p << 31) - var2) * 3125), var1)
+        var1 = s64(s64(P9 * (p >> 13) * (p >> 13)) >> 25)
+        var2 = s64(P8 * p) >> 19
+        P = s64((s64(p + var1 + var2) >> 8) + s64(P7 << 4)) & 0xFFFFFFFF
+
+    v = s32(tFine - 76800)
+    v = s32(s32(s32(s32(s32(adcH << 14) - s32(H4 << 20) - s32(H5 * v)) + 16384) >> 15) *
+            s32(s32(s32(s32(s32(s32(s32(v * H6) >> 10) * s32(s32(s32(v * H3) >> 11) + 32768)) >> 10) +
+                        2097152) * H2 + 8192) >> 14))
+    v = s32(v - (s32(s32(s32((v >> 15) * (v >> 15)) >> 7) * H1) >> 4))
+    v = 0 if v < 0 else v
+    v = 419430400 if v > 419430400 else v
+    return T, P, (v >> 12) & 0xFFFFFFFF
+
+def randomCalibration(rnd):
+    """ Calibration words scattered around those of real sensors """
+    return (rnd.range(26000, 29500), rnd.range(25500, 27500), rnd.range(-1000, 1000),
+            rnd.range(35000, 39000), rnd.range(-11000, -10000), rnd.range(2500, 3500),
+            rnd.range(2000, 9000), rnd.range(-300, 300), rnd.range(-10, 10),
+            rnd.range(9000, 15600), rnd.range(-15000, -5000), rnd.range(4000, 6500),
+            rnd.range(0, 100), rnd.range(300, 400), rnd.range(0, 10),
+            rnd.range(250, 400), rnd.range(0, 60), rnd.range(20, 40))
+
+def checkBME280(cases, rnd):
+    native, python = compensationNative.bme280Compensate, compensation.bme280CompensatePy
+    a, b = array('i', [0, 0, 0]), array('i', [0, 0, 0])
+    raw = array('i', [0, 0, 0])
+    diffNative = diffReference = 0
+    for i in range(cases):
+        c = randomCalibration(rnd)
+        cal = compensation.bme280Calibration(*c)
+        # full range of the ADCs
+        raw[0], raw[1], raw[2] = rnd.range(0, 0xFFFFF), rnd.range(0, 0xFFFFF), rnd.range(0, 0xFFFF)
+        if native(raw, cal, a) != python(raw, cal, b) or list(a) != list(b):
+            diffNative += 1
+            if diffNative <= 3:
+                print('native differs', list(raw), c, list(a), list(b))
+        # range of real measurements, -40..85 °C, 300..1100 hPa
+        raw[0], raw[1], raw[2] = rnd.range(380000, 620000), rnd.range(250000, 600000), rnd.range(15000, 45000)
+        python(raw, cal, b)
+        ref = referenceBME280(raw[0], raw[1], raw[2], c)
+        if (b[0], b[1] & 0xFFFFFFFF, b[2]) != ref:
+            diffReference += 1
+            if diffReference <= 3:
+                print('reference differs', list(raw), c, list(b), ref)
+    print('BME280  %6d cases  native/python differ %d  python/datasheet differ %d' % (
+        cases, diffNative, diffReference))
+    return diffNative + diffReference
+
+def checkSHT31():
+    native, python = compensationNative.sht31Fixed, compensation.sht31FixedPy
+    a, b = array('i', [0, 0]), array('i', [0, 0])
+    diff = 0
+    maxErr = 0.0
+    for raw in range(65536):
+        native(raw, 65535 - raw, a)
+        python(raw, 65535 - raw, b)
+        if a[0] != b[0] or a[1] != b[1]:
+            diff += 1
+        err = abs(b[0] - (-4500 + 17500 * raw / 65536))
+        if err > maxErr:
+            maxErr = err
+    print('SHT31   %6d cases  native/python differ %d  max error of tC %.3f °C' % (65536, diff, maxErr / 100))
+    return diff
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print('kernels in use: %s' % compensation.BACKEND)
+    rnd = XorShift()
+    failed = checkBME280(cases, rnd) + checkSHT31()
+    print('FAILED' if failed else 'OK')
+    sys.exit(1 if failed else 0)
+
+main()
@@ -0,0 +1,224 @@
+"""
+Module      collector.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Collects the batches of many boards sent by lib/batchSender.py
+            over UDP and TCP and stores them in a ColumnStore (see
+            host/columnStore.py). The event loop only receives: the batches
+            are gathered into chunks of chunkBatches batches or chunkMs,
+            whichever comes first, and a chunk is decoded by a pool of
+            workers processes (decodeBatches()) into the columns of every
+            sensor. The columns are appended to the store by the event loop,
+            so the store has a single writer. With workers=0 the chunks are
+            decoded in the event loop.
+
+            A batch with a wrong magic, version or length is dropped and
+            counted in bad. The statistics batches, records, bad and chunks
+            count what was stored, drain() waits until every received batch
+            is stored, firstReceived is the perf_counter() of the first batch.
+            A chunk whose decoding or storing fails, e.g. a worker that died,
+            is reported on stderr and counted in droppedChunks, its batches
+            in droppedBatches.
+
+Host        CPython 3 with numpy
+
+Usage       python host/collector.py store [--port 8267] [--workers 4]
+
+            collector = Collector(ColumnStore('store'), workers=4)
+            await collector.start('0.0.0.0', 8267)
+"""
+import os
+import sys
+import time
+import struct
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from columnStore import ColumnStore, splitRecords, RECORD_DTYPE
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+from flashLog import RECORD_SIZE
+
+# the header of lib/batchSender.py, which needs the const() of MicroPython
+MAGIC = b'SB'
+VERSION = 1
+BATCH_FORMAT = '<2sBBHH'
+BATCH_HEADER_SIZE = struct.calcsize(BATCH_FORMAT)
+PORT = 8267
+
+def decodeBatches(batches):
+    """ Decodes a list of batches, returns ({sensor: {column: array}}, records, bad batches) """
+    header = struct.Struct(BATCH_FORMAT)
+    payloads = []
+    nodes = []
+    counts = []
+    bad = 0
+    for batch in batches:
+        if len(batch) < BATCH_HEADER_SIZE:
+            bad += 1
+            continue
+        magic, version, _, node, count = header.unpack_from(batch)
+        if magic != MAGIC or version != VERSION or len(batch) != BATCH_HEADER_SIZE + count * RECORD_SIZE:
+            bad += 1
+            continue
+        payloads.append(memoryview(batch)[BATCH_HEADER_SIZE:])
+        nodes.append(node)
+        counts.append(count)
+    if not payloads:
+        return {}, 0, bad
+    records = np.frombuffer(b''.join(payloads), dtype=RECORD_DTYPE)
+    return splitRecords(np.repeat(np.array(nodes, dtype='<u2'), counts), records), len(records), bad
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, collector):
+        self.collector = collector
+
+    def datagram_received(self, data, addr):
+        self.collector.received(data)
+
+class Collector:
+    def __init__(self, store, workers=4, chunkBatches=256, chunkMs=20):
+        self.store = store
+        self.workers = workers
+        self.chunkBatches = chunkBatches
+        self.chunkMs = chunkMs
+        self.batches = 0        # batches stored
+        self.records = 0        # records stored
+        self.bad = 0            # batches dropped
+        self.chunks = 0
+        self.droppedChunks = 0  # chunks lost by a failed decoding or store
+        self.droppedBatches = 0
+        self.firstReceived = None   # perf_counter() of the first batch
+        self._pool = ProcessPoolExecutor(workers) if workers else None
+        self._pending = []      # batches of the next chunk
+        self._decoding = set()  # futures of the chunks in the pool
+        self._servers = []
+        self._flusher = None
+
+    async def start(self, host='0.0.0.0', port=PORT, udp=True, tcp=True):
+        """ Listens on port for UDP datagrams and TCP connections, returns the ports bound """
+        loop = asyncio.get_running_loop()
+        ports = {}
+        if tcp:
+            server = await asyncio.start_server(self._serve, host, port)
+            self._servers.append(server)
+            ports['tcp'] = server.sockets[0].getsockname()[1]
+        if udp:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self), local_addr=(host, port if port else 0))
+            self._servers.append(transport)
+            ports['udp'] = transport.get_extra_info('sockname')[1]
+        self._flusher = asyncio.create_task(self._flushPeriodically())
+        return ports
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readexactly(BATCH_HEADER_SIZE)
+                magic, version, _, node, count = struct.unpack(BATCH_FORMAT, header)
+                if magic != MAGIC or version != VERSION:
+                    self.bad += 1
+                    break       # the stream is out of step
+                self.received(header + await reader.readexactly(count * RECORD_SIZE))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def received(self, batch):
+        if self.firstReceived is None:
+            self.firstReceived = time.perf_counter()
+        self._pending.append(batch)
+        if len(self._pending) >= self.chunkBatches:
+            self._submit()
+
+    async def _flushPeriodically(self):
+        while True:
+            await asyncio.sleep(self.chunkMs / 1000)
+            if self._pending:
+                self._submit()
+
+    def _submit(self):
+        batches, self._pending = self._pending, []
+        if self._pool is None:
+            try:
+                self._store(decodeBatches(batches), len(batches))
+            except Exception as e:
+                self._dropped(len(batches), e)
+            return
+        future = asyncio.get_running_loop().run_in_executor(self._pool, decodeBatches, batches)
+        self._decoding.add(future)
+        future.add_done_callback(lambda f: self._decoded(f, len(batches)))
+
+    def _decoded(self, future, nBatches):
+        self._decoding.discard(future)
+        try:
+            self._store(future.result(), nBatches)
+        except (Exception, asyncio.CancelledError) as e:
+            self._dropped(nBatches, e)
+
+    def _dropped(self, nBatches, e):
+        self.droppedChunks += 1
+        self.droppedBatches += nBatches
+        print('chunk of %d batches dropped: %s: %s' % (nBatches, type(e).__name__, e), file=sys.stderr, flush=True)
+
+    def _store(self, result, nBatches):
+        columns, records, bad = result
+        self.store.append(columns)
+        self.batches += nBatches - bad
+        self.records += records
+        self.bad += bad
+        self.chunks += 1
+
+    async def drain(self):
+        """ Waits until every batch received so far is stored """
+        if self._pending:
+            self._submit()
+        while self._decoding:
+            await asyncio.wait(set(self._decoding))
+            await asyncio.sleep(0)  # lets the done callbacks run
+        self.store.flush()
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+        self._servers = []
+        if self._flusher is not None:
+            self._flusher.cancel()
+        await self.drain()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description='Collects the readings of the boards')
+    parser.add_argument('directory', help='folder of the column store')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    async def run():
+        store = ColumnStore(args.directory)
+        collector = Collector(store, workers=args.workers)
+        ports = await collector.start(args.host, args.port)
+        print('collecting on %s' % ', '.join('%s %d' % p for p in ports.items()), flush=True)
+        try:
+            while True:
+                await asyncio.sleep(60)
+                await collector.drain()
+                print('%d batches, %d records, %d bad, %d chunks dropped' % (
+                    collector.batches, collector.records, collector.bad, collector.droppedChunks))
+        finally:
+            await collector.close()
+            store.close()
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+Module      columnStore.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Append-only columnar storage of the readings of many boards,
+            written by host/collector.py. Every sensor has a folder with one
+            file per column, a plain little-endian typed array
+                time.col    <u4     time.time() of the board
+                node.col    <u2     number of the board
+                tC.col ...  the packed integers of the flash log record
+                            (see flashLog.FIELDS), value = integer / scale
+            A sensor gets a row only when it delivered values, its flag in the
+            record is not set. After a crash columns longer than the shortest
+            one of their sensor (a torn append) are cut back on opening.
+
+            Queries memory-map the columns and scan them with numpy. The time
+            range of every full block of blockRows rows is computed on the
+            first query and kept, so a range query only scans the blocks that
+            overlap the range and the open block at the end. The rows arrive
+            about in time order, so a query of the last hour scans a block or
+            two regardless of the retention.
+                - query(sensor, t0, t1, node=None)
+                        dict {column: array} of the rows with t0 <= time < t1
+                - aggregate(sensor, column, t0, t1, node=None, bucketS=None)
+                        (count, min, max, mean) of the scaled values, or with
+                        bucketS arrays (start, count, min, max, mean) per bucket
+
+Host        CPython 3 with numpy
+
+Usage       python host/columnStore.py store sht31 tC [--hours 24] [--node 7] [--bucket 3600]
+
+            from columnStore import ColumnStore
+            store = ColumnStore('store')
+            print(store.aggregate('sht31', 'tC', t0, t1))
+"""
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from readFlashLog import recordDtype, FIELDS
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+from flashLog import FLAG_DHT11, FLAG_DHT22, FLAG_DS18B20, FLAG_SHT31, FLAG_BME280
+
+RECORD_DTYPE = recordDtype()
+SENSOR_FLAGS = (('dht11', FLAG_DHT11), ('dht22', FLAG_DHT22), ('ds18b20', FLAG_DS18B20),
+                ('sht31', FLAG_SHT31), ('bme280', FLAG_BME280))
+# sensor: ((column, field of the record, scale), ...)
+SENSOR_FIELDS = {sensor: tuple((name[len(sensor) + 1:], name, scale) for name, scale in FIELDS
+                               if name.startswith(sensor + '_'))
+                 for sensor, _ in SENSOR_FLAGS}
+KEY_COLUMNS = (('time', '<u4'), ('node', '<u2'))
+
+def columnsOf(sensor):
+    """ (column, dtype) of the files of a sensor """
+    return KEY_COLUMNS + tuple((column, RECORD_DTYPE[field].str) for column, field, _ in SENSOR_FIELDS[sensor])
+
+def scaleOf(sensor, column):
+    for name, _, scale in SENSOR_FIELDS[sensor]:
+        if name == column:
+            return scale
+    return 1
+
+def splitRecords(nodes, records):
+    """ Splits flash log records by sensor: {sensor: {column: array}} of the rows with values """
+    flags = records['flags']
+    result = {}
+    for sensor, flag in SENSOR_FLAGS:
+        valid = (flags & flag) == 0
+        if not valid.any():
+            continue
+        columns = {'time': records['time'][valid], 'node': nodes[valid].astype('<u2')}
+        for column, field, _ in SENSOR_FIELDS[sensor]:
+            columns[column] = records[field][valid]
+        result[sensor] = columns
+    return result
+
+class ColumnStore:
+    def __init__(self, directory, blockRows=65536):
+        self.directory = directory
+        self.blockRows = blockRows
+        self._files = {}        # (sensor, column): file opened for appending
+        self._rows = {}         # sensor: rows
+        self._maps = {}         # sensor: (rows, {column: memmap})
+        self._zones = {}        # sensor: [(min time, max time)] of the full blocks
+        for sensor, _ in SENSOR_FLAGS:
+            folder = os.path.join(directory, sensor)
+            os.makedirs(folder, exist_ok=True)
+            rows = min(self._size(sensor, column) // np.dtype(dtype).itemsize
+                       for column, dtype in columnsOf(sensor))
+            for column, dtype in columnsOf(sensor):
+                path = self._path(sensor, column)
+                if self._size(sensor, column) > rows * np.dtype(dtype).itemsize:
+                    os.truncate(path, rows * np.dtype(dtype).itemsize)
+                self._files[sensor, column] = open(path, 'ab')
+            self._rows[sensor] = rows
+            self._zones[sensor] = []
+
+    def _path(self, sensor, column):
+        return os.path.join(self.directory, sensor, column + '.col')
+
+    def _size(self, sensor, column):
+        try:
+            return os.path.getsize(self._path(sensor, column))
+        except OSError:
+            return 0
+
+    def rows(self, sensor):
+        return self._rows[sensor]
+
+    def latest(self, sensor):
+        """ Time of the last row appended, None when there is none """
+        times = self._columns(sensor)['time']
+        return int(times[-1]) if len(times) else None
+
+    def append(self, columns):
+        """ Appends {sensor: {column: array}}, e.g. of splitRecords() """
+        for sensor, arrays in columns.items():
+            n = len(arrays['time'])
+            for column, dtype in columnsOf(sensor):
+                self._files[sensor, column].write(np.ascontiguousarray(arrays[column], dtype=dtype).tobytes())
+            self._rows[sensor] += n
+
+    def appendRecords(self, nodes, records):
+        self.append(splitRecords(nodes, records))
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+        self._maps = {}
+
+    def _columns(self, sensor):
+        """ Memory maps of the columns of a sensor, renewed when rows were appended """
+        rows = self._rows[sensor]
+        cached = self._maps.get(sensor)
+        if cached is not None and cached[0] == rows:
+            return cached[1]
+        self.flush()
+        maps = {}
+        for column, dtype in columnsOf(sensor):
+            if rows:
+                maps[column] = np.memmap(self._path(sensor, column), dtype=dtype, mode='r', shape=(rows,))
+            else:
+                maps[column] = np.zeros(0, dtype=dtype)
+        self._maps[sensor] = (rows, maps)
+        return maps
+
+    def _blocks(self, sensor, t0, t1):
+        """ Yields the (start, end) of the row ranges that may hold times within t0..t1 """
+        times = self._columns(sensor)['time']
+        zones = self._zones[sensor]
+        full = len(times) // self.blockRows
+        while len(zones) < full:    # time range of the blocks filled since the last query
+            block = times[len(zones) * self.blockRows:(len(zones) + 1) * self.blockRows]
+            zones.append((int(block.min()), int(block.max())))
+        start = None
+        for i, (lo, hi) in enumerate(zones):
+            if hi >= t0 and lo < t1:
+                if start is None:
+                    start = i * self.blockRows
+            elif start is not None:
+                yield start, i * self.blockRows
+                start = None
+        if start is None:
+            start = full * self.blockRows
+        if start < len(times):
+            yield start, len(times)
+
+    def query(self, sensor, t0, t1, node=None):
+        """ {column: array} of the rows with t0 <= time < t1, of one node or all """
+        columns = self._columns(sensor)
+        parts = []
+        for start, end in self._blocks(sensor, t0, t1):
+            times = columns['time'][start:end]
+            mask = (times >= t0) & (times < t1)
+            if node is not None:
+                mask &= columns['node'][start:end] == node
+            index = np.flatnonzero(mask) + start
+            if len(index):
+                parts.append(index)
+        index = np.concatenate(parts) if parts else np.zeros(0, dtype=np.intp)
+        return {column: np.asarray(array[index]) for column, array in columns.items()}
+
+    def aggregate(self, sensor, column, t0, t1, node=None, bucketS=None):
+        """ (count, min, max, mean) of the scaled values, per bucket of bucketS seconds as arrays """
+        rows = self.query(sensor, t0, t1, node)
+        values = rows[column].astype(np.float64) / scaleOf(sensor, column)
+        if bucketS is None:
+            if len(values) == 0:
+                return 0, None, None, None
+            return len(values), values.min(), values.max(), values.mean()
+        keys = (rows['time'] - t0) // bucketS
+        order = np.argsort(keys, kind='stable')
+        keys, values = keys[order], values[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.intp)
+        counts = np.diff(np.r_[starts, len(keys)])
+        return (t0 + keys[starts] * bucketS, counts,
+                np.minimum.reduceat(values, starts) if len(starts) else values,
+                np.maximum.reduceat(values, starts) if len(starts) else values,
+                np.add.reduceat(values, starts) / counts if len(starts) else values)
+
+def main():
+    parser = argparse.ArgumentParser(description='Queries the column store of the collector')
+    parser.add_argument('directory')
+    parser.add_argument('sensor', choices=[sensor for sensor, _ in SENSOR_FLAGS])
+    parser.add_argument('column')
+    parser.add_argument('--hours', type=float, default=24, help='the last hours up to the newest row')
+    parser.add_argument('--node', type=int)
+    parser.add_argument('--bucket', type=int, help='seconds per bucket')
+    args = parser.parse_args()
+    store = ColumnStore(args.directory)
+    latest = store.latest(args.sensor)     # the clock of the boards, not of the PC
+    t1 = (latest if latest is not None else int(time.time())) + 1
+    t0 = t1 - int(args.hours * 3600)
+    result = store.aggregate(args.sensor, args.column, t0, t1, args.node, args.bucket)
+    if args.bucket is None:
+        print('count %d, min %s, max %s, mean %s' % result)
+    else:
+        print('start,count,min,max,mean')
+        for row in zip(*result):
+            print('%d,%d,%g,%g,%.3f' % row)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Module      loadGenerator.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Simulated boards for host/collector.py. Every node sends the
+            readings of its five sensors with lib/batchSender.py, as a board
+            does, in batches of batchRecords records. The readings are
+            synthetic: a daily temperature wave with an offset per node,
+            humidity and pressure waves, and failed reads of the DHT11 (2 %)
+            and the DHT22 (1 %). The time of the records starts at start and
+            advances periodS per record, so a run sends days of history in
+            seconds. The batches of all records are packed first and then
+            sent as fast as possible, round robin over the nodes, every node
+            on its own TCP connection or UDP socket. generate() spreads the
+            nodes over processes.
+
+Host        CPython 3
+
+Usage       python host/loadGenerator.py [--nodes 32] [--records 1000] [--tcp]
+                                         [--host 127.0.0.1] [--port 8267]
+"""
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sim
+sim.install()       # const() of MicroPython for lib/batchSender.py
+
+import socket
+from batchSender import BatchSender, PORT, packBatch, BATCH_HEADER_SIZE
+from flashLog import RECORD_SIZE
+
+START = 1700000000  # time of the first record
+
+def readings(node, i, t, rnd):
+    """ Value lists of the drivers of node at record i, None for a failed read """
+    day = 2 * math.pi * (t % 86400) / 86400
+    tC = 20 + node % 7 + 4 * math.sin(day) + rnd.random() * 0.2
+    rH = 50 - 10 * math.sin(day) + rnd.random()
+    airPres = 965 + 5 * math.sin(2 * math.pi * t / (3.5 * 86400) + node)
+    dht11 = None if rnd.random() < 0.02 else [round(tC), 0, round(rH), 0]
+    dht22 = None if rnd.random() < 0.01 else [tC + 0.1, 0, rH + 1, 0]
+    return dht11, dht22, [tC - 0.2, 0], [tC, 0, rH, 0], [tC + 0.3, 0, rH - 2, 0, airPres, 0, 0]
+
+class _PackingSender(BatchSender):
+    """ Keeps the batches instead of sending them """
+    def __init__(self, *args, **kwargs):
+        BatchSender.__init__(self, *args, **kwargs)
+        self.batches = []
+
+    def send(self):
+        if self._count == 0:
+            return
+        packBatch(self._buffer, self.node, self._count)
+        self.batches.append(bytes(self._buffer[:BATCH_HEADER_SIZE + self._count * RECORD_SIZE]))
+        self.sent += self._count
+        self._count = 0
+
+def runNodes(host, port, nodes, records, tcp=False, batchRecords=50, periodS=60, start=START, seed=0):
+    """ Packs records records of every node in nodes, sends them round robin,
+        returns the records sent and the perf_counter() when the sending started
+    """
+    rnd = random.Random(seed)
+    senders = [_PackingSender(host, port, node=node, maxRecords=batchRecords) for node in nodes]
+    for i in range(records):
+        t = start + i * periodS
+        for sender in senders:
+            sender.append(t, *readings(sender.node, i, t, rnd))
+    for sender in senders:
+        sender.send()
+    address = socket.getaddrinfo(host, port)[0][-1]
+    started = time.perf_counter()
+    if tcp:
+        sockets = [socket.create_connection(address) for _ in senders]
+    else:
+        sockets = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in senders]
+    for i in range(max(len(sender.batches) for sender in senders)):
+        for sender, sock in zip(senders, sockets):
+            if i < len(sender.batches):
+                if tcp:
+                    sock.sendall(sender.batches[i])
+                else:
+                    sock.sendto(sender.batches[i], address)
+    for sock in sockets:
+        sock.close()
+    return sum(sender.sent for sender in senders), started
+
+def generate(host, port, nodes, records, tcp=False, processes=None, **kwargs):
+    """ Runs nodes simulated boards in processes, returns the records sent and when the sending started """
+    processes = min(nodes, processes or os.cpu_count())
+    slices = [list(range(p, nodes, processes)) for p in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = [pool.apply_async(runNodes, (host, port, part, records, tcp), dict(kwargs, seed=p))
+                   for p, part in enumerate(slices)]
+        results = [r.get() for r in results]
+    return sum(sent for sent, _ in results), min(started for _, started in results)
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated boards sending batches to the collector')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--nodes', type=int, default=32)
+    parser.add_argument('--records', type=int, default=1000, help='records per node')
+    parser.add_argument('--tcp', action='store_true')
+    args = parser.parse_args()
+    print('%d records sent' % generate(args.host, args.port, args.nodes, args.records, args.tcp)[0])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Module      psychrometricsArray.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     numpy versions of the functions of lib/psychrometrics.py, they
+            process whole arrays of logged readings at once with the same
+            constants and the same limits of the relative humidity:
+                - dewPointArray(tC, rH)         dew point in °C
+                - vapourPressureArray(tC, rH)   vapour pressure in hPa
+                - absoluteHumidityArray(tC, rH) absolute humidity in g/m³
+                - heatIndexArray(tC, rH)        heat index in °C
+
+Host        CPython 3 with numpy
+
+Usage       from psychrometricsArray import dewPointArray
+            dP = dewPointArray(readings['tC'], readings['rH'])
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+from psychrometrics import RH_MIN, _A, _B, _E0     # the Magnus constants of the drivers
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def _requireNumpy():
+    if np is None:
+        raise ImportError('numpy is required for the array functions')
+
+def dewPointArray(tC, rH):
+    _requireNumpy()
+    tC = np.asarray(tC, dtype=np.float64)
+    rH = np.clip(np.asarray(rH, dtype=np.float64), RH_MIN, 100.0)
+    k = np.log(rH / 100) + (_A * tC) / (_B + tC)
+    return _B * k / (_A - k)
+
+def vapourPressureArray(tC, rH):
+    _requireNumpy()
+    tC = np.asarray(tC, dtype=np.float64)
+    rH = np.clip(np.asarray(rH, dtype=np.float64), RH_MIN, 100.0)
+    return rH / 100 * _E0 * np.exp(_A * tC / (_B + tC))
+
+def absoluteHumidityArray(tC, rH):
+    _requireNumpy()
+    tC = np.asarray(tC, dtype=np.float64)
+    return 216.7 * vapourPressureArray(tC, rH) / (273.15 + tC)
+
+def heatIndexArray(tC, rH):
+    _requireNumpy()
+    t = np.asarray(tC, dtype=np.float64) * 1.8 + 32.0
+    rH = np.clip(np.asarray(rH, dtype=np.float64), RH_MIN, 100.0)
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rH * 0.094)
+    hi = (-42.379 + 2.04901523 * t + 10.14333127 * rH
+          - 0.22475541 * t * rH - 0.00683783 * t * t
+          - 0.05481717 * rH * rH + 0.00122874 * t * t * rH
+          + 0.00085282 * t * rH * rH - 0.00000199 * t * t * rH * rH)
+    dry = (rH < 13.0) & (t >= 80.0) & (t <= 112.0)
+    hi = np.where(dry, hi - (13.0 - rH) / 4 * np.sqrt(np.clip(17.0 - np.abs(t - 95.0), 0, None) / 17), hi)
+    wet = (rH > 85.0) & (t >= 80.0) & (t <= 87.0)
+    hi = np.where(wet, hi + (rH - 85.0) / 10 * (87.0 - t) / 5, hi)
+    hi = np.where((simple + t) / 2 >= 80.0, hi, simple)
+    return (hi - 32.0) / 1.8
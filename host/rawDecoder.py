@@ -0,0 +1,243 @@
+"""
+Module      rawDecoder.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Converts the raw frames recorded by lib/rawCapture.py on a PC.
+            The BME280 compensation of the datasheet runs as numpy int64
+            vector operations on all frames of a sensor at once and gives the
+            same integers as the kernel of the driver (lib/compensation.py),
+            the SHT31 conversion and its CRC check are vectorized likewise.
+                - readFrames(source)    structured array of the frames of a file
+                                        (memory-mapped) or of a buffer
+                - calibrations(frames)  {(address, record index): calibration words}
+                - decodeBME280(frames)  dict of arrays: time, address, seq and
+                                        temp, press, hum (the integers of the kernel),
+                                        tC, tF, rH, dP, airPres (hPa) as the driver
+                - decodeSHT31(frames)   dict of arrays: time, address, seq, valid (CRC),
+                                        tCraw, rHraw, tC, tF, rH, dP as the driver
+            Without numpy, decodeBME280Scalar() and decodeSHT31Scalar() convert
+            frame by frame with the kernels of the driver, e.g. as reference.
+
+Host        CPython 3 with numpy
+
+Usage       python host/rawDecoder.py raw.bin > readings.csv
+
+            from rawDecoder import readFrames, decodeBME280
+            bme = decodeBME280(readFrames('raw.bin'))
+            print(bme['airPres'].mean())
+"""
+import sys
+import os
+import struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+import builtins
+builtins.const = getattr(builtins, 'const', lambda x: x)   # used by the modules of lib
+from rawCapture import FRAME_FORMAT, FRAME_SIZE, KIND_BME280, KIND_SHT31, KIND_CALIBRATION, CALIBRATION_SIZE
+from compensation import bme280Calibration, bme280CompensatePy
+from psychrometrics import fahrenheit
+from psychrometricsArray import dewPointArray
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FRAME_DTYPE = None
+if np is not None:
+    FRAME_DTYPE = np.dtype([('kind', 'u1'), ('address', 'u1'), ('seq', '<u2'),
+                            ('time', '<u4'), ('payload', 'u1', (8,))])
+    assert FRAME_DTYPE.itemsize == FRAME_SIZE
+
+def _crcTable():
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return table
+
+CRC8_TABLE = _crcTable()
+
+def calibrationWords(block):
+    """ The calibration words dig_T1..dig_H6 of the 33 byte calibration block """
+    T1, T2, T3, P1, P2, P3, P4, P5, P6, P7, P8, P9, _, H1 = struct.unpack_from('<HhhHhhhhhhhhBB', block)
+    H2, H3 = struct.unpack_from('<hB', block, 26)
+    e5 = block[30]
+    H4 = (struct.unpack_from('<b', block, 29)[0] << 4) | (e5 & 0xF)
+    H5 = (struct.unpack_from('<b', block, 31)[0] << 4) | (e5 >> 4)
+    H6 = struct.unpack_from('<b', block, 32)[0]
+    return (T1, T2, T3, P1, P2, P3, P4, P5, P6, P7, P8, P9, H1, H2, H3, H4, H5, H6)
+
+def readFrames(source):
+    """ Frames of a file name (memory-mapped) or a bytes-like buffer, a torn frame at the end is ignored """
+    if np is None:
+        raise ImportError('numpy is required for readFrames()')
+    if isinstance(source, (str, os.PathLike)):
+        n = os.path.getsize(source) // FRAME_SIZE
+        if n == 0:
+            return np.zeros(0, dtype=FRAME_DTYPE)
+        return np.memmap(source, dtype=FRAME_DTYPE, mode='r', shape=(n,))
+    n = len(source) // FRAME_SIZE
+    return np.frombuffer(source, dtype=FRAME_DTYPE, count=n)
+
+def iterFrames(source):
+    """ Frames as tuples (kind, address, seq, time, payload), without numpy """
+    data = source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            data = f.read()
+    usable = len(data) - len(data) % FRAME_SIZE
+    return struct.iter_unpack(FRAME_FORMAT, memoryview(data)[:usable])
+
+def _calibrationsOf(frames):
+    """ Yields (record index, address, calibration words) of the complete calibration records """
+    chunks = {}
+    for i, (kind, address, seq, t, payload) in frames:
+        if kind != KIND_CALIBRATION:
+            continue
+        if seq == 0:
+            chunks[address] = [bytes(payload)]
+        elif address in chunks and len(chunks[address]) == seq:
+            chunks[address].append(bytes(payload))
+            if seq == 4:
+                block = b''.join(chunks.pop(address))[:CALIBRATION_SIZE]
+                yield i, address, calibrationWords(block)
+
+def calibrations(frames):
+    """ {(address, index of the last chunk): calibration words} of a frame array """
+    positions = np.flatnonzero(frames['kind'] == KIND_CALIBRATION)
+    sub = frames[positions]
+    rows = ((int(i), (int(k), int(a), int(s), int(t), p.tobytes()))
+            for i, k, a, s, t, p in zip(positions, sub['kind'], sub['address'], sub['seq'], sub['time'], sub['payload']))
+    return {(address, i): words for i, address, words in _calibrationsOf(rows)}
+
+def bme280CompensateArray(adcT, adcP, adcH, words):
+    """ The compensation of the datasheet with int64 arrays, returns temp, press, hum """
+    T1, T2, T3, P1, P2, P3, P4, P5, P6, P7, P8, P9, H1, H2, H3, H4, H5, H6 = (np.int64(w) for w in words)
+    adcT = adcT.astype(np.int64)
+    adcP = adcP.astype(np.int64)
+    adcH = adcH.astype(np.int64)
+    # temperature
+    var1 = (((adcT >> 3) - (T1 << 1)) * T2) >> 11
+    d = (adcT >> 4) - T1
+    var2 = (((d * d) >> 12) * T3) >> 14
+    tFine = var1 + var2
+    temp = (tFine * 5 + 128) >> 8
+
+    # pressure
+    var1 = tFine - 128000
+    var2 = var1 * var1 * P6
+    var2 = var2 + ((var1 * P5) << 17)
+    var2 = var2 + (P4 << 35)
+    var1 = ((var1 * var1 * P3) >> 8) + ((var1 * P2) << 12)
+    var1 = (((np.int64(1) << 47) + var1) * P1) >> 33
+    zero = var1 == 0
+    p = 1048576 - adcP
+    p = (((p << 31) - var2) * 3125) // np.where(zero, 1, var1)
+    var1 = (P9 * (p >> 13) * (p >> 13)) >> 25
+    var2 = (P8 * p) >> 19
+    press = np.where(zero, 0, ((p + var1 + var2) >> 8) + (P7 << 4))
+
+    # humidity
+    h = tFine - 76800
+    h = (((((adcH << 14) - (H4 << 20) - (H5 * h)) + 16384) >> 15) *
+         (((((((h * H6) >> 10) * (((h * H3) >> 11) + 32768)) >> 10) + 2097152) * H2 + 8192) >> 14))
+    h = h - (((((h >> 15) * (h >> 15)) >> 7) * H1) >> 4)
+    h = np.clip(h, 0, 419430400)
+    return temp, press, h >> 12
+
+def _bme280Raw(payload):
+    p = payload.astype(np.int64)
+    adcP = ((p[:, 0] << 16) | (p[:, 1] << 8) | p[:, 2]) >> 4
+    adcT = ((p[:, 3] << 16) | (p[:, 4] << 8) | p[:, 5]) >> 4
+    adcH = (p[:, 6] << 8) | p[:, 7]
+    return adcT, adcP, adcH
+
+def decodeBME280(frames):
+    """ Compensates all BME280 frames with the calibration recorded before them """
+    positions = np.flatnonzero(frames['kind'] == KIND_BME280)
+    sub = frames[positions]
+    temp = np.zeros(len(sub), dtype=np.int64)
+    press = np.zeros(len(sub), dtype=np.int64)
+    hum = np.zeros(len(sub), dtype=np.int64)
+    calibrated = np.zeros(len(sub), dtype=bool)
+    adcT, adcP, adcH = _bme280Raw(sub['payload'])
+    cals = sorted(calibrations(frames).items(), key=lambda item: item[0][1])
+    for n, ((address, start), words) in enumerate(cals):
+        # frames of this address after this calibration and before the next one of the address
+        end = next((s for (a, s), _ in cals[n + 1:] if a == address), len(frames))
+        sel = (sub['address'] == address) & (positions > start) & (positions < end)
+        if sel.any():
+            temp[sel], press[sel], hum[sel] = bme280CompensateArray(adcT[sel], adcP[sel], adcH[sel], words)
+            calibrated |= sel
+    tC = temp / 100
+    rH = hum / 1024
+    return {
+        'time': sub['time'], 'address': sub['address'], 'seq': sub['seq'], 'calibrated': calibrated,
+        'temp': temp, 'press': press, 'hum': hum,
+        'tC': tC, 'tF': fahrenheit(tC), 'rH': rH, 'dP': dewPointArray(tC, rH), 'airPres': press / 25600,
+        }
+
+def decodeSHT31(frames):
+    """ Converts all SHT31 frames, valid is False for a CRC mismatch """
+    sub = frames[frames['kind'] == KIND_SHT31]
+    p = sub['payload']
+    table = np.array(CRC8_TABLE, dtype=np.uint8)
+    valid = ((table[table[0xFF ^ p[:, 0]] ^ p[:, 1]] == p[:, 2]) &
+             (table[table[0xFF ^ p[:, 3]] ^ p[:, 4]] == p[:, 5]))
+    tCraw = (p[:, 0].astype(np.int64) << 8) + p[:, 1]
+    rHraw = (p[:, 3].astype(np.int64) << 8) + p[:, 4]
+    tC = -45 + (175 * (tCraw / 65535))
+    rH = 100 * rHraw / 65535
+    return {
+        'time': sub['time'], 'address': sub['address'], 'seq': sub['seq'], 'valid': valid,
+        'tCraw': tCraw, 'rHraw': rHraw,
+        'tC': tC, 'tF': fahrenheit(tC), 'rH': rH, 'dP': dewPointArray(tC, rH),
+        }
+
+def decodeBME280Scalar(source):
+    """ Yields (time, address, temp, press, hum) frame by frame with the kernel of the driver """
+    cal = {}
+    result = [0, 0, 0]
+    frames = list(enumerate(iterFrames(source)))
+    complete = {i: (address, words) for i, address, words in _calibrationsOf(frames)}
+    for i, (kind, address, seq, t, payload) in frames:
+        if i in complete:
+            a, words = complete[i]
+            cal[a] = bme280Calibration(*words)
+        elif kind == KIND_BME280 and address in cal:
+            r = payload
+            raw = (((r[3] << 16) | (r[4] << 8) | r[5]) >> 4,
+                   ((r[0] << 16) | (r[1] << 8) | r[2]) >> 4,
+                   (r[6] << 8) | r[7])
+            bme280CompensatePy(raw, cal[address], result)
+            yield t, address, result[0], result[1], result[2]
+
+def decodeSHT31Scalar(source):
+    """ Yields (time, address, valid, tC, rH) frame by frame as the driver """
+    t8 = CRC8_TABLE
+    for kind, address, seq, t, r in iterFrames(source):
+        if kind == KIND_SHT31:
+            valid = t8[t8[0xFF ^ r[0]] ^ r[1]] == r[2] and t8[t8[0xFF ^ r[3]] ^ r[4]] == r[5]
+            tCraw, rHraw = (r[0] << 8) + r[1], (r[3] << 8) + r[4]
+            yield t, address, valid, -45 + (175 * (tCraw / 65535)), 100 * rHraw / 65535
+
+def main():
+    if len(sys.argv) != 2:
+        print('usage: python rawDecoder.py <raw file>', file=sys.stderr)
+        sys.exit(1)
+    frames = readFrames(sys.argv[1])
+    print('sensor,time,address,tC,rH,dP,airPres')
+    bme = decodeBME280(frames)
+    for i in np.flatnonzero(bme['calibrated']):
+        print('BME280,%d,0x%02x,%.2f,%.2f,%.2f,%.2f' % (
+            bme['time'][i], bme['address'][i], bme['tC'][i], bme['rH'][i], bme['dP'][i], bme['airPres'][i]))
+    sht = decodeSHT31(frames)
+    for i in np.flatnonzero(sht['valid']):
+        print('SHT31,%d,0x%02x,%.2f,%.2f,%.2f,' % (
+            sht['time'][i], sht['address'][i], sht['tC'][i], sht['rH'][i], sht['dP'][i]))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Module      readFlashLog.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Reads the segments written by lib/flashLog.py on a PC, e.g. after
+            copying the folder /log from the board with
+                mpremote cp -r :/log .
+            readRecords() streams the records of all segments as tuples of
+            floats (see flashLog.FIELDS) by memory-mapping the segment files.
+            The segments consist of blocks of the blockSize kept in the index,
+            the records of a block followed by padding, which is skipped.
+            readArray() returns all records as a numpy structured array, with
+            the raw integer fields, when numpy is installed.
+
+Host        CPython 3
+
+Usage       python host/readFlashLog.py log > readings.csv
+
+            from readFlashLog import readRecords
+            for r in readRecords('log'):
+                print(r[0], r[6])   # time, sht31_tC
+"""
+import sys
+import os
+import mmap
+import struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib'))
+from flashLog import RECORD_FORMAT, RECORD_SIZE, FIELDS, INDEX_FORMAT, segmentName
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+BLOCK_SIZE = 4096   # the default of FlashLog, for a log without index
+
+def readIndex(directory):
+    """ (first segment, current segment, blockSize) of the index, None without index """
+    index = os.path.join(directory, 'index')
+    if not os.path.exists(index):
+        return None
+    with open(index, 'rb') as f:
+        data = f.read()
+    if len(data) != struct.calcsize(INDEX_FORMAT):
+        raise ValueError('index of %d bytes does not match the layout %s' % (len(data), INDEX_FORMAT))
+    first, current, recordSize, blockSize = struct.unpack(INDEX_FORMAT, data)
+    if recordSize != RECORD_SIZE:
+        raise ValueError('record size %d of the log does not match %d' % (recordSize, RECORD_SIZE))
+    return first, current, blockSize
+
+def blockSize(directory):
+    index = readIndex(directory)
+    return BLOCK_SIZE if index is None else index[2]
+
+def segmentFiles(directory):
+    """ Segment files in the order they were written """
+    index = readIndex(directory)
+    if index is not None:
+        names = [segmentName(n) for n in range(index[0], index[1] + 1)]
+    else:
+        names = sorted(n for n in os.listdir(directory) if n.startswith('seg') and n.endswith('.bin'))
+    return [os.path.join(directory, n) for n in names if os.path.exists(os.path.join(directory, n))]
+
+def readRawRecords(directory):
+    """ Yields the records as tuples of the packed integers """
+    record = struct.Struct(RECORD_FORMAT)
+    block = blockSize(directory)
+    recordBytes = block // RECORD_SIZE * RECORD_SIZE    # of a block, without the padding
+    for path in segmentFiles(directory):
+        size = os.path.getsize(path)
+        if size == 0:
+            continue
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m, memoryview(m) as view:
+            for offset in range(0, size, block):
+                n = min(recordBytes, size - offset)
+                yield from record.iter_unpack(view[offset:offset + n - n % RECORD_SIZE])    # ignore a torn record
+
+def readRecords(directory):
+    """ Yields the records as tuples of the scaled values """
+    scales = [scale for _, scale in FIELDS]
+    for raw in readRawRecords(directory):
+        yield tuple(v / s if s != 1 else v for v, s in zip(raw, scales))
+
+def recordDtype():
+    """ numpy dtype of a record with the packed integer fields """
+    if np is None:
+        raise ImportError('numpy is required for recordDtype()')
+    codes = {'h': '<i2', 'H': '<u2', 'i': '<i4', 'I': '<u4'}
+    return np.dtype([(name, codes[code]) for (name, _), code in zip(FIELDS, RECORD_FORMAT.lstrip('<'))])
+
+def readArray(directory):
+    """ All records as numpy structured array with the packed integer fields """
+    dtype = recordDtype()
+    block = blockSize(directory)
+    perBlock = block // RECORD_SIZE
+    parts = []
+    for path in segmentFiles(directory):
+        size = os.path.getsize(path)
+        if size == 0:
+            continue
+        raw = np.memmap(path, dtype=np.uint8, mode='r')
+        blocks = size // block
+        full = raw[:blocks * block].reshape(blocks, block)[:, :perBlock * RECORD_SIZE]
+        parts.append(np.ascontiguousarray(full).view(dtype).reshape(-1))
+        n = min(perBlock, (size - blocks * block) // RECORD_SIZE)   # records of the last block
+        parts.append(np.array(raw[blocks * block:blocks * block + n * RECORD_SIZE]).view(dtype))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+def main():
+    if len(sys.argv) != 2:
+        print('usage: python readFlashLog.py <log directory>', file=sys.stderr)
+        sys.exit(1)
+    print(','.join(name for name, _ in FIELDS))
+    for r in readRecords(sys.argv[1]):
+        print(','.join(str(v) for v in r))
+
+if __name__ == '__main__':
+    main()
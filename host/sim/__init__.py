@@ -0,0 +1,83 @@
+"""
+Module      sim
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Simulated hardware to run the drivers and main.py with CPython on
+            a PC. install() registers stand-ins for the micropython modules
+                machine     Pin, I2C, RTC, UART, deepsleep(), reset_cause()
+                dht         DHT11, DHT22
+                onewire     OneWire
+                ds18x20     DS18X20
+                micropython const, native, viper
+                ustruct     alias of struct
+            adds const() and the viper casts ptr8(), ptr16(), ptr32() to the
+            builtins, adds ticks_ms(), ticks_us(), ticks_diff(), ticks_add(),
+            sleep_ms() and sleep_us() to the module time and puts the folder
+            lib on sys.path.
+
+            time.sleep_ms() and time.sleep_us() advance a virtual clock instead of
+            sleeping, unless install(realtime=True) is used. The clock accounts
+                slept       time spent in sleep_ms() / sleep_us()
+                bus         time of the transfers on the I2C and 1-Wire bus
+                            including clock stretching and the DHT start signal
+            The ticks functions and time.time() return the real elapsed time plus
+            the virtual one.
+
+            The board (see board.py) defines which devices are attached: by default
+            a DHT11 on GPIO12, a DHT22 on GPIO13, a DS18B20 on GPIO0, and an SHT31
+            (0x44) and a BME280 (0x76) on the I2C bus, all measuring the
+            Environment board.env.
+
+Host        CPython 3
+
+Usage       import sim
+            sim.install()
+            from bme280Sensor import BME280Sensor
+            from machine import I2C
+            i2c = I2C()
+            sensor = BME280Sensor(i2c=i2c)
+            sim.board.env.temperature = 30.0
+            print(sensor.getValues(), i2c.bytes, sim.clock.sleptUs)
+"""
+import sys
+import os
+import time
+import builtins
+import struct
+
+from .clock import Clock
+from . import board
+
+clock = Clock()
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LIB = os.path.join(_ROOT, 'lib')
+ROOT = _ROOT
+
+def _patchTime():
+    time.ticks_ms = clock.ticksMs
+    time.ticks_us = clock.ticksUs
+    time.ticks_cpu = clock.ticksUs
+    time.ticks_diff = lambda new, old: new - old
+    time.ticks_add = lambda ticks, delta: ticks + delta
+    time.sleep_ms = clock.sleepMs
+    time.sleep_us = clock.sleepUs
+    if not hasattr(time, 'realTime'):
+        time.realTime = time.time
+        time.time = lambda: time.realTime() + clock.offsetUs / 1000000
+
+def install(realtime=False):
+    clock.realtime = realtime
+    builtins.const = lambda x: x
+    builtins.ptr8 = builtins.ptr16 = builtins.ptr32 = lambda buf: buf    # viper casts
+    _patchTime()
+    from . import machine, dht, onewire, ds18x20, micropython
+    sys.modules['machine'] = machine
+    sys.modules['dht'] = dht
+    sys.modules['onewire'] = onewire
+    sys.modules['ds18x20'] = ds18x20
+    sys.modules['micropython'] = micropython
+    sys.modules['ustruct'] = struct
+    for path in (ROOT, LIB):
+        if path not in sys.path:
+            sys.path.insert(0, path)
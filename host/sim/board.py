@@ -0,0 +1,28 @@
+"""
+Devices attached to the simulated board, see sim/__init__.py
+
+Change the attributes before the drivers are created, e.g.
+    sim.board.oneWireProbes[0] = 20     # 20 DS18B20 on GPIO0
+    sim.board.i2cDevices = lambda: {0x76: BME280Model(env, clock), 0x77: BME280Model(env, clock)}
+"""
+from .models import Environment, BME280Model, SHT31Model, DS18B20Model
+
+env = Environment()
+
+oneWireProbes = {0: 1}      # pin id -> number of DS18B20 probes
+dhtStrict = True            # DHT measure() raises OSError when polled faster than allowed
+
+def _clock():
+    from . import clock
+    return clock
+
+def defaultI2CDevices():
+    clock = _clock()
+    return {0x44: SHT31Model(env, clock), 0x76: BME280Model(env, clock, offset=0.3)}
+
+i2cDevices = defaultI2CDevices     # called for every new I2C object
+
+def makeProbes(pinId):
+    clock = _clock()
+    return [DS18B20Model(env, clock, 0x1000 + i, offset=0.05 * i)
+            for i in range(oneWireProbes.get(pinId, 0))]
@@ -0,0 +1,51 @@
+"""
+Virtual clock of the simulation, see sim/__init__.py
+"""
+import time
+
+class Clock:
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self.realtime = False
+        self.offsetUs = 0   # virtual time added to the real elapsed time
+        self.sleptUs = 0    # total time of sleep_ms() / sleep_us()
+        self.busUs = 0      # total time of bus transfers and waits
+
+    def ticksUs(self):
+        return int((time.perf_counter() - self._t0) * 1000000) + self.offsetUs
+
+    def ticksMs(self):
+        return self.ticksUs() // 1000
+
+    def sleepUs(self, us):
+        if us <= 0:
+            return
+        self.sleptUs += us
+        if self.realtime:
+            time.sleep(us / 1000000)
+        else:
+            self.offsetUs += us
+
+    def sleepMs(self, ms):
+        self.sleepUs(int(ms * 1000))
+
+    """ Time spent on a bus, the cpu is blocked but does not sleep """
+    def busy(self, us):
+        self.busUs += us
+        if self.realtime:
+            time.sleep(us / 1000000)
+        else:
+            self.offsetUs += us
+
+    """ Lets time pass without accounting it, e.g. between two samples of a benchmark """
+    def advance(self, us):
+        if self.realtime:
+            time.sleep(us / 1000000)
+        else:
+            self.offsetUs += us
+
+    """ Returns (sleptUs, busUs) and clears both """
+    def take(self):
+        slept, bus = self.sleptUs, self.busUs
+        self.sleptUs = self.busUs = 0
+        return slept, bus
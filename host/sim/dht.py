@@ -0,0 +1,49 @@
+"""
+Simulated module dht, see sim/__init__.py
+"""
+import errno
+from . import board, clock
+
+class _DHTBase:
+    START_US = 0            # start signal of the host
+    MIN_INTERVAL_US = 0     # the sensor does not answer faster
+    RESOLUTION = 1.0
+
+    def __init__(self, pin):
+        self.pin = pin
+        self._t = self._h = 0
+        self._lastUs = None
+        self.measurements = 0
+
+    def measure(self):
+        now = clock.ticksUs()
+        clock.busy(self.START_US + 4000)     # start signal and 40 bits
+        if board.dhtStrict and self._lastUs is not None and now - self._lastUs < self.MIN_INTERVAL_US:
+            raise OSError(errno.ETIMEDOUT)
+        self._lastUs = now
+        t, h, _ = board.env.sample(now)
+        r = self.RESOLUTION
+        self._t = round(t / r) * r
+        self._h = round(h / r) * r
+        self.measurements += 1
+
+    def temperature(self):
+        return self._t
+
+    def humidity(self):
+        return self._h
+
+class DHT11(_DHTBase):
+    START_US = 18000
+    MIN_INTERVAL_US = 1000000
+
+    def temperature(self):
+        return int(self._t)
+
+    def humidity(self):
+        return int(self._h)
+
+class DHT22(_DHTBase):
+    START_US = 1000
+    MIN_INTERVAL_US = 2000000
+    RESOLUTION = 0.1
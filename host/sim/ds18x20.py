@@ -0,0 +1,48 @@
+"""
+Simulated module ds18x20, see sim/__init__.py
+The transfers go through the OneWire object like in the micropython module,
+the probe models deliver the data.
+"""
+class DS18X20:
+    def __init__(self, onewire):
+        self.ow = onewire
+        self.buf = bytearray(9)
+
+    def scan(self):
+        return [rom for rom in self.ow.scan() if rom[0] in (0x10, 0x22, 0x28)]
+
+    def convert_temp(self):
+        self.ow.reset(True)
+        self.ow.writebyte(0xCC)     # skip rom
+        self.ow.writebyte(0x44)     # convert t
+        for p in self.ow.probes:
+            p.convert()
+
+    def read_scratch(self, rom):
+        self.ow.reset(True)
+        self.ow.select_rom(rom)
+        self.ow.writebyte(0xBE)     # read scratchpad
+        self.ow.readinto(self.buf)
+        p = self.ow.probe(rom)
+        if p is None:   # the bus reads all ones, the CRC does not match
+            self.buf[:] = b'\xff' * 9
+            raise Exception('CRC error')
+        self.buf[:] = p.scratchpad()
+        return self.buf
+
+    def write_scratch(self, rom, buf):
+        self.ow.reset(True)
+        self.ow.select_rom(rom)
+        self.ow.writebyte(0x4E)     # write scratchpad
+        self.ow.write(buf)
+        p = self.ow.probe(rom)
+        if p is not None:
+            p.writeScratchpad(buf)
+
+    def read_temp(self, rom):
+        buf = self.read_scratch(rom)
+        if buf[1] & 0x08:
+            t = -((~((buf[1] << 8) | buf[0]) & 0xFFFF) + 1)
+        else:
+            t = (buf[1] << 8) | buf[0]
+        return t / 16
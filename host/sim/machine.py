@@ -0,0 +1,159 @@
+"""
+Simulated module machine, see sim/__init__.py
+"""
+import errno
+from . import board, clock
+
+I2C_BYTE_US = 23    # 9 bits at 400 kHz
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = 0 if value is None else value
+        self.changes = 0
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        if value is not None:
+            self._value = value
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        if v != self._value:
+            self.changes += 1
+        self._value = 1 if v else 0
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+class I2C:
+    """ I2C bus which routes the transfers to the device models and counts
+        transactions and bytes on the wire (address, register and data bytes)
+    """
+    def __init__(self, id=-1, scl=None, sda=None, freq=400000, devices=None):
+        self.devices = devices if devices is not None else board.i2cDevices()
+        self.freq = freq
+        self.transactions = 0
+        self.bytes = 0
+
+    def _count(self, nBytes):
+        self.transactions += 1
+        self.bytes += nBytes
+        clock.busy(nBytes * 9 * 1000000 // self.freq)
+
+    def _device(self, addr):
+        dev = self.devices.get(addr)
+        if dev is None:
+            raise OSError(errno.ENODEV)
+        return dev
+
+    def scan(self):
+        self._count(112)
+        return sorted(self.devices)
+
+    def readfrom_mem_into(self, addr, memaddr, buf, addrsize=8):
+        self._count(3 + len(buf))
+        self._device(addr).readRegs(memaddr, buf)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, addrsize=8):
+        buf = bytearray(nbytes)
+        self.readfrom_mem_into(addr, memaddr, buf)
+        return bytes(buf)
+
+    def writeto_mem(self, addr, memaddr, buf, addrsize=8):
+        self._count(2 + len(buf))
+        self._device(addr).writeRegs(memaddr, bytes(buf))
+
+    def writeto(self, addr, buf, stop=True):
+        self._count(1 + len(buf))
+        self._device(addr).write(bytes(buf))
+        return len(buf)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self._count(1 + len(buf))
+        self._device(addr).read(buf)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        buf = bytearray(nbytes)
+        self.readfrom_into(addr, buf)
+        return bytes(buf)
+
+class UART:
+    """ Collects the written bytes in self.written """
+    def __init__(self, id=0, baudrate=115200, **kwargs):
+        self.baudrate = baudrate
+        self.written = bytearray()
+        self.writes = 0
+
+    def write(self, buf):
+        self.written += buf
+        self.writes += 1
+        clock.busy(len(buf) * 10 * 1000000 // self.baudrate)
+        return len(buf)
+
+PWRON_RESET = 0
+HARD_RESET = 1
+WDT_RESET = 3
+DEEPSLEEP_RESET = 4
+SOFT_RESET = 5
+DEEPSLEEP = 4
+
+_resetCause = PWRON_RESET
+
+def reset_cause():
+    return _resetCause
+
+class DeepSleep(Exception):
+    """ Raised by deepsleep(), the program ends like on the board """
+    def __init__(self, ms):
+        Exception.__init__(self, ms)
+        self.ms = ms
+
+class RTC:
+    ALARM0 = 0
+    _memory = b''
+    _alarmMs = 0
+
+    def __init__(self, id=0):
+        pass
+
+    def memory(self, data=None):
+        if data is None:
+            return RTC._memory
+        if len(data) > 492:
+            raise ValueError('buffer too long')
+        RTC._memory = bytes(data)
+
+    def irq(self, trigger=None, wake=None):
+        pass
+
+    def alarm(self, alarmId, ms):
+        RTC._alarmMs = ms
+
+def deepsleep(ms=None):
+    """ Ends the program by raising DeepSleep, wake() starts the next boot """
+    raise DeepSleep(RTC._alarmMs if ms is None else ms)
+
+def wake(sleptMs=None):
+    """ Simulates the wake up from deep sleep: the clock advances by the sleep time,
+        RTC memory survives and reset_cause() returns DEEPSLEEP_RESET
+    """
+    global _resetCause
+    _resetCause = DEEPSLEEP_RESET
+    clock.advance(1000 * (RTC._alarmMs if sleptMs is None else sleptMs))
+
+def freq(hz=None):
+    return 80000000
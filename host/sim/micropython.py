@@ -0,0 +1,15 @@
+"""
+Simulated module micropython, see sim/__init__.py
+The code emitters are not available on CPython, the decorators return the function.
+"""
+def const(x):
+    return x
+
+def native(f):
+    return f
+
+def viper(f):
+    return f
+
+def mem_info(*args):
+    pass
@@ -0,0 +1,322 @@
+"""
+Models of the sensors used by the simulated modules, see sim/__init__.py
+
+The I2C models implement
+    writeRegs(reg, data), readRegs(reg, buf)    register access (readfrom_mem, writeto_mem)
+    write(data), read(buf)                      plain transfers (readfrom, writeto)
+and raise OSError(EIO) for a NACK.
+"""
+import errno
+import random
+import struct
+
+class Environment:
+    """ Air around the sensors. Set the attributes directly or assign a
+        function update(env, tUs) that is called before every measurement.
+    """
+    def __init__(self, temperature=22.5, humidity=45.0, pressure=96500.0):
+        self.temperature = temperature  # °C
+        self.humidity = humidity        # %
+        self.pressure = pressure        # Pa
+        self.noise = 0.0                # std deviation of the temperature noise in °C
+        self.update = None
+        self._rnd = random.Random(1)
+
+    def sample(self, tUs):
+        if self.update is not None:
+            self.update(self, tUs)
+        t = self.temperature
+        if self.noise:
+            t += self._rnd.gauss(0, self.noise)
+        return t, self.humidity, self.pressure
+
+def crc8(data):
+    crc = 0xFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x31) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+def _nack():
+    raise OSError(errno.EIO)
+
+class BME280Model:
+    """ Register model of the BME280 with the calibration of the datasheet example
+        (dig_T and dig_P) and typical humidity coefficients
+    """
+    CHIP_ID = 0x60
+    T = (27504, 26435, -1000)
+    P = (36477, -10685, 3024, 2855, 140, -7, 15500, -14600, 6000)
+    H = (75, 370, 0, 313, 50, 30)
+
+    def __init__(self, env, clock, offset=0.0):
+        self.env = env
+        self.clock = clock
+        self.offset = offset    # temperature offset of this sensor in °C
+        self.timeScale = 1.0    # scales the measurement time
+        self.regs = bytearray(256)
+        self.regs[0xD0] = self.CHIP_ID
+        cal = struct.pack('<HhhHhhhhhhhhBB', *(self.T + self.P + (0, self.H[0])))
+        self.regs[0x88:0x88 + 26] = cal
+        h2, h3, h4, h5, h6 = self.H[1:]
+        self.regs[0xE1:0xE8] = struct.pack('<hBbBbb', h2, h3, h4 >> 4,
+                                           (h4 & 0xF) | ((h5 & 0xF) << 4), h5 >> 4, h6)
+        self.regs[0xF7:0xFF] = b'\x80\x00\x00\x80\x00\x00\x80\x00'   # reset values
+        self._doneUs = None     # end of a forced measurement
+        self._nextUs = 0        # next measurement in normal mode
+        self.measurements = 0
+
+    def reset(self):
+        """ Power-on reset, e.g. a brown-out: control registers and data back to their defaults """
+        self.regs[0xF2:0xF6] = b'\x00\x00\x00\x00'
+        self.regs[0xF7:0xFF] = b'\x80\x00\x00\x80\x00\x00\x80\x00'
+        self._doneUs = None
+
+    # datasheet compensation, used to find the raw values of the environment
+    def _tFine(self, adcT):
+        t1, t2, t3 = self.T
+        var1 = (((adcT >> 3) - (t1 << 1)) * t2) >> 11
+        var2 = (((((adcT >> 4) - t1) * ((adcT >> 4) - t1)) >> 12) * t3) >> 14
+        return var1 + var2
+
+    def _pressure(self, adcP, tFine):
+        p1, p2, p3, p4, p5, p6, p7, p8, p9 = self.P
+        var1 = tFine - 128000
+        var2 = var1 * var1 * p6 + ((var1 * p5) << 17) + (p4 << 35)
+        var1 = (((var1 * var1 * p3) >> 8) + ((var1 * p2) << 12))
+        var1 = (((1 << 47) + var1) * p1) >> 33
+        if var1 == 0:
+            return 0
+        p = 1048576 - adcP
+        p = (((p << 31) - var2) * 3125) // var1
+        var1 = (p9 * (p >> 13) * (p >> 13)) >> 25
+        var2 = (p8 * p) >> 19
+        return ((p + var1 + var2) >> 8) + (p7 << 4)
+
+    def _humidity(self, adcH, tFine):
+        h1, h2, h3, h4, h5, h6 = self.H
+        h = tFine - 76800
+        h = (((((adcH << 14) - (h4 << 20) - (h5 * h)) + 16384) >> 15) *
+             (((((((h * h6) >> 10) * (((h * h3) >> 11) + 32768)) >> 10) + 2097152) * h2 + 8192) >> 14))
+        h = h - (((((h >> 15) * (h >> 15)) >> 7) * h1) >> 4)
+        h = 0 if h < 0 else h
+        h = 419430400 if h > 419430400 else h
+        return h >> 12
+
+    @staticmethod
+    def _search(fn, target, lo, hi, rising=True):
+        while lo < hi:
+            mid = (lo + hi) // 2
+            v = fn(mid)
+            if (v < target) if rising else (v > target):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _latch(self):
+        t, h, p = self.env.sample(self.clock.ticksUs())
+        t += self.offset
+        adcT = self._search(lambda a: (self._tFine(a) * 5 + 128) >> 8, round(t * 100), 0, (1 << 20) - 1)
+        tFine = self._tFine(adcT)
+        adcP = self._search(lambda a: self._pressure(a, tFine), round(p * 256), 0, (1 << 20) - 1, rising=False)
+        adcH = self._search(lambda a: self._humidity(a, tFine), round(h * 1024), 0, 0xFFFF)
+        self.regs[0xF7:0xFA] = bytes(((adcP >> 12) & 0xFF, (adcP >> 4) & 0xFF, (adcP & 0xF) << 4))
+        self.regs[0xFA:0xFD] = bytes(((adcT >> 12) & 0xFF, (adcT >> 4) & 0xFF, (adcT & 0xF) << 4))
+        if self.regs[0xF2] & 7 == 0:
+            adcH = 0x8000       # humidity skipped
+        self.regs[0xFD:0xFF] = bytes(((adcH >> 8) & 0xFF, adcH & 0xFF))
+        self.measurements += 1
+
+    def measurementUs(self):
+        def n(code):
+            return 0 if code == 0 else 1 << (min(code, 5) - 1)
+        ctrl = self.regs[0xF4]
+        us = 1250 + 2300 * n(ctrl >> 5) + 2300 * n((ctrl >> 2) & 7) + 575 + 2300 * n(self.regs[0xF2] & 7) + 575
+        return int(us * self.timeScale)
+
+    def standbyUs(self):
+        return (500, 62500, 125000, 250000, 500000, 1000000, 10000, 20000)[self.regs[0xF5] >> 5]
+
+    def _update(self):
+        now = self.clock.ticksUs()
+        mode = self.regs[0xF4] & 3
+        if self._doneUs is not None and now >= self._doneUs:
+            self._latch()
+            self._doneUs = None
+            self.regs[0xF4] &= 0xFC     # back to sleep mode
+            self.regs[0xF3] = 0
+        elif mode == 3 and now >= self._nextUs:
+            self._latch()
+            self._nextUs = now + self.measurementUs() + self.standbyUs()
+
+    def writeRegs(self, reg, data):
+        for i, b in enumerate(data):
+            if reg + i == 0xE0:
+                if b == 0xB6:   # soft reset
+                    self.reset()
+                continue
+            self.regs[reg + i] = b
+            if reg + i == 0xF4:
+                mode = b & 3
+                if mode in (1, 2):
+                    self._doneUs = self.clock.ticksUs() + self.measurementUs()
+                    self.regs[0xF3] = 0x08
+                elif mode == 3:
+                    self._nextUs = self.clock.ticksUs() + self.measurementUs()
+                else:
+                    self._doneUs = None
+
+    def readRegs(self, reg, buf):
+        self._update()
+        buf[:] = self.regs[reg:reg + len(buf)]
+
+    def write(self, data):
+        if len(data) > 1:
+            self.writeRegs(data[0], data[1:])
+
+    def read(self, buf):
+        _nack()
+
+class SHT31Model:
+    """ Command model of the SHT31, single shot and periodic acquisition """
+    SINGLE = {
+        0x2C06: (True, 15000), 0x2C0D: (True, 6000), 0x2C10: (True, 4000),
+        0x2400: (False, 15000), 0x240B: (False, 6000), 0x2416: (False, 4000)
+        }
+    PERIODIC = {
+        0x2032: 2000000, 0x2024: 2000000, 0x202F: 2000000,
+        0x2130: 1000000, 0x2126: 1000000, 0x212D: 1000000,
+        0x2236: 500000, 0x2220: 500000, 0x222B: 500000,
+        0x2334: 250000, 0x2322: 250000, 0x2329: 250000,
+        0x2737: 100000, 0x2721: 100000, 0x272A: 100000,
+        0x2B32: 250000
+        }
+    FETCH = 0xE000
+    BREAK = 0x3093
+    SOFT_RESET = 0x30A2
+
+    def __init__(self, env, clock, offset=0.0):
+        self.env = env
+        self.clock = clock
+        self.offset = offset
+        self.timeScale = 1.0
+        self.corrupt = 0        # number of next frames with a wrong CRC
+        self._single = None     # (stretch, doneUs) of a single shot measurement
+        self._periodUs = None
+        self._startUs = 0
+        self._fetched = 0       # number of the last fetched periodic sample
+        self._fetch = False
+        self.measurements = 0
+
+    def _frame(self):
+        t, h, _ = self.env.sample(self.clock.ticksUs())
+        t += self.offset
+        rawT = max(0, min(0xFFFF, round((t + 45) * 65535 / 175)))
+        rawH = max(0, min(0xFFFF, round(h * 65535 / 100)))
+        words = (bytes((rawT >> 8, rawT & 0xFF)), bytes((rawH >> 8, rawH & 0xFF)))
+        frame = bytearray(words[0] + bytes((crc8(words[0]),)) + words[1] + bytes((crc8(words[1]),)))
+        if self.corrupt:
+            self.corrupt -= 1
+            frame[2] ^= 0x01
+        self.measurements += 1
+        return frame
+
+    def write(self, data):
+        cmd = (data[0] << 8) | data[1]
+        now = self.clock.ticksUs()
+        self._fetch = False
+        if cmd in self.SINGLE:
+            if self._periodUs is not None:
+                _nack()
+            stretch, us = self.SINGLE[cmd]
+            self._single = (stretch, now + int(us * self.timeScale))
+        elif cmd in self.PERIODIC:
+            self._periodUs = self.PERIODIC[cmd]
+            self._startUs = now
+            self._fetched = 0
+        elif cmd == self.FETCH:
+            if self._periodUs is None:
+                _nack()
+            self._fetch = True
+        elif cmd in (self.BREAK, self.SOFT_RESET):
+            self._periodUs = None
+            self._single = None
+        else:
+            _nack()
+
+    def read(self, buf):
+        now = self.clock.ticksUs()
+        if self._fetch:
+            self._fetch = False
+            sample = (now - self._startUs) // self._periodUs
+            if sample <= self._fetched:
+                _nack()         # no new data since the last fetch
+            self._fetched = sample
+        elif self._single is not None:
+            stretch, doneUs = self._single
+            if now < doneUs:
+                if not stretch:
+                    _nack()
+                self.clock.busy(doneUs - now)   # clock stretching holds the bus
+            self._single = None
+        else:
+            _nack()
+        buf[:] = self._frame()[:len(buf)]
+
+    def writeRegs(self, reg, data):
+        _nack()
+
+    def readRegs(self, reg, buf):
+        _nack()
+
+class DS18B20Model:
+    """ One DS18B20 probe on a 1-Wire bus """
+    CONVERSION_US = {9: 93750, 10: 187500, 11: 375000, 12: 750000}
+
+    def __init__(self, env, clock, serial, offset=0.0):
+        self.env = env
+        self.clock = clock
+        self.offset = offset
+        self.timeScale = 1.0
+        self.rom = bytearray(b'\x28' + struct.pack('<IH', serial, 0))
+        self.rom.append(self._romCrc(self.rom))
+        self.th, self.tl, self.config = 0x4B, 0x46, 0x7F
+        self.raw = 0x0550       # 85 °C power-on value
+        self._doneUs = None
+
+    @staticmethod
+    def _romCrc(data):
+        crc = 0
+        for b in data:
+            for _ in range(8):
+                mix = (crc ^ b) & 1
+                crc >>= 1
+                if mix:
+                    crc ^= 0x8C
+                b >>= 1
+        return crc
+
+    def resolution(self):
+        return 9 + ((self.config >> 5) & 3)
+
+    def convert(self):
+        self._doneUs = self.clock.ticksUs() + int(self.CONVERSION_US[self.resolution()] * self.timeScale)
+
+    def _update(self):
+        if self._doneUs is not None and self.clock.ticksUs() >= self._doneUs:
+            t, _, _ = self.env.sample(self.clock.ticksUs())
+            step = 1 << (12 - self.resolution())   # unused low bits of the raw value
+            self.raw = (round((t + self.offset) * 16) // step * step) & 0xFFFF
+            self._doneUs = None
+
+    def scratchpad(self):
+        self._update()
+        data = bytearray(struct.pack('<hBBB', self.raw - 0x10000 if self.raw & 0x8000 else self.raw,
+                                     self.th, self.tl, self.config)) + b'\xff\x0c\x10'
+        data.append(self._romCrc(data))
+        return data
+
+    def writeScratchpad(self, buf):
+        self.th, self.tl, self.config = buf[0], buf[1], (buf[2] & 0x60) | 0x1F
@@ -0,0 +1,64 @@
+"""
+Simulated module onewire, see sim/__init__.py
+"""
+from . import board, clock
+
+RESET_US = 960
+BYTE_US = 8 * 65
+
+class OneWireError(Exception):
+    pass
+
+class OneWire:
+    """ 1-Wire bus with the DS18B20 probes of board.oneWireProbes,
+        counts the resets and bytes on the wire
+    """
+    SEARCH_ROM = 0xF0
+    MATCH_ROM = 0x55
+    SKIP_ROM = 0xCC
+
+    def __init__(self, pin):
+        self.pin = pin
+        self.probes = board.makeProbes(getattr(pin, 'id', pin))
+        self.resets = 0
+        self.bytes = 0
+
+    def _count(self, resets, nBytes):
+        self.resets += resets
+        self.bytes += nBytes
+        clock.busy(resets * RESET_US + nBytes * BYTE_US)
+
+    def reset(self, required=False):
+        self._count(1, 0)
+        if required and not self.probes:
+            raise OneWireError
+        return bool(self.probes)
+
+    def readbyte(self):
+        self._count(0, 1)
+        return 0xFF
+
+    def writebyte(self, value):
+        self._count(0, 1)
+
+    def write(self, buf):
+        self._count(0, len(buf))
+
+    def readinto(self, buf):
+        self._count(0, len(buf))
+
+    def select_rom(self, rom):
+        self.reset()
+        self.writebyte(self.MATCH_ROM)
+        self.write(rom)
+
+    def scan(self):
+        # search algorithm: 64 x (2 read bits + 1 write bit) per device
+        self._count(len(self.probes) + 1, 25 * len(self.probes))
+        return [bytearray(p.rom) for p in self.probes]
+
+    def probe(self, rom):
+        for p in self.probes:
+            if p.rom == rom:
+                return p
+        return None
@@ -0,0 +1,138 @@
+"""
+Module      adaptiveScheduler.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Queries each sensor with its own period, which adapts to the
+            changes of its readings:
+                - while all watched values stay within their deadband around
+                  the last reported values, the period grows by the factor
+                  backoff up to maxMs
+                - when a value leaves its deadband, the period is halved and the
+                  new values become the reference
+                - when a value changes by more than fastFactor deadbands or the
+                  measurement fails, the period drops to minMs at once
+            minMs is at least the minInterval of the driver (1000 ms for the DHT11,
+            2000 ms for the DHT22). Every period is timed with waitIsOver().
+            With budgetMs the due sensors are admitted as by the SensorScheduler.
+
+            runCycle() measures only the sensors whose period has elapsed, in
+            parallel like the SensorScheduler, and returns their number. results()
+            yields all sensors with their last values, measured() only those of
+            the last cycle. rates() yields (name, periodMs, samplesPerHour) with
+            the effective number of samples per hour since the start.
+
+            The deadband is a dict {index: band} of the value list of the driver,
+            e.g. {0: 0.2, 2: 1.0} watches tC (index 0) with ±0.2 °C and rH
+            (index 2) with ±1 %.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from adaptiveScheduler import AdaptiveScheduler
+            scheduler = AdaptiveScheduler(minMs=15000, maxMs=300000)
+            scheduler.add('DHT22', sensorDHT22, deadband={0: 0.2, 2: 1.0})
+            scheduler.add('DS18B20', sensorDS18B20, 0, deadband={0: 0.1})
+            while True:
+                if await scheduler.runCycle():
+                    for name, sensor, values in scheduler.measured():
+                        print(name, values)
+                await sleepMs(10)
+"""
+from sensorScheduler import SensorScheduler, waitIsOver
+import time
+
+# indices of a job, the first four are those of the SensorScheduler
+_CYCLE = 4      # [msPrevious, msPeriod] for waitIsOver()
+_MIN_MS = 5
+_MAX_MS = 6
+_DEADBAND = 7   # {index: band}
+_REFERENCE = 8  # copy of the values the deadband is centered on
+_SAMPLES = 9
+_DUE = 10       # measured in the last cycle
+
+class AdaptiveScheduler(SensorScheduler):
+    def __init__(self, minMs=1000, maxMs=300000, backoff=1.5, fastFactor=4, budgetMs=None):
+        super().__init__(budgetMs)
+        self.minMs = minMs
+        self.maxMs = maxMs
+        self.backoff = backoff
+        self.fastFactor = fastFactor
+        self._ticksStart = time.ticks_ms()
+
+    """
+    Registers a sensor, args are passed to its collectValues().
+    minMs and maxMs default to those of the scheduler, minMs is raised
+    to the minInterval of the driver. The first measurement is made in the
+    next cycle, then the period starts at minMs.
+    """
+    def add(self, name, sensor, *args, deadband=None, minMs=None, maxMs=None, costMs=None):
+        minMs = max(self.minMs if minMs is None else minMs, getattr(sensor, 'minInterval', 0))
+        maxMs = max(minMs, self.maxMs if maxMs is None else maxMs)
+        if deadband is None:
+            deadband = {0: 0.1}
+        for band in deadband.values():
+            if band <= 0:
+                raise ValueError('deadband must be > 0')
+        self._declare(name, sensor, costMs)
+        self._jobs.append([name, sensor, args, None, [time.ticks_add(time.ticks_ms(), -minMs), minMs],
+                           minMs, maxMs, deadband, None, 0, False])
+
+    """ Returns the new period of job after a measurement """
+    def _adapt(self, job):
+        values, reference, period = job[3], job[_REFERENCE], job[_CYCLE][1]
+        if values is None:
+            return job[_MIN_MS]
+        if reference is None:
+            job[_REFERENCE] = list(values)
+            return job[_MIN_MS]
+        excess = 0  # largest change in deadbands
+        for i, band in job[_DEADBAND].items():
+            change = abs(values[i] - reference[i]) / band
+            if change > excess:
+                excess = change
+        if excess <= 1:
+            return min(job[_MAX_MS], int(period * self.backoff))
+        job[_REFERENCE] = list(values)
+        if excess > self.fastFactor:
+            return job[_MIN_MS]
+        return max(job[_MIN_MS], period // 2)
+
+    """
+    Measures the sensors whose period has elapsed, returns their number.
+    Sensors deferred by the budget stay due for the next cycle.
+    """
+    async def runCycle(self):
+        due = []
+        for job in self._jobs:
+            job[_DUE] = waitIsOver(job[_CYCLE])
+            if job[_DUE]:
+                due.append(job)
+        if not due:
+            return 0
+        admitted = await self._runJobs(due)
+        for job in due:
+            if job in admitted:
+                job[_SAMPLES] += 1
+                job[_CYCLE][1] = self._adapt(job)
+            else:
+                job[_DUE] = False
+                job[_CYCLE][0] = time.ticks_add(time.ticks_ms(), -job[_CYCLE][1])
+        return len(admitted)
+
+    """ Yields (name, sensor, values) of the sensors measured in the last cycle """
+    def measured(self):
+        for job in self._jobs:
+            if job[_DUE]:
+                yield job[0], job[1], job[3]
+
+    """ Yields (name, periodMs, samplesPerHour) of all sensors """
+    def rates(self):
+        ms = max(1, time.ticks_diff(time.ticks_ms(), self._ticksStart))
+        for job in self._jobs:
+            yield job[0], job[_CYCLE][1], job[_SAMPLES] * 3600000 / ms
+
+    def printRates(self):
+        print('sensor    period ms  samples/h')
+        for name, period, rate in self.rates():
+            print('%-8s %10d %10.1f' % (name, period, rate))
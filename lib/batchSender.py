@@ -0,0 +1,131 @@
+"""
+Module      batchSender.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Sends the readings in batches to the collector on a PC
+            (host/collector.py) by UDP or TCP. A batch is a header of
+            BATCH_FORMAT
+                magic       b'SB'
+                version     VERSION
+                flags       0
+                node        number of the board, 0..65535
+                count       number of records
+            followed by count records of the flash log (flashLog.RECORD_FORMAT),
+            so records kept in RTC memory or flash are sent unchanged.
+            Records are collected in a preallocated buffer, a full buffer of
+            maxRecords records is sent at once (50 records fit into one UDP
+            datagram of 1408 bytes). With TCP the batches are sent over one
+            connection, which is opened on the first send and again after
+            an error. A batch that cannot be sent when the buffer is full
+            is dropped and counted in dropped.
+
+Board       ESP8266 with a WLAN connection, e.g. set up in boot.py
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from batchSender import BatchSender
+            sender = BatchSender('192.168.1.10', node=7)
+            sender.append(time.time(), sensorDHT11.getValues(), sensorDHT22.getValues(),
+                          sensorDS18B20.getValues(0), sensorSHT31.getValues(),
+                          sensorBME280.getValues())
+            ...
+            sender.send()       # sends the records collected so far
+
+            # duty cycle: send the records of RTC memory every flushEvery wakes
+            duty = DutyCycle(SENSORS, i2c, logged=LOGGED, onFlush=sender.sendRecords)
+"""
+try:
+    import usocket as socket
+except ImportError:
+    import socket
+try:
+    from ustruct import pack_into, calcsize
+except ImportError:
+    from struct import pack_into, calcsize
+from flashLog import packRecord, RECORD_SIZE
+
+MAGIC = b'SB'
+VERSION = const(1)
+BATCH_FORMAT = '<2sBBHH'
+BATCH_HEADER_SIZE = calcsize(BATCH_FORMAT)
+PORT = const(8267)
+
+""" Writes the header of a batch of count records into buf """
+def packBatch(buf, node, count):
+    pack_into(BATCH_FORMAT, buf, 0, MAGIC, VERSION, 0, node, count)
+
+class BatchSender:
+    def __init__(self, host, port=PORT, node=0, tcp=False, maxRecords=50):
+        if not 0 <= node <= 0xFFFF:
+            raise ValueError('node must be within 0..65535')
+        if maxRecords < 1:
+            raise ValueError('maxRecords must be >= 1')
+        self.node = node
+        self.tcp = tcp
+        self.maxRecords = maxRecords
+        self.sent = 0           # records sent
+        self.dropped = 0        # records dropped after a failed send
+        self._address = socket.getaddrinfo(host, port)[0][-1]
+        self._buffer = bytearray(BATCH_HEADER_SIZE + maxRecords * RECORD_SIZE)
+        self._count = 0
+        self._socket = None
+
+    def __len__(self):
+        return self._count
+
+    """ Packs the value lists of the drivers into a record, None if a sensor failed """
+    def append(self, t, dht11, dht22, ds18b20, sht31, bme280):
+        if self._count == self.maxRecords:
+            self._sendFull()
+        packRecord(self._buffer, BATCH_HEADER_SIZE + self._count * RECORD_SIZE,
+                   t, dht11, dht22, ds18b20, sht31, bme280)
+        self._count += 1
+        if self._count == self.maxRecords:
+            self._sendFull()
+
+    """ Sends packed records, e.g. the records of the flash log or of RTC memory """
+    def sendRecords(self, records):
+        for offset in range(0, len(records) - RECORD_SIZE + 1, RECORD_SIZE):
+            if self._count == self.maxRecords:
+                self._sendFull()
+            start = BATCH_HEADER_SIZE + self._count * RECORD_SIZE
+            self._buffer[start:start + RECORD_SIZE] = records[offset:offset + RECORD_SIZE]
+            self._count += 1
+        self.send()
+
+    def _sendFull(self):
+        try:
+            self.send()
+        except OSError:
+            self.dropped += self._count
+            self._count = 0
+
+    """ Sends the collected records as one batch, raises OSError when it fails """
+    def send(self):
+        if self._count == 0:
+            return
+        packBatch(self._buffer, self.node, self._count)
+        batch = memoryview(self._buffer)[:BATCH_HEADER_SIZE + self._count * RECORD_SIZE]
+        if self.tcp:
+            try:
+                if self._socket is None:
+                    self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    self._socket.connect(self._address)
+                if hasattr(self._socket, 'sendall'):
+                    self._socket.sendall(batch)
+                else:
+                    self._socket.write(batch)
+            except OSError:
+                self.close()
+                raise
+        else:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.sendto(batch, self._address)
+        self.sent += self._count
+        self._count = 0
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
@@ -35,7 +35,10 @@
 import time
 from ustruct import unpack, unpack_from
 from array import array
-from math import log, pow
+from math import pow
+from psychrometrics import dewPoint, fahrenheit
+from i2cBus import busOf
+from compensation import bme280Compensate, bme280Calibration
 
 # BME280 default address.
 BME280_I2CADDR = 0x76
@@ -49,29 +52,55 @@ BME280_OSAMPLE_16 = 5
 
 BME280_REGISTER_CONTROL_HUM = 0xF2
 BME280_REGISTER_CONTROL = 0xF4
+BME280_REGISTER_CONFIG = 0xF5
+
+# Standby time between two measurements in normal mode
+BME280_STANDBY_0_5 = 0      # 0.5 ms
+BME280_STANDBY_62_5 = 1     # 62.5 ms
+BME280_STANDBY_125 = 2      # 125 ms
+BME280_STANDBY_250 = 3      # 250 ms
+BME280_STANDBY_500 = 4      # 500 ms
+BME280_STANDBY_1000 = 5     # 1000 ms
+BME280_STANDBY_10 = 6       # 10 ms
+BME280_STANDBY_20 = 7       # 20 ms
+
+# IIR filter coefficients
+BME280_FILTER_OFF = 0
+BME280_FILTER_2 = 1
+BME280_FILTER_4 = 2
+BME280_FILTER_8 = 3
+BME280_FILTER_16 = 4
 
 class BME280Sensor:
+    minInterval = 0     # ms between two measurements
+    busTimeMs = 2       # worst-case ms on the bus: 2 register writes and 8 byte burst at 100 kHz
+
     def __init__(self,
                  mode=BME280_OSAMPLE_1,
                  address=BME280_I2CADDR,
                  i2c=None,
+                 calibration=None,
                  **kwargs):
         # Check that mode is valid.
-        if mode not in [BME280_OSAMPLE_1, BME280_OSAMPLE_2, BME280_OSAMPLE_4,
-                        BME280_OSAMPLE_8, BME280_OSAMPLE_16]:
-            raise ValueError(
-                'Unexpected mode value {0}. Set mode to one of '
-                'BME280_ULTRALOWPOWER, BME280_STANDARD, BME280_HIGHRES, or '
-                'BME280_ULTRAHIGHRES'.format(mode))
+        self._checkMode(mode)
         self._mode = mode
         self._address = address
-        self._values = [0,0,0,0,0,0,0] # [tC, tF, rH, dP, airPres, locNP, locAlt]
+        self._values = [0,0,0,0,0,1013.25,0] # [tC, tF, rH, dP, airPres, locNP, locAlt]
+        self._localNPPa = 101325
+        self.history = None # optional SensorHistory, filled by every measurement
+        self.capture = None # optional RawCapture, gets the raw burst of every measurement
         if i2c is None:
             raise ValueError('An I2C object is required.')
-        self.i2c = i2c
+        self.i2c = busOf(i2c)   # shared bus manager with cached config registers
 
-        # load calibration data
-        buf = self.i2c.readfrom_mem(self._address, 0x88, 26) # dig_T1..dig_H1
+        # load calibration data, unless the 33 byte block of self.calibration
+        # is given, e.g. kept in RTC memory during deep sleep
+        if calibration is None:
+            calibration = bytes(self.i2c.readfrom_mem(self._address, 0x88, 26)) + \
+                          bytes(self.i2c.readfrom_mem(self._address, 0xE1, 7))
+        elif len(calibration) != 33:
+            raise ValueError('calibration must have 33 bytes')
+        buf = memoryview(calibration)[:26]    # dig_T1..dig_H1
         #print(buf)
         #print(", ".join(hex(b) for b in buf)) 
         self.dig_T1, self.dig_T2, self.dig_T3, self.dig_P1, \
@@ -80,8 +109,11 @@ class BME280Sensor:
             _, self.dig_H1 = unpack("<HhhHhhhhhhhhBB", buf)
         #print(unpack("<HhhHhhhhhhhhBB", buf))
 
-        buf = self.i2c.readfrom_mem(self._address, 0xE1, 7) #dig_H2..dig_H6
-        self.dig_H2, self.dig_H3 = unpack("<hB", buf)
+        buf = memoryview(calibration)[26:]    # dig_H2..dig_H6
+        # the 33 bytes of the calibration registers 0x88..0xA1 and 0xE1..0xE7,
+        # e.g. to compensate raw data on a PC
+        self.calibration = bytes(calibration)
+        self.dig_H2, self.dig_H3 = unpack_from("<hB", buf)
 
         e4_sign = unpack_from("<b", buf, 3)[0]
         self.dig_H4 = (e4_sign << 4) | (buf[4] & 0xF)
@@ -91,38 +123,117 @@ class BME280Sensor:
 
         self.dig_H6 = unpack_from("<b", buf, 6)[0]
 
+        # calibration tuple of the compensation kernel with the shifted
+        # constants computed once instead of on every read
+        self.cal = bme280Calibration(
+            self.dig_T1, self.dig_T2, self.dig_T3,
+            self.dig_P1, self.dig_P2, self.dig_P3, self.dig_P4, self.dig_P5,
+            self.dig_P6, self.dig_P7, self.dig_P8, self.dig_P9,
+            self.dig_H1, self.dig_H2, self.dig_H3, self.dig_H4, self.dig_H5, self.dig_H6)
+
         self.i2c.writeto_mem(self._address, BME280_REGISTER_CONTROL,
                              bytearray([0x3F]))
         self.t_fine = 0
 
         # temporary data holders which stay allocated
         self._l1_barray = bytearray(1)
-        self._l8_barray = bytearray(8)
         self._l3_resultarray = array("i", [0, 0, 0])
+        self._l3_compensated = array("i", [0, 0, 0])
+        self._normal = False
+        self._normalConfig = (BME280_STANDBY_62_5, BME280_FILTER_OFF)
+
+    def _checkMode(self, mode):
+        if mode not in [BME280_OSAMPLE_1, BME280_OSAMPLE_2, BME280_OSAMPLE_4,
+                        BME280_OSAMPLE_8, BME280_OSAMPLE_16]:
+            raise ValueError(
+                'Unexpected mode value {0}. Set mode to one of '
+                'BME280_OSAMPLE_1, BME280_OSAMPLE_2, BME280_OSAMPLE_4, '
+                'BME280_OSAMPLE_8 or BME280_OSAMPLE_16'.format(mode))
+
+    def setNormalMode(self, standby=BME280_STANDBY_62_5,
+                      iirFilter=BME280_FILTER_OFF, mode=None):
+        """ Puts the sensor into normal mode, where it measures
+            continuously and waits the standby time between two
+            measurements. A read then is a single burst read of the
+            data registers without any register write or sleep.
 
-    def read_raw_data(self, result):
-        """ Reads the raw (uncompensated) data from the sensor.
             Args:
-                result: array of length 3 or alike where the result will be
-                stored, in temperature, pressure, humidity order
-            Returns:
-                None
+                standby: one of the BME280_STANDBY_xxx constants
+                iirFilter: one of the BME280_FILTER_xxx constants
+                mode: oversampling BME280_OSAMPLE_x, None keeps the
+                current one
+        """
+        if not 0 <= standby <= BME280_STANDBY_20:
+            raise ValueError('Unexpected standby value {0}'.format(standby))
+        if not 0 <= iirFilter <= BME280_FILTER_16:
+            raise ValueError('Unexpected filter value {0}'.format(iirFilter))
+        if mode is not None:
+            self._checkMode(mode)
+            self._mode = mode
+        self._normalConfig = (standby, iirFilter)
+        # the config register is only written reliably in sleep mode
+        self._l1_barray[0] = 0
+        self.i2c.writeto_mem(self._address, BME280_REGISTER_CONTROL,
+                             self._l1_barray)
+        self.i2c.writeReg(self._address, BME280_REGISTER_CONFIG,
+                          standby << 5 | iirFilter << 2)
+        # ctrl_hum only takes effect after the write to ctrl_meas
+        self.i2c.writeReg(self._address, BME280_REGISTER_CONTROL_HUM, self._mode)
+        self._l1_barray[0] = self._mode << 5 | self._mode << 2 | 3
+        self.i2c.writeto_mem(self._address, BME280_REGISTER_CONTROL,
+                             self._l1_barray)
+        self._normal = True
+
+    def setForcedMode(self, iirFilter=BME280_FILTER_OFF):
+        """ Returns to forced mode, where each read triggers a single
+            measurement and waits for its completion (the default)
         """
-        self._l1_barray[0] = self._mode
-        self.i2c.writeto_mem(self._address, BME280_REGISTER_CONTROL_HUM,
+        if not 0 <= iirFilter <= BME280_FILTER_16:
+            raise ValueError('Unexpected filter value {0}'.format(iirFilter))
+        self._l1_barray[0] = 0
+        self.i2c.writeto_mem(self._address, BME280_REGISTER_CONTROL,
                              self._l1_barray)
+        self.i2c.writeReg(self._address, BME280_REGISTER_CONFIG, iirFilter << 2)
+        self._normal = False
+
+    def isNormalMode(self):
+        return self._normal
+
+    def startConversion(self):
+        """ Writes the control registers which starts a measurement in
+            forced mode. Returns at once, the result is ready after
+            conversionTime() ms and is read with collectValues().
+            Does nothing in normal mode, where the sensor measures by itself.
+        """
+        if self._normal:
+            return
+        # ctrl_hum keeps its value, the bus manager only writes it when it changes,
+        # ctrl_meas must be written for every measurement
+        self.i2c.writeReg(self._address, BME280_REGISTER_CONTROL_HUM, self._mode)
         self._l1_barray[0] = self._mode << 5 | self._mode << 2 | 1
         self.i2c.writeto_mem(self._address, BME280_REGISTER_CONTROL,
                              self._l1_barray)
 
+    def _measurementTime(self):
+        """ Returns the measurement time in us for the oversampling mode """
         sleep_time = 1250 + 2300 * (1 << self._mode)
         sleep_time = sleep_time + 2300 * (1 << self._mode) + 575
         sleep_time = sleep_time + 2300 * (1 << self._mode) + 575
-        time.sleep_us(sleep_time)  # Wait the required time
+        return sleep_time
+
+    def conversionTime(self):
+        if self._normal:
+            return 0
+        return (self._measurementTime() + 999) // 1000
 
+    def _readRaw(self, result):
+        """ Burst reads the raw data of the last completed measurement
+            into result in temperature, pressure, humidity order
+        """
         # burst readout from 0xF7 to 0xFE, recommended by datasheet
-        self.i2c.readfrom_mem_into(self._address, 0xF7, self._l8_barray)
-        readout = self._l8_barray
+        readout = self.i2c.readRegs(self._address, 0xF7, 8)
+        if self.capture is not None:
+            self.capture.bme280(self._address, readout)
         # pressure(0xF7): ((msb << 16) | (lsb << 8) | xlsb) >> 4
         raw_press = ((readout[0] << 16) | (readout[1] << 8) | readout[2]) >> 4
         # temperature(0xFA): ((msb << 16) | (lsb << 8) | xlsb) >> 4
@@ -130,67 +241,62 @@ class BME280Sensor:
         # humidity(0xFD): (msb << 8) | lsb
         raw_hum = (readout[6] << 8) | readout[7]
 
+        if raw_hum == 0x8000:
+            self._recover()
         result[0] = raw_temp
         result[1] = raw_press
         result[2] = raw_hum
 
+    def _recover(self):
+        """ The humidity was skipped, so ctrl_hum lost its value: the sensor
+            was reset, e.g. by a brown-out. Forgets the cached registers,
+            restores normal mode and raises OSError for this measurement,
+            in forced mode the next startConversion() writes them again.
+        """
+        self.i2c.invalidate(self._address)
+        if self._normal:
+            self.setNormalMode(*self._normalConfig)
+        raise OSError('BME280 was reset')
+
+    def read_raw_data(self, result):
+        """ Reads the raw (uncompensated) data from the sensor.
+            Args:
+                result: array of length 3 or alike where the result will be
+                stored, in temperature, pressure, humidity order
+            Returns:
+                None
+        """
+        if not self._normal:
+            self.startConversion()
+            time.sleep_us(self._measurementTime())  # Wait the required time
+        self._readRaw(result)
+
     def read_compensated_data(self, result=None):
         """ Reads the data from the sensor and returns the compensated data.
 
             Args:
                 result: array of length 3 or alike where the result will be
                 stored, in temperature, pressure, humidity order. You may use
-                this to read out the sensor without allocating heap memory
+                this to read out the sensor without allocating heap memory,
+                without it a new array is allocated per call. The driver's
+                own reads pass the preallocated _l3_compensated, see
+                host/checkAllocations.py
 
             Returns:
                 array with temperature, pressure, humidity. Will be the one from
                 the result parameter if not None
         """
         self.read_raw_data(self._l3_resultarray)
-        raw_temp, raw_press, raw_hum = self._l3_resultarray
-        # temperature
-        var1 = ((raw_temp >> 3) - (self.dig_T1 << 1)) * (self.dig_T2 >> 11)
-        var2 = (((((raw_temp >> 4) - self.dig_T1) *
-                  ((raw_temp >> 4) - self.dig_T1)) >> 12) * self.dig_T3) >> 14
-        self.t_fine = var1 + var2
-        temp = (self.t_fine * 5 + 128) >> 8
-
-        # pressure
-        var1 = self.t_fine - 128000
-        var2 = var1 * var1 * self.dig_P6
-        var2 = var2 + ((var1 * self.dig_P5) << 17)
-        var2 = var2 + (self.dig_P4 << 35)
-        var1 = (((var1 * var1 * self.dig_P3) >> 8) +
-                ((var1 * self.dig_P2) << 12))
-        var1 = (((1 << 47) + var1) * self.dig_P1) >> 33
-        if var1 == 0:
-            pressure = 0
-        else:
-            p = 1048576 - raw_press
-            p = (((p << 31) - var2) * 3125) // var1
-            var1 = (self.dig_P9 * (p >> 13) * (p >> 13)) >> 25
-            var2 = (self.dig_P8 * p) >> 19
-            pressure = ((p + var1 + var2) >> 8) + (self.dig_P7 << 4)
-
-        # humidity
-        h = self.t_fine - 76800
-        h = (((((raw_hum << 14) - (self.dig_H4 << 20) -
-                (self.dig_H5 * h)) + 16384)
-              >> 15) * (((((((h * self.dig_H6) >> 10) *
-                            (((h * self.dig_H3) >> 11) + 32768)) >> 10) +
-                          2097152) * self.dig_H2 + 8192) >> 14))
-        h = h - (((((h >> 15) * (h >> 15)) >> 7) * self.dig_H1) >> 4)
-        h = 0 if h < 0 else h
-        h = 419430400 if h > 419430400 else h
-        humidity = h >> 12
-
-        if result:
-            result[0] = temp
-            result[1] = pressure
-            result[2] = humidity
-            return result
-        else:
-            return array("i", (temp, pressure, humidity))
+        return self._compensate(result)
+
+    def _compensate(self, result=None):
+        """ Compensates the raw data held in _l3_resultarray into result, a
+            new array when None, see read_compensated_data()
+        """
+        if result is None:
+            result = array("i", (0, 0, 0))
+        self.t_fine = bme280Compensate(self._l3_resultarray, self.cal, result)
+        return result
 
     """
         Calculate local normal air pressure at given altitude
@@ -203,26 +309,57 @@ class BME280Sensor:
         pLocal = P0 * (1 - h/H0) ^ K0
     """
     def calculateNpLocal(self, locAlt):
-        self.values[5] = 1013.25 * pow( (1.0 - locAlt / 44330.0), 5.255)
-        return self.values[5]
+        self._values[5] = 1013.25 * pow( (1.0 - locAlt / 44330.0), 5.255)
+        self._localNPPa = int(self._values[5] * 100 + 0.5)   # of getFixedValues()
+        return self._values[5]
+
+    """ Read the result of the conversion started with startConversion() and compute the values """
+    def collectValues(self):
+        self._readRaw(self._l3_resultarray)
+        return self._computeValues(self._compensate(self._l3_compensated))
+
+    def _computeValues(self, compensated):
+        tC = compensated[0] / 100 # tC (temperature °Celsius)
+        rH = compensated[2] / 1024 # rH (relative humidity)
+        self._values[0] = tC
+        self._values[1] = fahrenheit(tC) # tF (temperature °Fahrenheit)
+        self._values[2] = rH
+        self._values[4] = compensated[1] / 25600 # airPres (air pressure)
+        self._values[3] = dewPoint(tC, rH) # dP (dew point)
+        # localNP (local normal pressure) is updated when the altitude is set
+        if self.history is not None:
+            self.history.add(self._values)
+        return self._values
 
     """ Get list of measured/computed values [tCelsius, tFahrenheit, relHumidity, dewPoint, airPressure, localNP, localAlt]"""
     def getValues(self):
-        self._values[0], self._values[4], self._values[2] = self.read_compensated_data() # tC, airPres, rH
-        self._values[0] /= 100 # tC (temperature °Celsius)
-        self._values[1] = self._values[0] * 1.8 + 32.0 # tF (temperature °Fahrenheit)
-        self._values[2] /= 1024 # rH (relative humidity)
-        self._values[4] /= 25600 # airPres (air pressure)
-        k = log(self._values[2] / 100) + (17.62 * self._values[0]) / (243.12 + self._values[0])
-        self._values[3] = 243.12 * k / (17.62 - k) # dP (dew point)
-        self._values[5] = 1013.25 * pow( (1.0 - self._values[6] / 44330.0), 5.255) # loaclNP (local normal pressure)
-        return self._values
+        return self._computeValues(self.read_compensated_data(self._l3_compensated))
+
+    """
+        Fixed-point variant of getValues() which uses integer arithmetic only.
+        Fills the caller supplied array("i", ...) of length 5 with
+        [tC * 100, tF * 100, rH * 100, airPres in Pa, localNP in Pa]
+        and returns it.
+    """
+    def getFixedValues(self, result):
+        compensated = self.read_compensated_data(self._l3_compensated)
+        temp = compensated[0]
+        result[0] = temp # tC in 0.01 °C
+        result[1] = (temp * 9) // 5 + 3200 # tF in 0.01 °F
+        result[2] = (compensated[2] * 100) >> 10 # rH in 0.01 %
+        result[3] = compensated[1] >> 8 # airPres in Pa
+        result[4] = self._localNPPa # localNP in Pa
+        return result
+
+    """ Print the last measured/computed values """
+    def showValues(self):
+        print('tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\nairPres = %5.1f hPa\nlocalNP = %5.1f hPa\nlocAlt  = %d masl\n' % \
+                (self._values[0], self._values[1], self._values[2], self._values[3], self._values[4], self._values[5], self._values[6]))
 
     """ Print list of measured/computed values """
     def printValues(self):
         self.getValues()
-        print('tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\nairPres = %5.1f hPa\nlocalNP = %5.1f hPa\nlocAlt  = %d masl\n' % \
-                (self._values[0], self._values[1], self._values[2], self._values[3], self._values[4], self._values[5], self._values[6]))
+        self.showValues()
 
     """ Get local altitude """
     @property
@@ -233,3 +370,4 @@ class BME280Sensor:
     @localAltitude.setter
     def localAltitude(self, locAlt):
         self._values[6] = locAlt
+        self.calculateNpLocal(locAlt)
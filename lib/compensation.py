@@ -0,0 +1,98 @@
+"""
+Module      compensation.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Integer kernels of the sensor conversions
+                - bme280Compensate(raw, cal, result)    compensates the raw BME280 values
+                                                        [adcT, adcP, adcH] according to the
+                                                        datasheet (64 bit pressure formula),
+                                                        stores [tC * 100, Pa * 256, rH * 1024]
+                                                        in result and returns t_fine
+                - sht31Fixed(tRaw, hRaw, result)        converts the raw SHT31 words and
+                                                        stores [tC * 100, rH * 100] in result
+            cal is the tuple of the BME280 calibration in the order of BME280_CAL,
+            see bme280Calibration().
+
+            On MicroPython the kernels of compensationNative.py are used, which
+            are compiled to machine code: bme280Compensate() with the native
+            emitter, because the pressure needs 64 bit integers, sht31Fixed()
+            with the viper emitter, whose 32 bit integers do not overflow for
+            16 bit raw words. The pure Python kernels below are the fallback
+            for CPython and for firmware without the emitters, they give the
+            same results bit by bit (see host/checkKernels.py) and remain
+            available as bme280CompensatePy() and sht31FixedPy().
+            BACKEND tells which kernels are in use: 'native' or 'python'.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from compensation import bme280Compensate, BACKEND
+            result = array('i', [0, 0, 0])
+            tFine = bme280Compensate(raw, sensorBME280.cal, result)
+            print(BACKEND, result[0] / 100, result[1] / 25600, result[2] / 1024)
+"""
+import sys
+
+# order of the BME280 calibration tuple, the shifted values are computed once
+BME280_CAL = ('dig_T1', 'dig_T1 << 1', 'dig_T2', 'dig_T3',
+              'dig_P1', 'dig_P2', 'dig_P3', 'dig_P4 << 35', 'dig_P5', 'dig_P6',
+              'dig_P7 << 4', 'dig_P8', 'dig_P9',
+              'dig_H1', 'dig_H2', 'dig_H3', 'dig_H4 << 20', 'dig_H5', 'dig_H6')
+
+""" Returns the calibration tuple of bme280Compensate() from the calibration words of the datasheet """
+def bme280Calibration(T1, T2, T3, P1, P2, P3, P4, P5, P6, P7, P8, P9, H1, H2, H3, H4, H5, H6):
+    return (T1, T1 << 1, T2, T3, P1, P2, P3, P4 << 35, P5, P6, P7 << 4, P8, P9,
+            H1, H2, H3, H4 << 20, H5, H6)
+
+def bme280CompensatePy(raw, cal, result):
+    T1, T1x2, T2, T3, P1, P2, P3, P4s35, P5, P6, P7s4, P8, P9, H1, H2, H3, H4s20, H5, H6 = cal
+    raw_temp = raw[0]
+    raw_press = raw[1]
+    raw_hum = raw[2]
+    # temperature
+    var1 = (((raw_temp >> 3) - T1x2) * T2) >> 11
+    var2 = (((((raw_temp >> 4) - T1) * ((raw_temp >> 4) - T1)) >> 12) * T3) >> 14
+    t_fine = var1 + var2
+    result[0] = (t_fine * 5 + 128) >> 8
+
+    # pressure
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * P6
+    var2 = var2 + ((var1 * P5) << 17)
+    var2 = var2 + P4s35
+    var1 = ((var1 * var1 * P3) >> 8) + ((var1 * P2) << 12)
+    var1 = (((1 << 47) + var1) * P1) >> 33
+    if var1 == 0:
+        result[1] = 0
+    else:
+        p = 1048576 - raw_press
+        p = (((p << 31) - var2) * 3125) // var1
+        var1 = (P9 * (p >> 13) * (p >> 13)) >> 25
+        var2 = (P8 * p) >> 19
+        result[1] = ((p + var1 + var2) >> 8) + P7s4
+
+    # humidity
+    h = t_fine - 76800
+    h = (((((raw_hum << 14) - H4s20 - (H5 * h)) + 16384) >> 15) *
+         (((((((h * H6) >> 10) * (((h * H3) >> 11) + 32768)) >> 10) + 2097152) * H2 + 8192) >> 14))
+    h = h - (((((h >> 15) * (h >> 15)) >> 7) * H1) >> 4)
+    h = 0 if h < 0 else h
+    h = 419430400 if h > 419430400 else h
+    result[2] = h >> 12
+    return t_fine
+
+def sht31FixedPy(tRaw, hRaw, result):
+    result[0] = ((4375 * tRaw) >> 14) - 4500   # tC * 100 = -4500 + 17500 * tRaw / 65536
+    result[1] = (625 * hRaw) >> 12              # rH * 100 = 10000 * hRaw / 65536
+    return result
+
+bme280Compensate = bme280CompensatePy
+sht31Fixed = sht31FixedPy
+BACKEND = 'python'
+if sys.implementation.name == 'micropython':
+    try:
+        from compensationNative import bme280Compensate, sht31Fixed
+        BACKEND = 'native'
+    except (ImportError, SyntaxError, ValueError, NotImplementedError):
+        pass    # firmware without native code emitters
@@ -0,0 +1,57 @@
+"""
+Module      compensationNative.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     The kernels of compensation.py compiled to machine code, imported
+            by compensation.py on MicroPython. Keep them identical to the pure
+            Python kernels and run host/checkKernels.py after a change.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+"""
+import micropython
+
+@micropython.native
+def bme280Compensate(raw, cal, result):
+    T1, T1x2, T2, T3, P1, P2, P3, P4s35, P5, P6, P7s4, P8, P9, H1, H2, H3, H4s20, H5, H6 = cal
+    raw_temp = raw[0]
+    raw_press = raw[1]
+    raw_hum = raw[2]
+    # temperature
+    var1 = (((raw_temp >> 3) - T1x2) * T2) >> 11
+    var2 = (((((raw_temp >> 4) - T1) * ((raw_temp >> 4) - T1)) >> 12) * T3) >> 14
+    t_fine = var1 + var2
+    result[0] = (t_fine * 5 + 128) >> 8
+
+    # pressure
+    var1 = t_fine - 128000
+    var2 = var1 * var1 * P6
+    var2 = var2 + ((var1 * P5) << 17)
+    var2 = var2 + P4s35
+    var1 = ((var1 * var1 * P3) >> 8) + ((var1 * P2) << 12)
+    var1 = (((1 << 47) + var1) * P1) >> 33
+    if var1 == 0:
+        result[1] = 0
+    else:
+        p = 1048576 - raw_press
+        p = (((p << 31) - var2) * 3125) // var1
+        var1 = (P9 * (p >> 13) * (p >> 13)) >> 25
+        var2 = (P8 * p) >> 19
+        result[1] = ((p + var1 + var2) >> 8) + P7s4
+
+    # humidity
+    h = t_fine - 76800
+    h = (((((raw_hum << 14) - H4s20 - (H5 * h)) + 16384) >> 15) *
+         (((((((h * H6) >> 10) * (((h * H3) >> 11) + 32768)) >> 10) + 2097152) * H2 + 8192) >> 14))
+    h = h - (((((h >> 15) * (h >> 15)) >> 7) * H1) >> 4)
+    h = 0 if h < 0 else h
+    h = 419430400 if h > 419430400 else h
+    result[2] = h >> 12
+    return t_fine
+
+@micropython.viper
+def sht31Fixed(tRaw: int, hRaw: int, result):
+    r = ptr32(result)       # result must be an array('i')
+    r[0] = ((4375 * tRaw) >> 14) - 4500
+    r[1] = (625 * hRaw) >> 12
+    return result
@@ -5,6 +5,10 @@ Author      2022-12-31 Charles Geiser (https://www.dodeka.ch)
 Purpose     Reads a DHt11 temperature and humidity sensor connected
             to the supplied pin and provides the methods
                 - getValues()       returns a list of measurements [tC, tF, rH, dP]
+                - startConversion() triggers a measurement
+                - conversionTime()  returns the ms to wait before collectValues()
+                - collectValues()   returns the list of the last measurement
+                - showValues()      prints the last measured values
                 - printValues()     prints the measured values to the terminal as
                                         tC = 23 °C
                                         tF = 73 °F
@@ -22,24 +26,47 @@ Usage       # Code in main program:
             print('Temperature Fahrenheit is %d\n' % v[1])
 """
 from dht import DHT11
-from math import log
+from psychrometrics import dewPoint, fahrenheit
 
 class DHT11Sensor:
+    minInterval = 1000  # ms between two measurements, the sensor does not answer faster
+    busTimeMs = 25      # worst-case ms blocked on the line: 18 ms start signal and 40 bits
+
     def __init__(self, pin):
         self.sensor = DHT11(pin)
         self._values = [0,0,0,0]
+        self.history = None     # optional SensorHistory, filled by every measurement
 
-    def getValues(self):
-        self.sensor.measure()
+    def startConversion(self):
+        try:
+            self.sensor.measure()
+        except OSError:
+            raise
+        except Exception as e:  # the module dht raises Exception('checksum error')
+            if e.args and 'checksum' in str(e.args[0]):
+                raise OSError('DHT11 checksum error')
+            raise
+
+    def conversionTime(self):
+        return 0
+
+    def collectValues(self):
         self._values[0] = self.sensor.temperature()    # tC
-        self._values[1] = self._values[0] * 1.8 + 32.0 # tF
+        self._values[1] = fahrenheit(self._values[0]) # tF
         self._values[2] = self.sensor.humidity()
-        k = log(self._values[2] / 100) + (17.62 * self._values[0]) / (243.12 + self._values[0])
-        self._values[3] = 243.12 * k / (17.62 - k)
+        self._values[3] = dewPoint(self._values[0], self._values[2])
+        if self.history is not None:
+            self.history.add(self._values)
         return self._values
 
-    def printValues(self):
-        self.getValues()
+    def getValues(self):
+        self.startConversion()
+        return self.collectValues()
+
+    def showValues(self):
         #print('tC = %02d °C\ntF = %02d °F\nrH = %02d %%\ndp = %2.0f °💧\n' % (self.tC, self.tF, self.rH, self.dP))
         print('tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\n' % (self._values[0], self._values[1], self._values[2], self._values[3]))
-    
\ No newline at end of file
+
+    def printValues(self):
+        self.getValues()
+        self.showValues()
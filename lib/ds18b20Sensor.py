@@ -5,6 +5,13 @@ Author      2023-01-01 Charles Geiser (https://www.dodeka.ch)
 Purpose     Reads a DS18B20 temperature sensor connected
             to the supplied pin and provides the methods
                 - getValues(sensorNbr)      returns a list of measurements [tC, tF]
+                - startConversion()         starts the conversion on all sensors of the bus
+                - conversionTime()          returns the ms to wait before collectValues()
+                - collectValues(sensorNbr)  returns the list of the last measurement
+                - getAllCelsius()           converts once and returns the temperatures of all sensors
+                - readAll()                 reads the temperatures of all sensors after a conversion
+                - setResolution(bits)       sets the resolution of all sensors to 9..12 bits
+                - showValues()              prints the last measured values
                 - printValues(sensorNbr)    prints the measured values to the terminal as
                                                 tC = 20.9 °C
                                                 tF = 69.6 °F
@@ -15,32 +22,138 @@ Firmware    micropython from https://micropython.org
 Usage       # Code in main program:
             from ds18b20Sensor import DS18B20Sensor
             sensorDS18B20 = DS18B20Sensor(Pin(16))
+            sensorDS18B20 = DS18B20Sensor(Pin(16), addrs=romCodes)  # known probes, no scan
             sensorDS18B20.printValues(sensorNbr)
+            sensorDS18B20.setResolution(9)          # conversion takes 94 ms instead of 750 ms
+            for tC in sensorDS18B20.getAllCelsius():
+                print(tC)
+
+            A missing probe or a wrong CRC raise OSError like the other drivers,
+            the modules onewire and ds18x20 raise OneWireError and Exception.
 """
 import time, onewire
 from ds18x20 import DS18X20
+from array import array
+from psychrometrics import fahrenheit
+
+""" Calls fn(*args) of the module ds18x20 and raises OSError for its bus and CRC errors """
+def _onBus(fn, *args):
+    try:
+        return fn(*args)
+    except OSError:
+        raise
+    except Exception as e:  # onewire.OneWireError, Exception('CRC error')
+        raise OSError('DS18B20: %s' % (e.args[0] if e.args else type(e).__name__))
 
 class DS18B20Sensor:
-    def __init__(self, pin):
+    minInterval = 0     # ms between two measurements
+    busTimeMs = 15      # worst-case ms on the bus: convert command, match ROM and scratchpad
+    _conversionTimes = {    # max. conversion time in ms according datasheet
+        9  : 94,
+        10 : 188,
+        11 : 375,
+        12 : 750
+        }
+
+    """
+    addrs is the list of ROM codes of the sensors, the bus is
+    only scanned when it is None, e.g. on the first boot
+    """
+    def __init__(self, pin, resolution=None, addrs=None):
         self.ow = onewire.OneWire(pin)
         self.sensors = DS18X20(self.ow)
-        self.addrs = self.sensors.scan()
+        self.addrs = self.sensors.scan() if addrs is None else list(addrs)
         self.tC = self.tF = 0
+        self._values = [0,0]
+        self.history = None     # optional SensorHistory, filled by collectValues()
+        self._temps = array('f', [0] * len(self.addrs)) # tC of all sensors, see readAll()
+        self._resolution = 12   # power-on default of the DS18B20
+        if resolution is not None:
+            self.setResolution(resolution)
+
+    """
+    Sets the resolution of all sensors on the bus to 9, 10, 11 or 12 bits
+    by writing the configuration register of the scratchpad. The alarm
+    registers TH and TL are left unchanged. The setting is not copied
+    to the EEPROM and is lost at power off.
+    """
+    def setResolution(self, bits):
+        if bits not in self._conversionTimes:
+            raise ValueError('Unexpected resolution {0}. Set resolution to 9, 10, 11 or 12 bits'.format(bits))
+        config = bytearray(3)
+        config[2] = (bits - 9) << 5 | 0x1F
+        for addr in self.addrs:
+            scratch = _onBus(self.sensors.read_scratch, addr)
+            config[0] = scratch[2]  # TH
+            config[1] = scratch[3]  # TL
+            _onBus(self.sensors.write_scratch, addr, config)
+        self._resolution = bits
+
+    def getResolution(self):
+        return self._resolution
+
+    def startConversion(self):
+        _onBus(self.sensors.convert_temp)
+
+    def conversionTime(self):
+        return self._conversionTimes[self._resolution] # mandatory according datasheet
+
+    """ ROM code of the sensor sensorNbr, OSError if there is no such probe """
+    def _addr(self, sensorNbr):
+        if not 0 <= sensorNbr < len(self.addrs):
+            raise OSError('DS18B20 number %d not found' % sensorNbr)
+        return self.addrs[sensorNbr]
+
+    def collectValues(self, sensorNbr=0):
+        self.tC = _onBus(self.sensors.read_temp, self._addr(sensorNbr))
+        self.tF = fahrenheit(self.tC)
+        self._values[0] = self.tC
+        self._values[1] = self.tF
+        if self.history is not None:
+            self.history.add(self._values)
+        return self._values
+
+    def getValues(self, sensorNbr=0):
+        self.startConversion()
+        time.sleep_ms(self.conversionTime())
+        return self.collectValues(sensorNbr)
+
+    """
+    Reads the temperatures of all sensors into a preallocated array, 
+    ordered as self.addrs. A conversion must have been completed.
+    """
+    def readAll(self):
+        for i in range(len(self.addrs)):
+            self._temps[i] = _onBus(self.sensors.read_temp, self.addrs[i])
+        return self._temps
+
+    """
+    Starts one conversion on all sensors of the bus, waits once and
+    returns the array of their temperatures in °C
+    """
+    def getAllCelsius(self):
+        self.startConversion()
+        time.sleep_ms(self.conversionTime())
+        return self.readAll()
 
     def getCelsius(self, sensorNbr):
-        self.sensors.convert_temp()
-        time.sleep_ms(750) # mandatory according datasheet
-        self.tC = self.sensors.read_temp(self.addrs[sensorNbr])
+        addr = self._addr(sensorNbr)
+        self.startConversion()
+        time.sleep_ms(self.conversionTime())
+        self.tC = _onBus(self.sensors.read_temp, addr)
         return self.tC
 
     def getFahrenheit(self, sensorNbr):
         self.tC = self.getCelsius(sensorNbr)
-        self.tF = self.tC * 1.8 + 32.0
+        self.tF = fahrenheit(self.tC)
         return self.tF
 
-    def printValues(self, sensorNbr):
-        self.tF = self.getFahrenheit(sensorNbr)
+    def showValues(self):
         print('tC = %4.1f °C\ntF = %4.1f °F\n' % (self.tC, self.tF))
 
+    def printValues(self, sensorNbr):
+        self.getValues(sensorNbr)
+        self.showValues()
+
     def getNbrSensors(self):
         return len(self.addrs)
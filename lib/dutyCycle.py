@@ -0,0 +1,267 @@
+"""
+Module      dutyCycle.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Runs the sensors duty-cycled instead of in a busy loop. Every
+            boot run()
+                - creates the sensors
+                - starts all conversions, sleeps for the longest one and
+                  collects the values
+                - packs them into a flash log record (flashLog.packRecord)
+                  and appends it to the accumulator in RTC memory
+                - every flushEvery wakes, or when the accumulator is full,
+                  passes the records to onFlush (e.g. to send them) and
+                  appends them to the FlashLog at logPath
+                - deep-sleeps for the rest of periodMs, the board boots
+                  again and run() starts the next cycle
+            GPIO16 (D0) must be wired to RST to wake the board.
+
+            The first boot creates the sensors with the SensorRegistry as
+            usual and keeps the bus addresses and the calibration blocks of
+            the BME280 sensors in RTC memory. A wake from deep sleep passes
+            them to the registry and the drivers, so it neither reads
+            sensors.json nor scans a bus nor reads a calibration. When a
+            1-Wire or I2C sensor fails, the next wake takes the first boot
+            path again.
+
+            RTC memory (492 bytes on the ESP8266) holds
+                HEADER_FORMAT   magic, wakes, awake ms of the last and the
+                                longest cycle, number of records, I2C
+                                addresses, ROM codes and calibrations
+                addresses       one byte each
+                ROM codes       GPIO and the 8 byte ROM code of each probe
+                calibrations    I2C address and the 33 byte block of each BME280
+                records         RECORD_SIZE bytes each, the rest of the memory
+
+            The awake time of a cycle is counted from start (default: the
+            creation of the DutyCycle) to deep sleep and printed every cycle,
+            stats() returns (wakes, lastAwakeMs, maxAwakeMs).
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from dutyCycle import DutyCycle
+            duty = DutyCycle(SENSORS, i2c, periodMs=15000, flushEvery=20, logged=LOGGED)
+            duty.registry.get('BME280').localAltitude = 405
+            duty.run()  # does not return, the board boots again after periodMs
+"""
+import time
+import machine
+try:
+    from ustruct import pack_into, unpack_from, calcsize
+except ImportError:
+    from struct import pack_into, unpack_from, calcsize
+try:
+    from ubinascii import hexlify, unhexlify
+except ImportError:
+    from binascii import hexlify, unhexlify
+from flashLog import packRecord, RECORD_SIZE
+from sensorRegistry import SensorRegistry
+
+RTC_SIZE = const(492)
+MAGIC = const(0xD501)       # change with the layout, stale RTC memory is ignored
+HEADER_FORMAT = '<HHHHBBBB'
+HEADER_SIZE = calcsize(HEADER_FORMAT)
+ROM_SIZE = const(9)
+CALIBRATION_SIZE = const(34)
+
+class DutyCycle:
+    def __init__(self, config, i2c, periodMs=15000, flushEvery=20, logged=None,
+                 logPath='log', onFlush=None, start=None):
+        if periodMs <= 0 or flushEvery < 1:
+            raise ValueError('periodMs and flushEvery must be positive')
+        self._start = time.ticks_ms() if start is None else start
+        self.config = config
+        self.periodMs = periodMs
+        self.flushEvery = flushEvery
+        self.logged = logged or tuple(entry['name'] for entry in config)
+        self.logPath = logPath
+        self.onFlush = onFlush
+        self._rtc = machine.RTC()
+        self._memory = bytearray(RTC_SIZE)
+        self._load()
+        if self._setup is None:
+            self.registry = SensorRegistry(config, i2c=i2c)
+        else:
+            self.registry = SensorRegistry(self._configWith(self._setup[2]), i2c=i2c,
+                                           cache=self._addresses(self._setup))
+
+    """ Restores the state kept in RTC memory, starts a new one after power on or a layout change """
+    def _load(self):
+        self.wakes = self.lastAwakeMs = self.maxAwakeMs = self._records = 0
+        self._setup = None      # (addresses, roms, calibrations) restored from RTC memory
+        self._setupSize = 0
+        if machine.reset_cause() != machine.DEEPSLEEP_RESET:
+            return
+        data = self._rtc.memory()
+        if len(data) < HEADER_SIZE:
+            return
+        magic, wakes, lastMs, maxMs, records, nAddrs, nRoms, nCals = unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC:
+            return
+        self._memory[:len(data)] = data
+        self.wakes, self.lastAwakeMs, self.maxAwakeMs = wakes, lastMs, maxMs
+        if nAddrs or nRoms or nCals:
+            offset = HEADER_SIZE
+            addrs = list(data[offset:offset + nAddrs])
+            offset += nAddrs
+            roms = []
+            for _ in range(nRoms):
+                roms.append((data[offset], bytes(data[offset + 1:offset + ROM_SIZE])))
+                offset += ROM_SIZE
+            cals = {}
+            for _ in range(nCals):
+                cals[data[offset]] = bytes(data[offset + 1:offset + CALIBRATION_SIZE])
+                offset += CALIBRATION_SIZE
+            self._setup = (addrs, roms, cals)
+            self._setupSize = offset - HEADER_SIZE
+        self._records = min(records, self.capacity())
+
+    def _addresses(self, setup):
+        onewire = {}
+        for pin, rom in setup[1]:
+            onewire.setdefault(str(pin), []).append(hexlify(rom).decode())
+        return {'i2c': setup[0], 'onewire': onewire}
+
+    """ Returns the configuration with the restored calibration passed to the BME280 sensors """
+    def _configWith(self, cals):
+        config = []
+        for entry in self.config:
+            if entry['bus'] == 'i2c' and entry['at'] in cals:
+                entry = dict(entry)
+                entry['kwargs'] = dict(entry.get('kwargs', {}), calibration=cals[entry['at']])
+            config.append(entry)
+        return config
+
+    """ Stores the addresses and calibrations of the registry, the records move behind them """
+    def _storeSetup(self):
+        addresses = self.registry.addresses()
+        addrs = addresses.get('i2c', [])
+        roms = [(int(pin), unhexlify(rom)) for pin, codes in addresses.get('onewire', {}).items()
+                for rom in codes]
+        cals = [(sensor._address, sensor.calibration) for _, sensor in self.registry.sensors()
+                if hasattr(sensor, 'calibration')]
+        size = len(addrs) + ROM_SIZE * len(roms) + CALIBRATION_SIZE * len(cals)
+        if HEADER_SIZE + size + RECORD_SIZE > RTC_SIZE:
+            size = 0    # no room, every wake takes the first boot path
+            addrs, roms, cals = [], [], []
+        if self._records >= (RTC_SIZE - HEADER_SIZE - size) // RECORD_SIZE:
+            self._flush()   # the records do not fit behind the new setup
+        records = self._recordBytes()
+        offset = HEADER_SIZE
+        for addr in addrs:
+            self._memory[offset] = addr
+            offset += 1
+        for pin, rom in roms:
+            self._memory[offset] = pin
+            self._memory[offset + 1:offset + ROM_SIZE] = rom
+            offset += ROM_SIZE
+        for addr, cal in cals:
+            self._memory[offset] = addr
+            self._memory[offset + 1:offset + CALIBRATION_SIZE] = cal
+            offset += CALIBRATION_SIZE
+        self._setup = (addrs, roms, dict(cals))
+        self._setupSize = size
+        self._memory[offset:offset + len(records)] = records
+
+    """ Forgets the setup, the next wake takes the first boot path """
+    def _dropSetup(self):
+        records = self._recordBytes()
+        self._setup = None
+        self._setupSize = 0
+        self._memory[HEADER_SIZE:HEADER_SIZE + len(records)] = records
+
+    def _recordBytes(self):
+        offset = HEADER_SIZE + self._setupSize
+        return bytes(self._memory[offset:offset + self._records * RECORD_SIZE])
+
+    """ Returns the number of records the accumulator holds """
+    def capacity(self):
+        return (RTC_SIZE - HEADER_SIZE - self._setupSize) // RECORD_SIZE
+
+    def _save(self):
+        addrs, roms, cals = self._setup or ((), (), {})
+        pack_into(HEADER_FORMAT, self._memory, 0, MAGIC, self.wakes & 0xFFFF,
+                  min(self.lastAwakeMs, 0xFFFF), min(self.maxAwakeMs, 0xFFFF),
+                  self._records, len(addrs), len(roms), len(cals))
+        self._rtc.memory(memoryview(self._memory)[:HEADER_SIZE + self._setupSize
+                                                  + self._records * RECORD_SIZE])
+
+    """ Starts all conversions, waits for the longest one and returns {name: values or None} """
+    def _measure(self):
+        started = []
+        results = {}
+        ms = 0
+        for entry, sensor in self.registry.sensors():
+            try:
+                sensor.startConversion()
+                ms = max(ms, sensor.conversionTime())
+                started.append((entry, sensor))
+            except Exception:   # OSError of the drivers, anything else must not keep the board awake
+                results[entry['name']] = None
+        if ms > 0:
+            time.sleep_ms(ms)
+        for entry, sensor in started:
+            try:
+                results[entry['name']] = sensor.collectValues(*entry.get('args', ()))
+            except Exception:
+                results[entry['name']] = None
+        return results
+
+    def _flush(self):
+        from flashLog import FlashLog   # only imported every flushEvery wakes
+        offset = HEADER_SIZE + self._setupSize
+        records = memoryview(self._memory)[offset:offset + self._records * RECORD_SIZE]
+        if self.onFlush is not None:
+            try:
+                self.onFlush(records)
+            except OSError as e:    # e.g. no network, the records still go to flash
+                print('onFlush failed: %s' % e)
+        log = FlashLog(self.logPath)
+        for i in range(0, len(records), RECORD_SIZE):
+            log.appendRecord(records[i:i + RECORD_SIZE])
+        log.flush()
+        self._records = 0
+
+    """ Returns (wakes, lastAwakeMs, maxAwakeMs) """
+    def stats(self):
+        return self.wakes, self.lastAwakeMs, self.maxAwakeMs
+
+    """
+    Measures, accumulates, flushes every flushEvery wakes and deep-sleeps until
+    the next period. The board goes to deep sleep even when the wake fails.
+    """
+    def run(self):
+        try:
+            self._wake()
+        except Exception as e:
+            print('wake failed: %s' % e)
+        finally:
+            awakeMs = time.ticks_diff(time.ticks_ms(), self._start)
+            rtc = self._rtc
+            rtc.irq(trigger=rtc.ALARM0, wake=machine.DEEPSLEEP)
+            rtc.alarm(rtc.ALARM0, max(self.periodMs - awakeMs, 1))
+            machine.deepsleep()
+
+    def _wake(self):
+        firstBoot = self._setup is None
+        results = self._measure()
+        if any(results.get(entry['name'], 0) is None for entry in self.config if entry['bus'] != 'pin'):
+            # a bus sensor failed, the next wake reads the cache file and may rescan
+            if not firstBoot:
+                self._dropSetup()
+        elif firstBoot or self.registry.scans:
+            self._storeSetup()
+        offset = HEADER_SIZE + self._setupSize + self._records * RECORD_SIZE
+        packRecord(self._memory, offset, time.time(), *[results.get(name) for name in self.logged])
+        self._records += 1
+        self.wakes += 1
+        if self.wakes % self.flushEvery == 0 or self._records >= self.capacity():
+            self._flush()
+        awakeMs = time.ticks_diff(time.ticks_ms(), self._start)
+        self.lastAwakeMs = awakeMs
+        self.maxAwakeMs = max(self.maxAwakeMs, awakeMs)
+        print('wake %d: %d records, awake %d ms (max %d ms)' % (
+            self.wakes, self._records, awakeMs, self.maxAwakeMs))
+        self._save()
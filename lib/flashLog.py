@@ -0,0 +1,208 @@
+"""
+Module      flashLog.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Binary, append-only log of the readings of all five sensors.
+            Each cycle is packed into a record of RECORD_SIZE = 28 bytes
+            (see RECORD_FORMAT and FIELDS) in a preallocated block buffer.
+            Only full blocks are appended to the current segment file, so
+            the flash is written once every blockSize // RECORD_SIZE cycles
+            (146 cycles with 4 kB blocks) instead of on every cycle.
+
+            A segment consists of blocks of exactly blockSize bytes, the
+            records of a block followed by zeros up to blockSize (8 bytes with
+            4 kB blocks), so a block write never straddles two 4 kB flash
+            sectors. The buffer mirrors the current block of the segment:
+            after flush() of a part of a block the next records fill the same
+            block up to its end before it is written again, and the writes
+            stay aligned. blockSize is kept in the index, host/readFlashLog.py
+            skips the padding.
+
+            Segments seg00000.bin, seg00001.bin, ... have at most segmentSize
+            bytes, the oldest segment is removed when there are more than
+            maxSegments. The file index holds the first and the current segment
+            and is replaced atomically by writing index.tmp and renaming it.
+            The number of records follows from the size of a segment, so
+            the index only changes when a segment is started. After a reset
+            a segment with a torn record is closed and a new one is started.
+
+            Methods
+                - append(t, dht11, dht22, ds18b20, sht31, bme280)
+                        packs the value lists of the drivers, None if a sensor failed
+                - appendRecord(record)  appends a record packed with packRecord()
+                - flush()       writes the buffered records, e.g. before deep sleep
+                - segments()    list of the segment file names, oldest first
+
+            host/readFlashLog.py reads the segments on a PC.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from flashLog import FlashLog
+            flashLog = FlashLog('/log')
+            flashLog.append(time.time(), sensorDHT11.getValues(), sensorDHT22.getValues(),
+                            sensorDS18B20.getValues(0), sensorSHT31.getValues(),
+                            sensorBME280.getValues())
+"""
+import os
+try:
+    from ustruct import pack_into, unpack_from, calcsize
+except ImportError:
+    from struct import pack_into, unpack_from, calcsize
+
+# time, DHT11 tC rH, DHT22 tC rH, DS18B20 tC, SHT31 tC rH, BME280 tC rH airPres, flags
+RECORD_FORMAT = '<IhhhhhhhhhIH'
+RECORD_SIZE = calcsize(RECORD_FORMAT)
+FIELDS = (                  # (name, scale) of the record fields, value = field / scale
+    ('time', 1),
+    ('dht11_tC', 10), ('dht11_rH', 10),
+    ('dht22_tC', 10), ('dht22_rH', 10),
+    ('ds18b20_tC', 100),
+    ('sht31_tC', 100), ('sht31_rH', 100),
+    ('bme280_tC', 100), ('bme280_rH', 100), ('bme280_airPres', 100),
+    ('flags', 1)
+    )
+# bits of flags, set when the sensor delivered no values
+FLAG_DHT11 = 0x01
+FLAG_DHT22 = 0x02
+FLAG_DS18B20 = 0x04
+FLAG_SHT31 = 0x08
+FLAG_BME280 = 0x10
+
+INDEX_FORMAT = '<IIII'      # first segment, current segment, RECORD_SIZE, blockSize
+
+def segmentName(nbr):
+    return 'seg%05d.bin' % nbr
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+def _size(path):
+    try:
+        return os.stat(path)[6]
+    except OSError:
+        return 0
+
+def _scaled(values, i, scale):
+    return round(values[i] * scale) if values is not None else 0
+
+""" Packs the value lists of the drivers into a record at offset of buf, None if a sensor failed """
+def packRecord(buf, offset, t, dht11, dht22, ds18b20, sht31, bme280):
+    flags = 0
+    if dht11 is None:
+        flags |= FLAG_DHT11
+    if dht22 is None:
+        flags |= FLAG_DHT22
+    if ds18b20 is None:
+        flags |= FLAG_DS18B20
+    if sht31 is None:
+        flags |= FLAG_SHT31
+    if bme280 is None:
+        flags |= FLAG_BME280
+    s = _scaled
+    pack_into(RECORD_FORMAT, buf, offset, int(t),
+              s(dht11, 0, 10), s(dht11, 2, 10),
+              s(dht22, 0, 10), s(dht22, 2, 10),
+              s(ds18b20, 0, 100),
+              s(sht31, 0, 100), s(sht31, 2, 100),
+              s(bme280, 0, 100), s(bme280, 2, 100), s(bme280, 4, 100),
+              flags)
+
+class FlashLog:
+    def __init__(self, directory='/log', blockSize=4096, segmentSize=65536, maxSegments=8):
+        if blockSize < RECORD_SIZE:
+            raise ValueError('blockSize must be at least %d' % RECORD_SIZE)
+        self._dir = directory
+        self._recordsPerBlock = blockSize // RECORD_SIZE
+        self._block = bytearray(blockSize)  # the current block, the padding stays 0
+        self._start = 0         # first record of the buffer in the current block
+        self._count = 0         # records in the block buffer
+        self._segmentSize = max(blockSize, segmentSize - segmentSize % blockSize)
+        self._maxSegments = maxSegments
+        if not _exists(directory):
+            os.mkdir(directory)
+        self._first = self._current = 0
+        self._restore()
+
+    def _path(self, name):
+        return self._dir + '/' + name
+
+    def _restore(self):
+        index = self._path('index')
+        if _exists(index):
+            with open(index, 'rb') as f:
+                data = f.read()
+            if len(data) >= 8:
+                self._first, self._current = unpack_from('<II', data)
+                # other record or block layout, e.g. an index of '<III': start a new segment
+                if len(data) != calcsize(INDEX_FORMAT) or \
+                        unpack_from(INDEX_FORMAT, data)[2:] != (RECORD_SIZE, len(self._block)):
+                    self._current += 1
+        # a reset during an append may leave a partial record: continue in a new segment
+        used = _size(self._path(segmentName(self._current))) % len(self._block)
+        if used % RECORD_SIZE or used >= self._recordsPerBlock * RECORD_SIZE:
+            self._current += 1
+            used = 0
+        self._start = used // RECORD_SIZE
+        self._writeIndex()
+
+    def _writeIndex(self):
+        buf = bytearray(calcsize(INDEX_FORMAT))
+        pack_into(INDEX_FORMAT, buf, 0, self._first, self._current, RECORD_SIZE, len(self._block))
+        tmp = self._path('index.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(buf)
+        os.rename(tmp, self._path('index'))
+
+    def append(self, t, dht11, dht22, ds18b20, sht31, bme280):
+        packRecord(self._block, (self._start + self._count) * RECORD_SIZE, t, dht11, dht22, ds18b20, sht31, bme280)
+        self._added()
+
+    """ Appends a record packed with packRecord(), e.g. kept in RTC memory during deep sleep """
+    def appendRecord(self, record):
+        offset = (self._start + self._count) * RECORD_SIZE
+        self._block[offset:offset + RECORD_SIZE] = record
+        self._added()
+
+    def _added(self):
+        self._count += 1
+        if self._start + self._count == self._recordsPerBlock:
+            self.flush()
+
+    """ Appends the buffered records to the current segment, a full block with its padding """
+    def flush(self):
+        if self._count == 0:
+            return
+        path = self._path(segmentName(self._current))
+        end = self._start + self._count
+        full = end == self._recordsPerBlock
+        if _size(path) >= self._segmentSize:
+            self._rotate()
+            path = self._path(segmentName(self._current))
+        with open(path, 'ab') as f:
+            if full and self._start == 0:
+                f.write(self._block)
+            else:
+                f.write(memoryview(self._block)[self._start * RECORD_SIZE:
+                                                len(self._block) if full else end * RECORD_SIZE])
+        self._start = 0 if full else end
+        self._count = 0
+
+    def _rotate(self):
+        self._current += 1
+        while self._current - self._first >= self._maxSegments:
+            try:
+                os.remove(self._path(segmentName(self._first)))
+            except OSError:
+                pass
+            self._first += 1
+        self._writeIndex()
+
+    def segments(self):
+        return [segmentName(n) for n in range(self._first, self._current + 1)
+                if _exists(self._path(segmentName(n)))]
@@ -0,0 +1,151 @@
+"""
+Module      i2cBus.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Manages an I2C bus shared by several devices, e.g. SHT31 at 0x44
+            and 0x45 and BME280 at 0x76 and 0x77:
+                - readRegs(addr, reg, n)        reads n registers into a pooled buffer
+                                                and returns a memoryview of it (no copy)
+                - readInto(addr, n)             reads n bytes into a pooled buffer
+                - writeReg(addr, reg, value)    writes a config register only when its
+                                                value differs from the cached one
+                - writeCmd(addr, cmd)           writes a command (bytes)
+                - invalidate(addr=None)         forgets the cached registers, e.g. after
+                                                a reset of the device
+            An OSError of a transfer forgets the cached registers of the device,
+            it may have been reset, so writeReg() writes them again. The pooled buffers are shared by all devices on the bus, a view is
+            valid until the next read of the same length.
+
+            I2CBus also provides the methods of machine.I2C and counts the
+            transactions and bytes (address, register and data bytes), the
+            writes saved by the cache are counted in skipped.
+
+            busOf(i2c) returns the one I2CBus of a machine.I2C object, so
+            drivers created with the same I2C object share the bus manager.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from i2cBus import busOf
+            bus = busOf(I2C(sda=Pin(4), scl=Pin(5)))
+            sensorBME280 = BME280Sensor(i2c=bus)
+            sensorBME280b = BME280Sensor(i2c=bus, address=0x77)
+            print(bus.transactions, bus.bytes, bus.skipped)
+"""
+_buses = {}
+
+def busOf(i2c):
+    if isinstance(i2c, I2CBus) or hasattr(i2c, 'writeReg'):
+        return i2c
+    bus = _buses.get(id(i2c))
+    if bus is None:
+        bus = I2CBus(i2c)
+        _buses[id(i2c)] = bus
+    return bus
+
+class I2CBus:
+    def __init__(self, i2c):
+        self._i2c = i2c
+        self._pool = {}         # length -> (bytearray, memoryview)
+        self._cache = {}        # addr << 8 | reg -> value
+        self._one = bytearray(1)
+        self.transactions = 0
+        self.bytes = 0
+        self.skipped = 0
+
+    def _count(self, nBytes):
+        self.transactions += 1
+        self.bytes += nBytes
+
+    """ Pooled buffer of n bytes """
+    def buffer(self, n):
+        entry = self._pool.get(n)
+        if entry is None:
+            buf = bytearray(n)
+            entry = (buf, memoryview(buf))
+            self._pool[n] = entry
+        return entry[1]
+
+    def readRegs(self, addr, reg, n):
+        view = self.buffer(n)
+        self.readfrom_mem_into(addr, reg, view)
+        return view
+
+    def readInto(self, addr, n):
+        view = self.buffer(n)
+        self.readfrom_into(addr, view)
+        return view
+
+    """ Writes a one byte register unless it already holds value, returns True when written """
+    def writeReg(self, addr, reg, value):
+        key = addr << 8 | reg
+        if self._cache.get(key) == value:
+            self.skipped += 1
+            return False
+        self._one[0] = value
+        self.writeto_mem(addr, reg, self._one)
+        self._cache[key] = value
+        return True
+
+    def writeCmd(self, addr, cmd):
+        self.writeto(addr, cmd)
+
+    def invalidate(self, addr=None):
+        if addr is None:
+            self._cache.clear()
+        else:
+            for key in [k for k in self._cache if k >> 8 == addr]:
+                del self._cache[key]
+
+    # methods of machine.I2C, an OSError forgets the cached registers of the device
+    def scan(self):
+        return self._i2c.scan()
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        self._count(3 + len(buf))
+        try:
+            self._i2c.readfrom_mem_into(addr, memaddr, buf)
+        except OSError:
+            self.invalidate(addr)
+            raise
+
+    def readfrom_mem(self, addr, memaddr, nbytes):
+        self._count(3 + nbytes)
+        try:
+            return self._i2c.readfrom_mem(addr, memaddr, nbytes)
+        except OSError:
+            self.invalidate(addr)
+            raise
+
+    def writeto_mem(self, addr, memaddr, buf):
+        self._count(2 + len(buf))
+        try:
+            self._i2c.writeto_mem(addr, memaddr, buf)
+        except OSError:
+            self.invalidate(addr)
+            raise
+
+    def writeto(self, addr, buf, stop=True):
+        self._count(1 + len(buf))
+        try:
+            return self._i2c.writeto(addr, buf, stop)
+        except OSError:
+            self.invalidate(addr)
+            raise
+
+    def readfrom_into(self, addr, buf, stop=True):
+        self._count(1 + len(buf))
+        try:
+            self._i2c.readfrom_into(addr, buf, stop)
+        except OSError:
+            self.invalidate(addr)
+            raise
+
+    def readfrom(self, addr, nbytes, stop=True):
+        self._count(1 + nbytes)
+        try:
+            return self._i2c.readfrom(addr, nbytes, stop)
+        except OSError:
+            self.invalidate(addr)
+            raise
@@ -0,0 +1,232 @@
+"""
+Module      instrument.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Latency and error statistics of the sensor drivers, cheap enough
+            to stay on in production. instrument(sensor, name) wraps the
+            methods of a driver object
+                getValues, getCelsius, read_raw_data, _getRawValues,
+                startConversion, collectValues
+            (those the driver has) and records for each method
+                - number of calls, errors (OSError) and retries
+                - latency measured with ticks_us as histogram with the fixed
+                  bucket bounds BUCKETS_US, total and maximum
+                - bytes on the I2C / 1-Wire bus
+            Bytes are attributed to the outermost instrumented call, e.g. to
+            getValues() and not to the read_raw_data() called by it.
+            With retries > 0 a getValues() or getCelsius() failing with
+            OSError is repeated up to retries times.
+
+            The SensorScheduler awaits the conversion between startConversion()
+            and collectValues() and reports it with recordWait(ms), which
+            instrument() adds to the sensor. The waits are counted as the
+            method 'wait', their time in sleepMs. A sleep within a blocking
+            getValues() of a driver is part of the latency of getValues().
+
+            The totals are kept in ms, the µs below 1 ms are carried over, so
+            they stay small ints for about 12 days of cumulated time.
+            stats() returns a snapshot {name: {method: (calls, errors, retries,
+            totalMs, maxUs, busBytes, sleepMs, histogram)}}, histogram is a tuple
+            with the counts of the buckets < 100 us, < 300 us, ... >= 1 s.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from instrument import instrument, stats, printStats
+            instrument(sensorDHT11, 'DHT11', retries=1)
+            instrument(sensorBME280, 'BME280')
+            ...
+            printStats()
+"""
+import time
+from array import array
+
+BUCKETS_US = (100, 300, 1000, 3000, 10000, 30000, 100000, 300000, 1000000)
+METHODS = ('getValues', 'getCelsius', 'read_raw_data', '_getRawValues',
+           'startConversion', 'collectValues')
+_RETRY = ('getValues', 'getCelsius')
+
+_sensors = {}       # name -> {method: MethodStats}
+_active = None      # MethodStats of the outermost running call
+
+class MethodStats:
+    def __init__(self):
+        self.histogram = array('I', [0] * (len(BUCKETS_US) + 1))
+        self.clear()
+
+    def clear(self):
+        self.calls = self.errors = self.retries = 0
+        self.totalMs = self.maxUs = 0
+        self.busBytes = self.sleepMs = 0
+        self._restUs = 0    # of totalMs below 1 ms
+        for i in range(len(self.histogram)):
+            self.histogram[i] = 0
+
+    def record(self, us):
+        self.calls += 1
+        total = self._restUs + us
+        self.totalMs += total // 1000
+        self._restUs = total % 1000
+        if us > self.maxUs:
+            self.maxUs = us
+        i = 0
+        for bound in BUCKETS_US:
+            if us < bound:
+                break
+            i += 1
+        self.histogram[i] += 1
+
+    def snapshot(self):
+        return (self.calls, self.errors, self.retries, self.totalMs, self.maxUs,
+                self.busBytes, self.sleepMs, tuple(self.histogram))
+
+def _count(nBytes):
+    if _active is not None:
+        _active.busBytes += nBytes
+
+class BusCounter:
+    """ Proxy of an I2C or OneWire object which counts the transferred bytes """
+    def __init__(self, bus):
+        self._bus = bus
+
+    def __getattr__(self, name):
+        return getattr(self._bus, name)
+
+    # I2C
+    def readfrom_mem_into(self, addr, memaddr, buf, *args):
+        _count(1 + len(buf))
+        return self._bus.readfrom_mem_into(addr, memaddr, buf, *args)
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *args):
+        _count(1 + nbytes)
+        return self._bus.readfrom_mem(addr, memaddr, nbytes, *args)
+
+    def writeto_mem(self, addr, memaddr, buf, *args):
+        _count(1 + len(buf))
+        return self._bus.writeto_mem(addr, memaddr, buf, *args)
+
+    def writeto(self, addr, buf, *args):
+        _count(len(buf))
+        return self._bus.writeto(addr, buf, *args)
+
+    def readfrom_into(self, addr, buf, *args):
+        _count(len(buf))
+        return self._bus.readfrom_into(addr, buf, *args)
+
+    def readfrom(self, addr, nbytes, *args):
+        _count(nbytes)
+        return self._bus.readfrom(addr, nbytes, *args)
+
+    # I2CBus
+    def readRegs(self, addr, reg, n):
+        _count(1 + n)
+        return self._bus.readRegs(addr, reg, n)
+
+    def readInto(self, addr, n):
+        _count(n)
+        return self._bus.readInto(addr, n)
+
+    def writeReg(self, addr, reg, value):
+        written = self._bus.writeReg(addr, reg, value)
+        if written:
+            _count(2)
+        return written
+
+    def writeCmd(self, addr, cmd):
+        _count(len(cmd))
+        return self._bus.writeCmd(addr, cmd)
+
+    # OneWire
+    def readbyte(self):
+        _count(1)
+        return self._bus.readbyte()
+
+    def writebyte(self, value):
+        _count(1)
+        return self._bus.writebyte(value)
+
+    def readinto(self, buf):
+        _count(len(buf))
+        return self._bus.readinto(buf)
+
+    def write(self, buf):
+        _count(len(buf))
+        return self._bus.write(buf)
+
+    def select_rom(self, rom):
+        _count(1 + len(rom))
+        return self._bus.select_rom(rom)
+
+def _waitRecorder(stats):
+    def recordWait(ms):
+        stats.record(ms * 1000)
+        stats.sleepMs += ms
+    return recordWait
+
+def _wrap(method, stats, retries):
+    def wrapper(*args, **kwargs):
+        global _active
+        outer = _active is None
+        if outer:
+            _active = stats
+        try:
+            attempt = 0
+            while True:
+                t0 = time.ticks_us()
+                try:
+                    result = method(*args, **kwargs)
+                    stats.record(time.ticks_diff(time.ticks_us(), t0))
+                    return result
+                except OSError:
+                    stats.record(time.ticks_diff(time.ticks_us(), t0))
+                    stats.errors += 1
+                    if attempt >= retries:
+                        raise
+                    attempt += 1
+                    stats.retries += 1
+        finally:
+            if outer:
+                _active = None
+    return wrapper
+
+def instrument(sensor, name, retries=0, methods=METHODS):
+    """ Wraps the methods of the driver object sensor, returns sensor """
+    entry = _sensors.setdefault(name, {})
+    for attr in ('i2c', '_i2c', 'ow'):
+        bus = getattr(sensor, attr, None)
+        if bus is not None and not isinstance(bus, BusCounter):
+            setattr(sensor, attr, BusCounter(bus))
+    ds = getattr(sensor, 'sensors', None)   # DS18X20 object of the DS18B20Sensor
+    if ds is not None and hasattr(ds, 'ow') and not isinstance(ds.ow, BusCounter):
+        ds.ow = BusCounter(ds.ow)
+    sensor.recordWait = _waitRecorder(entry.setdefault('wait', MethodStats()))
+    for m in methods:
+        method = getattr(sensor, m, None)
+        if method is None:
+            continue
+        stats = entry.setdefault(m, MethodStats())
+        setattr(sensor, m, _wrap(method, stats, retries if m in _RETRY else 0))
+    return sensor
+
+def stats(name=None):
+    """ Snapshot of the statistics of all sensors or of the named one """
+    if name is not None:
+        return dict((m, s.snapshot()) for m, s in _sensors[name].items())
+    return dict((n, dict((m, s.snapshot()) for m, s in methods.items()))
+                for n, methods in _sensors.items())
+
+def reset():
+    for methods in _sensors.values():
+        for s in methods.values():
+            s.clear()
+
+def printStats():
+    print('%-8s %-16s %6s %4s %4s %9s %9s %6s %9s' % (
+        'sensor', 'method', 'calls', 'err', 'rtry', 'mean us', 'max us', 'bytes', 'sleep ms'))
+    for n, methods in _sensors.items():
+        for m, s in methods.items():
+            if s.calls:
+                print('%-8s %-16s %6d %4d %4d %9d %9d %6d %9d' % (
+                    n, m, s.calls, s.errors, s.retries, (s.totalMs * 1000.0 + s._restUs) / s.calls, s.maxUs,
+                    s.busBytes, s.sleepMs))
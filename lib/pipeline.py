@@ -0,0 +1,294 @@
+"""
+Module      pipeline.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Streams the readings of a sensor through a chain of stages.
+            A Reading is an immutable namedtuple (name, t, values) with t the
+            ticks_ms of the measurement and values a tuple copied from the list
+            of the driver, so it can be kept while the driver measures again.
+
+            Readings(sensor, name, periodMs, *args) is the source: iterating it
+            measures the sensor every periodMs with getValues(*args), 'async for'
+            measures with startConversion(), conversionTime() and collectValues(*args)
+            and lets other tasks run meanwhile. A failed measurement (OSError) is
+            skipped. count limits the number of readings, None: endless.
+
+            Every stage is lazy, it pulls a reading from its source only when
+            it is asked for one, and works with 'for' and 'async for'.
+            The stages are chained with the methods
+                - convert({index: function})        converts values, e.g. {0: fahrenheit}
+                - median(index, window)             replaces the value by the median
+                                                    of the last window values
+                - rejectOutliers(index, maxDeviation, window)
+                                                    drops readings that deviate more than
+                                                    maxDeviation from the median of the
+                                                    last window values
+                - downsample(n)                     passes every n-th reading
+                - aggregate(index, size, periodMs)  yields one Reading per window of size
+                                                    readings or periodMs with the values
+                                                    (n, min, max, mean), an incomplete
+                                                    window at the end of the stream is dropped
+            The sinks consume the chain
+                - sink(size, write)                 calls write(batch) with a list of size
+                                                    readings, the last batch may be shorter
+                - await asink(size, write)          the same with 'async for'
+            The batch list is reused, write() must not keep it.
+            The median stages use preallocated arrays, no stage creates lists.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from pipeline import Readings
+            from psychrometrics import fahrenheit
+            chain = Readings(sensorSHT31, 'SHT31', 2000).rejectOutliers(0, 2.0) \\
+                        .median(0, 5).convert({0: fahrenheit}).aggregate(0, size=30)
+            chain.sink(10, flashWriter)         # 10 aggregates of one minute each per call
+            for reading in Readings(sensorDHT22, 'DHT22', 2000, count=3):
+                print(reading.t, reading.values[0])
+"""
+from array import array
+import time
+try:
+    from ucollections import namedtuple
+except ImportError:
+    from collections import namedtuple
+from sensorScheduler import sleepMs
+
+Reading = namedtuple('Reading', ('name', 't', 'values'))
+
+def _replace(values, index, value):
+    return values[:index] + (value,) + values[index + 1:]
+
+class Stage:
+    def __init__(self, source):
+        self.source = source
+
+    """ Returns the reading to pass on or None to drop it """
+    def process(self, reading):
+        return reading
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while True:
+            reading = self.process(next(self.source))
+            if reading is not None:
+                return reading
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            reading = self.process(await self.source.__anext__())
+            if reading is not None:
+                return reading
+
+    def convert(self, conversions):
+        return Convert(self, conversions)
+
+    def median(self, index, window=3):
+        return Median(self, index, window)
+
+    def rejectOutliers(self, index, maxDeviation, window=5):
+        return RejectOutliers(self, index, maxDeviation, window)
+
+    def downsample(self, n):
+        return Downsample(self, n)
+
+    def aggregate(self, index, size=None, periodMs=None):
+        return Aggregate(self, index, size, periodMs)
+
+    def sink(self, size, write):
+        batch = [None] * size
+        n = 0
+        for reading in self:
+            batch[n] = reading
+            n += 1
+            if n == size:
+                write(batch)
+                n = 0
+        if n:
+            write(batch[:n])
+
+    async def asink(self, size, write):
+        batch = [None] * size
+        n = 0
+        async for reading in self:
+            batch[n] = reading
+            n += 1
+            if n == size:
+                write(batch)
+                n = 0
+        if n:
+            write(batch[:n])
+
+class Readings(Stage):
+    def __init__(self, sensor, name, periodMs=0, *args, count=None):
+        super().__init__(None)
+        self.sensor = sensor
+        self.name = name
+        self.periodMs = periodMs
+        self.args = args
+        self.count = count
+        self._next = None   # ticks_ms of the next measurement
+
+    def _wait(self):
+        if self.count is not None:
+            if self.count <= 0:
+                return None
+            self.count -= 1
+        now = time.ticks_ms()
+        if self._next is None:
+            self._next = now
+        ms = time.ticks_diff(self._next, now)
+        if ms < 0:      # late, the period starts now instead of catching up
+            self._next = now
+            ms = 0
+        self._next = time.ticks_add(self._next, self.periodMs)
+        return ms
+
+    def _reading(self, values):
+        return Reading(self.name, time.ticks_ms(), tuple(values))
+
+    def __next__(self):
+        while True:
+            ms = self._wait()
+            if ms is None:
+                raise StopIteration
+            if ms:
+                time.sleep_ms(ms)
+            try:
+                return self._reading(self.sensor.getValues(*self.args))
+            except OSError:
+                pass
+
+    async def __anext__(self):
+        while True:
+            ms = self._wait()
+            if ms is None:
+                raise StopAsyncIteration
+            if ms:
+                await sleepMs(ms)
+            try:
+                self.sensor.startConversion()
+                ms = self.sensor.conversionTime()
+                if ms > 0:
+                    await sleepMs(ms)
+                return self._reading(self.sensor.collectValues(*self.args))
+            except OSError:
+                pass
+
+class Convert(Stage):
+    def __init__(self, source, conversions):
+        super().__init__(source)
+        self.conversions = tuple(conversions.items())
+
+    def process(self, reading):
+        values = reading.values
+        for index, function in self.conversions:
+            values = _replace(values, index, function(values[index]))
+        return Reading(reading.name, reading.t, values)
+
+class _Window(Stage):
+    """ Ring of the last window values of one index and their median """
+    def __init__(self, source, index, window):
+        super().__init__(source)
+        if window < 1:
+            raise ValueError('window must be >= 1')
+        self.index = index
+        self._ring = array('d', [0] * window)
+        self._sorted = array('d', [0] * window)
+        self._n = 0         # values in the ring
+        self._pos = 0
+
+    def _add(self, value):
+        self._ring[self._pos] = value
+        self._pos = (self._pos + 1) % len(self._ring)
+        if self._n < len(self._ring):
+            self._n += 1
+
+    def _median(self):
+        s, n = self._sorted, self._n
+        for i in range(n):  # insertion sort into the preallocated array
+            v = self._ring[i]
+            j = i - 1
+            while j >= 0 and s[j] > v:
+                s[j + 1] = s[j]
+                j -= 1
+            s[j + 1] = v
+        if n & 1:
+            return s[n >> 1]
+        return (s[(n >> 1) - 1] + s[n >> 1]) / 2
+
+class Median(_Window):
+    def process(self, reading):
+        self._add(reading.values[self.index])
+        return Reading(reading.name, reading.t, _replace(reading.values, self.index, self._median()))
+
+class RejectOutliers(_Window):
+    def __init__(self, source, index, maxDeviation, window=5):
+        super().__init__(source, index, window)
+        self.maxDeviation = maxDeviation
+        self.rejected = 0
+
+    def process(self, reading):
+        value = reading.values[self.index]
+        # the value joins the window anyway, so a real step passes after window // 2 readings
+        outlier = self._n > 0 and abs(value - self._median()) > self.maxDeviation
+        self._add(value)
+        if outlier:
+            self.rejected += 1
+            return None
+        return reading
+
+class Downsample(Stage):
+    def __init__(self, source, n):
+        super().__init__(source)
+        if n < 1:
+            raise ValueError('n must be >= 1')
+        self.n = n
+        self._i = 0
+
+    def process(self, reading):
+        self._i += 1
+        if self._i < self.n:
+            return None
+        self._i = 0
+        return reading
+
+class Aggregate(Stage):
+    def __init__(self, source, index, size=None, periodMs=None):
+        super().__init__(source)
+        if size is None and periodMs is None:
+            raise ValueError('size or periodMs is required')
+        self.index = index
+        self.size = size
+        self.periodMs = periodMs
+        self._start()
+
+    def _start(self):
+        self._count = 0
+        self._min = self._max = self._sum = 0.0
+        self._t0 = None
+
+    def process(self, reading):
+        value = reading.values[self.index]
+        if self._count == 0:
+            self._min = self._max = value
+            self._t0 = reading.t
+        elif value < self._min:
+            self._min = value
+        elif value > self._max:
+            self._max = value
+        self._count += 1
+        self._sum += value
+        if (self.size is not None and self._count >= self.size) or \
+           (self.periodMs is not None and time.ticks_diff(reading.t, self._t0) >= self.periodMs):
+            result = Reading(reading.name, reading.t,
+                             (self._count, self._min, self._max, self._sum / self._count))
+            self._start()
+            return result
+        return None
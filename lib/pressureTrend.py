@@ -0,0 +1,194 @@
+"""
+Module      pressureTrend.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Barometric tendency and Zambretti forecast from the values of the
+            BME280. add(values) takes the values list of getValues(), reduces
+            airPres to sea level with localNP (airPres * 1013.25 / localNP)
+            and averages the samples of every minute (bucketS) into a bucket.
+            For every window, by default 1 h, 3 h and 12 h of buckets, the
+            least-squares line through the bucket means is kept as running
+            sums (n, sum y, sum x*y) of integers in 1/1000 hPa relative to the
+            first bucket. A new bucket updates every window in constant time:
+            the bucket leaving the window is taken from a ring of the last
+            max(windows) bucket means (array 'i', 4 bytes each), no history is
+            rescanned, and the integer sums do not drift. A sample only adds
+            to the open bucket. Minutes without samples, e.g. deep sleep, are
+            filled with the last bucket mean, a gap longer than the ring
+            starts over.
+
+            Methods
+                - add(values, now=None)     adds a sample, now in seconds
+                - slope(window=1)           hPa per hour over windows[window]
+                                            buckets, None before 2 buckets
+                - pressure()                sea level pressure in hPa of the last bucket
+                - tendency()                FALLING, STEADY or RISING over 3 h (window 1),
+                                            None before minBuckets buckets
+                - forecast()                Zambretti code 1..32 or None
+                - forecastText(code)        the forecast of a code
+            Zambretti (simplified, without wind and season) with P in hPa
+                falling  Z = 127 - 0.12 P   limited to 1..9
+                steady   Z = 144 - 0.13 P   limited to 10..19
+                rising   Z = 185 - 0.16 P   limited to 20..32
+            The tendency is steady while the change over 3 h is below 1.6 hPa.
+
+            add() has the signature of SensorHistory.add(), so a PressureTrend
+            can also be set as history of the BME280 driver.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from pressureTrend import PressureTrend
+            trend = PressureTrend()
+            sensorBME280.history = trend    # or trend.add(sensorBME280.getValues())
+            ...
+            code = trend.forecast()
+            if code is not None:
+                print('%+.1f hPa/h, %s' % (trend.slope(), trend.forecastText(code)))
+"""
+from array import array
+import time
+
+WINDOWS = (60, 180, 720)    # buckets of 1 h, 3 h and 12 h
+FALLING = const(-1)
+STEADY = const(0)
+RISING = const(1)
+STEADY_HPA_3H = 1.6
+
+FORECASTS = (
+    'Settled fine', 'Fine weather', 'Fine, becoming less settled',
+    'Fairly fine, showery later', 'Showery, becoming more unsettled', 'Unsettled, rain later',
+    'Rain at times, worse later', 'Rain at times, becoming very unsettled', 'Very unsettled, rain',
+    'Settled fine', 'Fine weather', 'Fine, possibly showers', 'Fairly fine, showers likely',
+    'Showery, bright intervals', 'Changeable, some rain', 'Unsettled, rain at times',
+    'Rain at frequent intervals', 'Very unsettled, rain', 'Stormy, much rain',
+    'Settled fine', 'Fine weather', 'Becoming fine', 'Fairly fine, improving',
+    'Fairly fine, possibly showers early', 'Showery early, improving', 'Changeable, mending',
+    'Rather unsettled, clearing later', 'Unsettled, probably improving',
+    'Unsettled, short fine intervals', 'Very unsettled, finer at times',
+    'Stormy, possibly improving', 'Stormy, much rain')
+
+class PressureTrend:
+    def __init__(self, windows=WINDOWS, bucketS=60, minBuckets=60):
+        if not windows or min(windows) < 2:
+            raise ValueError('windows must hold at least 2 buckets')
+        if bucketS < 1:
+            raise ValueError('bucketS must be >= 1')
+        self.windows = tuple(windows)
+        self.bucketS = bucketS
+        self.minBuckets = minBuckets
+        self._capacity = max(windows)
+        self._ring = array('i', [0] * self._capacity)  # bucket means in 1/1000 hPa - reference
+        self._n = [0] * len(windows)
+        self._sy = [0] * len(windows)
+        self._sxy = [0] * len(windows)     # x = 0 for the oldest bucket of the window
+        self._reset()
+
+    def _reset(self):
+        self._head = 0          # position of the next bucket in the ring
+        self._count = 0         # buckets in the ring
+        self._bucket = None     # number of the open bucket, now // bucketS
+        self._sum = 0           # samples of the open bucket
+        self._samples = 0
+        self._reference = None  # first sample in 1/1000 hPa
+        for w in range(len(self.windows)):
+            self._n[w] = self._sy[w] = self._sxy[w] = 0
+
+    """ Adds the sample of a BME280 values list, now is the time in seconds """
+    def add(self, values, now=None):
+        if now is None:
+            now = time.time()
+        p = round(values[4] * 1013250 / values[5])     # sea level, 1/1000 hPa
+        bucket = int(now) // self.bucketS
+        if self._bucket is None:
+            self._bucket = bucket
+            self._reference = p
+        elif bucket != self._bucket:
+            self._close(bucket)
+        self._sum += p - self._reference
+        self._samples += 1
+
+    """ Pushes the mean of the open bucket and fills missing buckets with it """
+    def _close(self, bucket):
+        samples = self._samples
+        y = (2 * self._sum + samples) // (2 * samples)  # rounded mean
+        missing = bucket - self._bucket - 1
+        if missing >= self._capacity or missing < 0:
+            reference = self._reference
+            self._reset()
+            self._reference = reference
+        else:
+            self._push(y)
+            for _ in range(missing):
+                self._push(y)
+        self._bucket = bucket
+        self._sum = 0
+        self._samples = 0
+
+    def _push(self, y):
+        ring = self._ring
+        for w in range(len(self.windows)):
+            size = self.windows[w]
+            n = self._n[w]
+            if n < size:
+                self._sxy[w] += n * y
+                self._sy[w] += y
+                self._n[w] = n + 1
+            else:
+                # the oldest bucket leaves, the others move one x down
+                pos = self._head - size
+                old = ring[pos + self._capacity if pos < 0 else pos]
+                self._sxy[w] += (size - 1) * y - (self._sy[w] - old)
+                self._sy[w] += y - old
+        ring[self._head] = y
+        self._head = self._head + 1 if self._head + 1 < self._capacity else 0
+        if self._count < self._capacity:
+            self._count += 1
+
+    """ Least-squares slope in hPa per hour over the buckets of windows[window] """
+    def slope(self, window=1):
+        n = self._n[window]
+        if n < 2:
+            return None
+        sx = n * (n - 1) // 2
+        num = n * self._sxy[window] - sx * self._sy[window]
+        den = n * n * (n * n - 1) // 12
+        return num * 3600 / (den * self.bucketS * 1000)
+
+    """ Sea level pressure in hPa of the last bucket, None before the first one """
+    def pressure(self):
+        if self._count == 0:
+            return None
+        pos = self._head - 1
+        return (self._ring[pos if pos >= 0 else self._capacity - 1] + self._reference) / 1000
+
+    """ FALLING, STEADY or RISING by the change over 3 h of the slope of window 1 (3 h) """
+    def tendency(self):
+        w = 1 if len(self.windows) > 1 else 0
+        if self._n[w] < self.minBuckets:
+            return None
+        change = self.slope(w) * 3
+        if change <= -STEADY_HPA_3H:
+            return FALLING
+        if change >= STEADY_HPA_3H:
+            return RISING
+        return STEADY
+
+    """ Zambretti code 1..32 of the pressure and the tendency, None while the tendency is unknown """
+    def forecast(self):
+        tendency = self.tendency()
+        if tendency is None:
+            return None
+        p = self.pressure()
+        if tendency == FALLING:
+            z, lo, hi = 127 - 0.12 * p, 1, 9
+        elif tendency == STEADY:
+            z, lo, hi = 144 - 0.13 * p, 10, 19
+        else:
+            z, lo, hi = 185 - 0.16 * p, 20, 32
+        return min(hi, max(lo, round(z)))
+
+    @staticmethod
+    def forecastText(code):
+        return FORECASTS[code - 1]
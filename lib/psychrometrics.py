@@ -0,0 +1,70 @@
+"""
+Module      psychrometrics.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Derived quantities of humid air used by all sensor drivers
+                - fahrenheit(tC)                °C -> °F
+                - dewPoint(tC, rH)              dew point in °C
+                - saturationVapourPressure(tC)  saturation vapour pressure in hPa
+                - vapourPressure(tC, rH)        vapour pressure in hPa
+                - absoluteHumidity(tC, rH)      absolute humidity in g/m³
+                - heatIndex(tC, rH)             heat index (apparent temperature) in °C
+            The dew point and vapour pressure use the Magnus formula with the
+            constants 17.62 and 243.12 °C. The relative humidity is limited to
+            RH_MIN..100 %, so a reading of 0 % does not end in log(0).
+
+            The numpy versions for logged readings are in host/psychrometricsArray.py.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from psychrometrics import dewPoint, fahrenheit
+            dP = dewPoint(23.1, 44.1)
+"""
+from math import log, exp
+
+RH_MIN = 0.01       # lowest relative humidity in %, avoids log(0)
+
+_A = 17.62          # Magnus coefficients over water
+_B = 243.12         # °C
+_E0 = 6.112         # hPa
+
+def fahrenheit(tC):
+    return tC * 1.8 + 32.0
+
+def _limitRH(rH):
+    if rH < RH_MIN:
+        return RH_MIN
+    if rH > 100.0:
+        return 100.0
+    return rH
+
+def dewPoint(tC, rH):
+    k = log(_limitRH(rH) / 100) + (_A * tC) / (_B + tC)
+    return _B * k / (_A - k)
+
+def saturationVapourPressure(tC):
+    return _E0 * exp(_A * tC / (_B + tC))
+
+def vapourPressure(tC, rH):
+    return _limitRH(rH) / 100 * saturationVapourPressure(tC)
+
+def absoluteHumidity(tC, rH):
+    return 216.7 * vapourPressure(tC, rH) / (273.15 + tC)
+
+""" Heat index of the US National Weather Service (Rothfusz regression with adjustments) """
+def heatIndex(tC, rH):
+    t = fahrenheit(tC)
+    rH = _limitRH(rH)
+    hi = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rH * 0.094)
+    if (hi + t) / 2 >= 80.0:
+        hi = (-42.379 + 2.04901523 * t + 10.14333127 * rH
+              - 0.22475541 * t * rH - 0.00683783 * t * t
+              - 0.05481717 * rH * rH + 0.00122874 * t * t * rH
+              + 0.00085282 * t * rH * rH - 0.00000199 * t * t * rH * rH)
+        if rH < 13.0 and 80.0 <= t <= 112.0:
+            hi -= (13.0 - rH) / 4 * ((17.0 - abs(t - 95.0)) / 17) ** 0.5
+        elif rH > 85.0 and 80.0 <= t <= 87.0:
+            hi += (rH - 85.0) / 10 * (87.0 - t) / 5
+    return (hi - 32.0) / 1.8
@@ -0,0 +1,110 @@
+"""
+Module      rawCapture.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Records the raw frames of the BME280 and SHT31 to a file, to
+            compensate them on a PC with host/rawDecoder.py instead of
+            on the board. Every frame is a record of FRAME_SIZE = 16 bytes
+            (see FRAME_FORMAT)
+                kind        KIND_BME280, KIND_SHT31 or KIND_CALIBRATION
+                address     I2C address of the sensor
+                seq         frame counter (mod 65536), the chunk number 0..4
+                            for calibration records
+                time        time.time() of the frame
+                payload     the 8 byte burst of the BME280 from register 0xF7,
+                            the 6 byte frame of the SHT31 including both CRC,
+                            or a chunk of 8 bytes of the 33 byte calibration
+                            block of the BME280 (0x88..0xA1, 0xE1..0xE7)
+            attach(sensor) writes the calibration of a BME280 and lets the
+            driver pass every raw frame to the capture. The records are
+            buffered in a block and written when it is full, like flashLog.py.
+            When the file exceeds maxSize, it is renamed to path + '.old' and
+            a new one is started with the calibration of the attached sensors.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from rawCapture import RawCapture
+            capture = RawCapture('raw.bin')
+            capture.attach(sensorBME280)
+            capture.attach(sensorSHT31)
+            ...
+            capture.flush()     # e.g. before deep sleep
+"""
+import os
+import time
+try:
+    from ustruct import pack_into, calcsize
+except ImportError:
+    from struct import pack_into, calcsize
+
+FRAME_FORMAT = '<BBHI8s'
+FRAME_SIZE = calcsize(FRAME_FORMAT)
+KIND_BME280 = const(0x42)       # 'B'
+KIND_SHT31 = const(0x53)        # 'S'
+KIND_CALIBRATION = const(0x43)  # 'C'
+CALIBRATION_SIZE = const(33)
+
+def _size(path):
+    try:
+        return os.stat(path)[6]
+    except OSError:
+        return 0
+
+class RawCapture:
+    def __init__(self, path='raw.bin', blockSize=4096, maxSize=1048576):
+        self._path = path
+        self._framesPerBlock = blockSize // FRAME_SIZE
+        self._block = bytearray(self._framesPerBlock * FRAME_SIZE)
+        self._count = 0         # frames in the block buffer
+        self._seq = 0
+        self._maxSize = maxSize
+        self._calibrated = []   # BME280 sensors, their calibration starts every file
+
+    """ Passes the raw frames of a BME280 or SHT31 driver to the capture """
+    def attach(self, sensor):
+        sensor.capture = self
+        if hasattr(sensor, 'calibration'):
+            self._calibrated.append(sensor)
+            self._writeCalibration(sensor)
+
+    def _writeCalibration(self, sensor):
+        block = sensor.calibration + bytes(40 - CALIBRATION_SIZE)
+        for chunk in range(5):
+            self._append(KIND_CALIBRATION, sensor._address, chunk, block[chunk * 8:chunk * 8 + 8])
+
+    def _append(self, kind, address, seq, payload):
+        pack_into(FRAME_FORMAT, self._block, self._count * FRAME_SIZE,
+                  kind, address, seq, int(time.time()), bytes(payload))
+        self._count += 1
+        if self._count == self._framesPerBlock:
+            self.flush()
+
+    def bme280(self, address, readout):
+        self._seq = (self._seq + 1) & 0xFFFF
+        self._append(KIND_BME280, address, self._seq, readout)
+
+    def sht31(self, address, frame):
+        self._seq = (self._seq + 1) & 0xFFFF
+        self._append(KIND_SHT31, address, self._seq, frame)
+
+    """ Appends the buffered frames to the file """
+    def flush(self):
+        if self._count == 0:
+            return
+        nBytes = self._count * FRAME_SIZE
+        self._count = 0
+        with open(self._path, 'ab') as f:
+            if nBytes == len(self._block):
+                f.write(self._block)
+            else:
+                f.write(memoryview(self._block)[:nBytes])
+        if _size(self._path) >= self._maxSize:
+            try:
+                os.remove(self._path + '.old')
+            except OSError:
+                pass
+            os.rename(self._path, self._path + '.old')
+            for sensor in self._calibrated:
+                self._writeCalibration(sensor)
@@ -0,0 +1,128 @@
+"""
+Module      readCache.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Wraps a sensor driver with a cache of its last reading, so that
+            several consumers can read the same sensor without multiplying
+            the time on the bus:
+                - a read within minInterval ms of the last measurement returns
+                  the cached values without accessing the sensor
+                - when a measurement fails with OSError, the last good values
+                  are returned and stale is set, as long as they are not older
+                  than maxAge ms (None: no limit), otherwise the error is raised
+            minInterval defaults to the minInterval of the driver, e.g. 1000 ms
+            for the DHT11 and 2000 ms for the DHT22, which do not answer faster.
+
+            CachedSensor has the methods of the driver, including the steps
+            startConversion(), conversionTime() and collectValues() used by
+            the SensorScheduler, and in addition
+                - stale         True when the values are from an earlier measurement
+                                because the last one failed
+                - age()         ms since the last good measurement
+                - hits, misses, errors  counters of the cached, measured and failed reads
+
+            The cached list is owned by CachedSensor and only changes on
+            a successful measurement. The cache does not distinguish the
+            arguments of getValues(), use one CachedSensor per DS18B20 probe.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from readCache import CachedSensor
+            cachedDHT22 = CachedSensor(sensorDHT22, maxAge=60000)
+            v = cachedDHT22.getValues()     # measures
+            v = cachedDHT22.getValues()     # within 2 s: cached values
+            if cachedDHT22.stale:
+                print('DHT22 values are %d ms old' % cachedDHT22.age())
+"""
+import time
+
+class CachedSensor:
+    def __init__(self, sensor, minInterval=None, maxAge=None):
+        self.sensor = sensor
+        self.minInterval = getattr(sensor, 'minInterval', 0) if minInterval is None else minInterval
+        self.maxAge = maxAge
+        self.stale = False
+        self.hits = self.misses = self.errors = 0
+        self._values = None     # copy of the last good values
+        self._ticks = 0         # ticks_ms of the last good measurement
+        self._pending = False   # a conversion was started by startConversion()
+        self._failed = False    # startConversion() raised OSError
+
+    """ Delegates all other attributes, e.g. showValues(), to the driver """
+    def __getattr__(self, name):
+        return getattr(self.sensor, name)
+
+    def age(self):
+        if self._values is None:
+            return None
+        return time.ticks_diff(time.ticks_ms(), self._ticks)
+
+    def _fresh(self):
+        return self._values is not None and self.age() < self.minInterval
+
+    def _store(self, values):
+        if self._values is None:
+            self._values = list(values)
+        else:
+            for i in range(len(values)):
+                self._values[i] = values[i]
+        self._ticks = time.ticks_ms()
+        self.stale = False
+        return self._values
+
+    def _fallback(self):
+        self.errors += 1
+        if self._values is None or (self.maxAge is not None and self.age() > self.maxAge):
+            return False
+        self.stale = True
+        return True
+
+    def getValues(self, *args):
+        if self._fresh():
+            self.hits += 1
+            return self._values
+        self.misses += 1
+        try:
+            return self._store(self.sensor.getValues(*args))
+        except OSError:
+            if not self._fallback():
+                raise
+            return self._values
+
+    def startConversion(self, *args):
+        self._pending = self._failed = False
+        if self._fresh():
+            return
+        try:
+            self.sensor.startConversion(*args)
+            self._pending = True
+        except OSError:
+            self._failed = True
+
+    """
+    ms of the conversion started or, before startConversion(), of the one
+    a cache miss would start, e.g. for the budget of the SensorScheduler.
+    0 on a cache hit and after a failed start.
+    """
+    def conversionTime(self):
+        if self._pending or not (self._failed or self._fresh()):
+            return self.sensor.conversionTime()
+        return 0
+
+    def collectValues(self, *args):
+        if not self._pending and not self._failed:
+            self.hits += 1
+            return self._values
+        self.misses += 1
+        self._pending = False
+        try:
+            if self._failed:
+                self._failed = False
+                raise OSError('conversion failed')
+            return self._store(self.sensor.collectValues(*args))
+        except OSError:
+            if not self._fallback():
+                raise
+            return self._values
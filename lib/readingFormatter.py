@@ -0,0 +1,244 @@
+"""
+Module      readingFormatter.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Formats the readings of a cycle into a preallocated buffer and
+            writes them with a single write() per cycle, e.g. to the UART.
+            The values are rounded to integers and the digits are written
+            into the buffer one by one, there is no float formatting and no
+            string is built, labels, units and names are encoded once in the
+            constructor. The digits equal those of '%.1f', a value next to a
+            tie of the rounding, e.g. 39.55, is left to '%.1f'. The layouts
+                HUMAN   the text of showValues() of the drivers, a sensor is
+                            SHT31
+                            -----
+                            tC = 23.1 °C
+                            ...
+                        followed by an empty line, 'no values' for a failed read
+                CSV     a line per sensor: name, time.time(), values
+                            SHT31,1792200040,23.10,73.58,44.10,10.23
+                JSON    a JSON object per line as served by telemetryServer.py
+                            {"name": "SHT31", "t": 1792200040, "values": [23.10, ...]}
+            HUMAN shows the decimal places of showValues(), CSV and JSON show
+            decimals places.
+            The labels of the values depend on their number: 2 of the
+            DS18B20, 4 of the DHT11, DHT22 and SHT31 and 7 of the BME280,
+            other sensors get v0, v1, ...
+
+            begin() starts a cycle, add(name, values) formats the values of
+            a sensor and write() writes the cycle to out. On MicroPython the
+            length is passed to the stream, write(buffer, n), so no memoryview
+            is created either. Without out the cycle goes to sys.stdout, after
+            the text printed so far. A buffer that would overflow is written
+            before the next sensor. bytes, writes and cycles count the output.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from machine import UART
+            from readingFormatter import ReadingFormatter, CSV
+            output = ReadingFormatter(('DHT22', 'SHT31', 'BME280'), CSV, out=UART(0, 115200))
+            output.begin()
+            output.add('SHT31', sensorSHT31.getValues())
+            output.add('BME280', sensorBME280.getValues())
+            output.write()
+"""
+import sys
+import time
+
+HUMAN = const(0)
+CSV = const(1)
+JSON = const(2)
+MAX_VALUES = const(8)
+
+# (label, unit, width, decimals) of the values in the layout HUMAN
+_TEMPERATURES = ((b'tC', b'\xc2\xb0C', 4, 1), (b'tF', b'\xc2\xb0F', 4, 1))
+_HUMIDITIES = _TEMPERATURES + ((b'rH', b'%', 4, 1), (b'dP', b'\xc2\xb0\xf0\x9f\x92\xa7', 4, 1))
+_BME280 = _HUMIDITIES + ((b'airPres', b'hPa', 5, 1), (b'localNP', b'hPa', 5, 1), (b'locAlt ', b'masl', 0, 0))
+_OTHERS = tuple((('v%d' % i).encode(), b'', 0, 2) for i in range(MAX_VALUES))
+FIELDS = {2: _TEMPERATURES, 4: _HUMIDITIES, 7: _BME280}
+
+""" (text before the number, text after it, width, decimals) of the fields """
+def _lines(fields):
+    return tuple((label + b' = ', (b' ' + unit if unit else b'') + b'\n', width, decimals)
+                 for label, unit, width, decimals in fields)
+
+_LINES = {count: _lines(fields) for count, fields in FIELDS.items()}
+_OTHER_LINES = _lines(_OTHERS)
+
+_SCALES = (1, 10, 100, 1000, 10000)
+_POWERS = tuple(10 ** i for i in range(16))     # a number has at most 15 digits
+_FORMATS = tuple('%%.%df' % decimals for decimals in range(len(_SCALES)))
+_SPACES = tuple(b' ' * i for i in range(8))
+_TIE = 1e-6     # relative distance from .5 below which the rounding is left to '%.nf'
+_MICROPYTHON = sys.implementation.name == 'micropython'
+
+class ReadingFormatter:
+    def __init__(self, names, layout=HUMAN, out=None, decimals=2):
+        if not names:
+            raise ValueError('at least one sensor name is required')
+        if layout not in (HUMAN, CSV, JSON):
+            raise ValueError('layout must be HUMAN, CSV or JSON')
+        if not 0 <= decimals < len(_SCALES):
+            raise ValueError('decimals must be within 0..%d' % (len(_SCALES) - 1))
+        self._flushText = out is None and not _MICROPYTHON     # print() buffers text on CPython
+        if out is None:
+            out = getattr(sys.stdout, 'buffer', sys.stdout)
+        self.layout = layout
+        self.out = out
+        self.decimals = decimals
+        self.bytes = 0      # bytes written
+        self.writes = 0     # calls of out.write()
+        self.cycles = 0
+        self._index = {name: i for i, name in enumerate(names)}
+        self._names = tuple(name.encode() for name in names)
+        self._rules = tuple(b'-' * len(name) for name in self._names)
+        # a value takes at most 8 characters of label, 8 of unit and 24 of number and separators
+        self._recordSize = max(len(name) for name in self._names) * 2 + 40 + MAX_VALUES * 48
+        self._buffer = bytearray(1 + len(names) * self._recordSize)
+        self._view = memoryview(self._buffer)
+        self._len = 0
+        self._t = 0
+
+    """ Starts a cycle of readings taken at t, time.time() by default """
+    def begin(self, t=None):
+        self._t = int(time.time()) if t is None else t
+        self._len = 0
+        self.cycles += 1
+        if self.layout == HUMAN:
+            self._buffer[0] = 0x0A      # an empty line before the cycle
+            self._len = 1
+
+    """ Formats the values of the sensor name, None for a failed read """
+    def add(self, name, values):
+        i = self._index.get(name)
+        if i is None:
+            raise ValueError('unknown sensor %s' % name)
+        if self._len + self._recordSize > len(self._buffer):
+            self.write()
+        if self.layout == HUMAN:
+            self._human(i, values)
+        elif self.layout == CSV:
+            self._csv(i, values)
+        else:
+            self._json(i, values)
+
+    """ Writes the formatted cycle to out in one call, returns the bytes written """
+    def write(self):
+        n = self._len
+        if n == 0:
+            return 0
+        if _MICROPYTHON:
+            self.out.write(self._buffer, n)
+        else:
+            if self._flushText:
+                sys.stdout.flush()
+            self.out.write(self._view[:n])
+            if self._flushText:
+                self.out.flush()
+        self._len = 0
+        self.bytes += n
+        self.writes += 1
+        return n
+
+    """ The formatted bytes of the cycle not yet written """
+    def pending(self):
+        return self._view[:self._len]
+
+    def _human(self, i, values):
+        pos = self._copy(self._len, self._names[i])
+        self._buffer[pos] = 0x0A
+        pos = self._copy(pos + 1, self._rules[i])
+        self._buffer[pos] = 0x0A
+        pos += 1
+        if values is None:
+            pos = self._copy(pos, b'no values\n')
+        else:
+            lines = _LINES.get(len(values), _OTHER_LINES)
+            for k in range(min(len(values), MAX_VALUES)):
+                before, after, width, decimals = lines[k]
+                pos = self._copy(pos, before)
+                pos = self._number(pos, values[k], decimals, width)
+                pos = self._copy(pos, after)
+        self._buffer[pos] = 0x0A
+        self._len = pos + 1
+
+    def _csv(self, i, values):
+        pos = self._copy(self._len, self._names[i])
+        self._buffer[pos] = 0x2C
+        pos = self._number(pos + 1, self._t, 0, 0)
+        if values is not None:
+            for k in range(min(len(values), MAX_VALUES)):
+                self._buffer[pos] = 0x2C
+                pos = self._number(pos + 1, values[k], self.decimals, 0)
+        self._buffer[pos] = 0x0A
+        self._len = pos + 1
+
+    def _json(self, i, values):
+        pos = self._copy(self._len, b'{"name": "')
+        pos = self._copy(pos, self._names[i])
+        pos = self._copy(pos, b'", "t": ')
+        pos = self._number(pos, self._t, 0, 0)
+        pos = self._copy(pos, b', "values": [')
+        if values is not None:
+            for k in range(min(len(values), MAX_VALUES)):
+                if k:
+                    pos = self._copy(pos, b', ')
+                pos = self._number(pos, values[k], self.decimals, 0)
+        pos = self._copy(pos, b']}\n')
+        self._len = pos
+
+    """ Copies the bytes of data into the buffer at pos, returns the position after them """
+    def _copy(self, pos, data):
+        end = pos + len(data)
+        self._buffer[pos:end] = data
+        return end
+
+    """
+    Writes value rounded to decimals places, right aligned in width characters.
+    The digits are written from the right directly into the buffer. A value
+    whose scaled fraction is about .5 is formatted with '%.nf' instead, the
+    product value * 10^n is rounded itself and could round the other way
+    than the value, e.g. 39.55 is 39.549999.. and '%.1f' gives 39.5.
+    """
+    def _number(self, pos, value, decimals, width):
+        scaled = value * _SCALES[decimals]
+        negative = scaled < 0
+        if negative:
+            scaled = -scaled
+        n = int(scaled + 0.5)
+        if -_TIE * (scaled + 1) < n - scaled - 0.5 < _TIE * (scaled + 1):
+            return self._formatted(pos, value, decimals, width)
+        length = decimals + 1   # digits, at least 0.x
+        while length < len(_POWERS) and n >= _POWERS[length]:
+            length += 1
+        if length == len(_POWERS):
+            raise ValueError('%s is too large to format' % value)
+        size = length + (1 if decimals else 0) + negative
+        if size < width:
+            pos = self._copy(pos, _SPACES[width - size])
+        buf = self._buffer
+        if negative:
+            buf[pos] = 0x2D
+        end = pos + size
+        k = end
+        for _ in range(decimals):       # the digits from the right
+            k -= 1
+            buf[k] = 0x30 + n % 10
+            n //= 10
+        if decimals:
+            k -= 1
+            buf[k] = 0x2E
+        for _ in range(length - decimals):
+            k -= 1
+            buf[k] = 0x30 + n % 10
+            n //= 10
+        return end
+
+    """ Writes value with '%.nf', only for the rare values next to a tie """
+    def _formatted(self, pos, value, decimals, width):
+        text = (_FORMATS[decimals] % value).encode()
+        if len(text) < width:
+            pos = self._copy(pos, _SPACES[width - len(text)])
+        return self._copy(pos, text)
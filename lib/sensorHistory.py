@@ -0,0 +1,323 @@
+"""
+Module      sensorHistory.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Fixed-capacity history of sensor readings in a ring buffer.
+            The values are stored as scaled integers in an array('h') or
+            array('i') together with their timestamps in seconds, so the
+            memory footprint is fixed when the history is created:
+                capacity * (nbrFields * itemsize + 4) bytes
+            e.g. 24 h at one sample every 15 s with tC and rH as 'h':
+                5760 * (2 * 2 + 4) = 46 kB, or 11.5 kB for a sample per minute.
+
+            For each configured window (number of newest samples) add() keeps
+            the sum and the sum of squares of the deviations from the first
+            sample ever added, the new sample is added, the one leaving the
+            window subtracted. The sums are exact ints, small ints as long as
+            window * deviation ** 2 stays below 2 ** 30, e.g. 43 °C for 5760
+            samples of scale 10. The minimum and maximum come from a monotonic
+            deque per window: the ring positions of the samples that can still
+            become the minimum (maximum), ascending (descending) in value, the
+            front is the minimum. So add() is amortized O(windows) and mean(),
+            variance(), min() and max() of a configured window are O(1).
+            The deques take 2 * nbrFields * sum(windows) positions of 2 bytes
+            (4 bytes for a capacity above 65536), 47 kB for the example above.
+
+            Ad-hoc windows (samples=n) are combined from blocks of blockSize
+            samples in the order they were added, by default about the square
+            root of the capacity (75 for 5760). add() updates the minimum,
+            maximum, sum and sum of squares of the open block in constant time,
+            the sums of the deviations from the first value of the block in
+            array('f'), so they neither grow nor allocate. A statistic over
+            the n newest samples combines the blocks inside and the single
+            samples at the two ends, about n / blockSize + 2 * blockSize steps,
+            e.g. 225 for 5760. The blocks take nbrFields * (2 * itemsize + 8)
+            bytes each, 1.5 kB for the example above.
+
+            Methods
+                - add(values, now=None) stores the selected fields of a values list
+                - last(field, age=0)    value of age samples before the newest one
+                - timestamp(age=0)      time in seconds of that sample
+                - min(field, window=0, samples=None), max(), mean(), variance()
+                                        statistics over windows[window] newest samples,
+                                        or over the samples newest ones if given
+                - stats(field, window=0, samples=None)
+                                        returns (n, min, max, mean, variance)
+
+            field is the position in the fields tuple given to the constructor,
+            not the index in the values list of the sensor.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from sensorHistory import SensorHistory
+            # tC and rH of the last 24 h at 15 s, statistics over 1 h and 24 h
+            sensorSHT31.history = SensorHistory(5760, fields=(0, 2), windows=(240, 5760))
+            ...
+            n, tMin, tMax, tMean, tVar = sensorSHT31.history.stats(0, window=1)
+            tMean3h = sensorSHT31.history.mean(0, samples=720)
+"""
+from array import array
+import time
+
+_LIMITS = {
+    'h': (-32768, 32767),
+    'i': (-2147483648, 2147483647)
+    }
+
+class SensorHistory:
+    def __init__(self, capacity, fields=(0,), scale=10, windows=None, typecode='h', blockSize=None):
+        if typecode not in _LIMITS:
+            raise ValueError("Unexpected typecode {0}. Use 'h' or 'i'".format(typecode))
+        if windows is None:
+            windows = (capacity,)
+        for w in windows:
+            if not 0 < w <= capacity:
+                raise ValueError('Window {0} must be within 1..capacity'.format(w))
+        if blockSize is None:
+            blockSize = max(8, int(capacity ** 0.5))
+        if blockSize < 1:
+            raise ValueError('blockSize must be >= 1')
+        self._capacity = capacity
+        self._fields = fields
+        self._nbrFields = len(fields)
+        self._scale = scale
+        self._windows = windows
+        self._lo, self._hi = _LIMITS[typecode]
+        self._data = array(typecode, [0] * (capacity * self._nbrFields))
+        self._ticks = array('I', [0] * capacity)
+        self._head = 0      # position of the next sample
+        self._count = 0     # number of stored samples
+        self._added = 0     # number of samples ever added, numbers the blocks
+        # statistics of the blocks in a ring, at [block * nbrFields + field], enough
+        # blocks that those of the samples in the ring are never overwritten
+        self._block = blockSize
+        self._nbrBlocks = capacity // blockSize + 2
+        n = self._nbrBlocks * self._nbrFields
+        self._ref = array(typecode, [0] * n)     # first value of the block
+        self._min = array(typecode, [0] * n)
+        self._max = array(typecode, [0] * n)
+        self._sum = array('f', [0] * n)         # sum of the deviations from _ref
+        self._sumSq = array('f', [0] * n)       # sum of their squares
+        # running sums of the configured windows at [window * nbrFields + field],
+        # of the deviations from _origin, the first value added
+        self._origin = array(typecode, [0] * self._nbrFields)
+        n = len(windows) * self._nbrFields
+        self._wSum = [0] * n
+        self._wSumSq = [0] * n
+        # monotonic deques of ring positions, for the minimum at 2 * k and the
+        # maximum at 2 * k + 1, deque q holds up to windows[window] positions
+        # from _qStart[q] in _queue, _qFront and _qLen are its front and length
+        self._qStart = array('I', [0] * (2 * n))
+        start = 0
+        for q in range(2 * n):
+            self._qStart[q] = start
+            start += windows[q // 2 // self._nbrFields]
+        self._queue = array('H' if capacity <= 65536 else 'I', [0] * start)
+        self._qFront = [0] * (2 * n)
+        self._qLen = [0] * (2 * n)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    """ Position in the ring of the sample age samples before the newest one """
+    def _pos(self, age):
+        pos = self._head - 1 - age
+        return pos + self._capacity if pos < 0 else pos
+
+    def _raw(self, field, age):
+        return self._data[self._pos(age) * self._nbrFields + field]
+
+    """ Number of samples in window w """
+    def _size(self, w):
+        size = self._windows[w]
+        return self._count if self._count < size else size
+
+    """ Stores the fields of the values list, now is the time in seconds """
+    def add(self, values, now=None):
+        if now is None:
+            now = time.time()
+        nf = self._nbrFields
+        base = self._head * nf
+        block = (self._added // self._block) % self._nbrBlocks * nf
+        first = self._added % self._block == 0
+        for f in range(nf):
+            v = round(values[self._fields[f]] * self._scale)
+            if v < self._lo:
+                v = self._lo
+            elif v > self._hi:
+                v = self._hi
+            if self._added == 0:
+                self._origin[f] = v
+            self._slide(f, v)       # before v overwrites the oldest sample
+            k = block + f
+            if first:
+                self._ref[k] = self._min[k] = self._max[k] = v
+                self._sum[k] = self._sumSq[k] = 0
+            else:
+                d = v - self._ref[k]
+                self._sum[k] += d
+                self._sumSq[k] += d * d
+                if v < self._min[k]:
+                    self._min[k] = v
+                elif v > self._max[k]:
+                    self._max[k] = v
+            self._data[base + f] = v
+        self._ticks[self._head] = int(now)
+        self._head = self._head + 1 if self._head + 1 < self._capacity else 0
+        if self._count < self._capacity:
+            self._count += 1
+        self._added += 1
+
+    """ Moves the configured windows of field f by the new value v """
+    def _slide(self, f, v):
+        nf = self._nbrFields
+        d = v - self._origin[f]
+        for w in range(len(self._windows)):
+            size = self._windows[w]
+            k = w * nf + f
+            if self._count >= size:     # the oldest sample leaves the window
+                leave = self._head - size
+                if leave < 0:
+                    leave += self._capacity
+                old = self._data[leave * nf + f] - self._origin[f]
+                self._wSum[k] += d - old
+                self._wSumSq[k] += d * d - old * old
+            else:
+                leave = -1
+                self._wSum[k] += d
+                self._wSumSq[k] += d * d
+            self._push(2 * k, f, size, leave, v, True)
+            self._push(2 * k + 1, f, size, leave, v, False)
+
+    """
+    Appends the position of the new value v to the deque q after dropping
+    the leaving position from its front and the values not below (lower)
+    or not above v from its back
+    """
+    def _push(self, q, f, size, leave, v, lower):
+        queue = self._queue
+        start = self._qStart[q]
+        front = self._qFront[q]
+        n = self._qLen[q]
+        if n and queue[start + front] == leave:
+            front = front + 1 if front + 1 < size else 0
+            n -= 1
+        nf = self._nbrFields
+        while n:
+            back = front + n - 1
+            if back >= size:
+                back -= size
+            b = self._data[queue[start + back] * nf + f]
+            if (b < v) if lower else (b > v):
+                break
+            n -= 1
+        back = front + n
+        if back >= size:
+            back -= size
+        queue[start + back] = self._head
+        self._qFront[q] = front
+        self._qLen[q] = n + 1
+
+    """ Value at the front of the deque q """
+    def _front(self, q, field):
+        return self._data[self._queue[self._qStart[q] + self._qFront[q]] * self._nbrFields + field]
+
+    """ Returns (n, min, max, mean, variance) of the raw values of the configured window """
+    def _windowStats(self, field, window):
+        n = self._size(window)
+        if n == 0:
+            return 0, None, None, None, None
+        k = window * self._nbrFields + field
+        mean = self._wSum[k] / n
+        var = self._wSumSq[k] / n - mean * mean
+        return (n, self._front(2 * k, field), self._front(2 * k + 1, field),
+                self._origin[field] + mean, var if var > 0 else 0.0)
+
+    """
+    Returns (n, min, max, mean, variance) of the raw values of the n newest
+    samples, combines the blocks and single samples with the pairwise update
+    of the mean and the sum of squared deviations (Chan et al.)
+    """
+    def _blockStats(self, field, n):
+        if n > self._count:
+            n = self._count
+        if n == 0:
+            return 0, None, None, None, None
+        size = self._block
+        nf = self._nbrFields
+        end = self._added
+        s = end - n         # number of the oldest sample of the window
+        count = 0
+        mean = m2 = 0.0
+        lo = hi = self._raw(field, 0)
+        while s < end:
+            if s % size == 0 and s + size <= end:   # a whole block
+                k = (s // size) % self._nbrBlocks * nf + field
+                bSum = self._sum[k]
+                bn, bMean, bM2 = size, self._ref[k] + bSum / size, self._sumSq[k] - bSum * bSum / size
+                if self._min[k] < lo:
+                    lo = self._min[k]
+                if self._max[k] > hi:
+                    hi = self._max[k]
+                s += size
+            else:
+                v = self._raw(field, end - 1 - s)
+                bn, bMean, bM2 = 1, v, 0.0
+                if v < lo:
+                    lo = v
+                elif v > hi:
+                    hi = v
+                s += 1
+            total = count + bn
+            delta = bMean - mean
+            mean += delta * bn / total
+            m2 += bM2 + delta * delta * count * bn / total
+            count = total
+        return n, lo, hi, mean, m2 / n if m2 > 0 else 0.0
+
+    """ Value of the sample age samples before the newest one """
+    def last(self, field, age=0):
+        if age >= self._count:
+            raise IndexError('history holds only {0} samples'.format(self._count))
+        return self._raw(field, age) / self._scale
+
+    """ Time in seconds of the sample age samples before the newest one """
+    def timestamp(self, age=0):
+        if age >= self._count:
+            raise IndexError('history holds only {0} samples'.format(self._count))
+        return self._ticks[self._pos(age)]
+
+    def min(self, field, window=0, samples=None):
+        return self.stats(field, window, samples)[1]
+
+    def max(self, field, window=0, samples=None):
+        return self.stats(field, window, samples)[2]
+
+    def mean(self, field, window=0, samples=None):
+        return self.stats(field, window, samples)[3]
+
+    """ Population variance of the window """
+    def variance(self, field, window=0, samples=None):
+        return self.stats(field, window, samples)[4]
+
+    """
+    Returns (n, min, max, mean, variance) of the configured window, or of
+    the samples newest samples if given
+    """
+    def stats(self, field, window=0, samples=None):
+        if samples is None:
+            n, lo, hi, mean, var = self._windowStats(field, window)
+        elif samples < 1:
+            raise ValueError('samples must be >= 1')
+        else:
+            n, lo, hi, mean, var = self._blockStats(field, samples)
+        if n == 0:
+            return 0, None, None, None, None
+        scale = self._scale
+        return n, lo / scale, hi / scale, mean / scale, var / (scale * scale)
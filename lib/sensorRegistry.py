@@ -0,0 +1,188 @@
+"""
+Module      sensorRegistry.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Creates the sensors described by a configuration, a tuple of dicts
+            with the keys
+                name        name of the sensor, e.g. 'BME280'
+                driver      'module.Class' of the driver, e.g. 'bme280Sensor.BME280Sensor'
+                bus         'pin'      sensor on a GPIO without discovery (DHT11, DHT22),
+                                       created as Class(Pin(at), **kwargs)
+                            'onewire'  DS18B20 probes on GPIO at, created as
+                                       Class(Pin(at), addrs=romCodes, **kwargs)
+                            'i2c'      device at address at, created as
+                                       Class(i2c=i2c, address=at, **kwargs)
+                at          GPIO number or I2C address
+                kwargs      optional further arguments of the constructor
+                addressArg  optional name of the address argument, default 'address'
+            Further keys, e.g. the deadband for the scheduler, are kept for the
+            main program.
+
+            The driver module of a sensor is only imported when the sensor is
+            present, so unused drivers cost neither flash reads nor heap. The
+            I2C addresses and the 1-Wire ROM codes found by the bus scans are
+            stored in the file cachePath and trusted on the next boot, so the
+            buses are only scanned
+                - when the file or the entry of the bus is missing
+                - when the creation of a sensor with cached addresses fails
+                  with OSError, then the bus is rescanned and the sensor
+                  created once more
+                - after invalidate(), e.g. when a sensor keeps failing
+            A configured I2C address missing from the cache is taken as absent,
+            call rescan() after wiring a new device.
+            cache passes the addresses instead of reading the file, e.g. from
+            RTC memory after deep sleep, addresses() returns them to store.
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from sensorRegistry import SensorRegistry
+            SENSORS = (
+                {'name': 'DHT22', 'driver': 'dht22Sensor.DHT22Sensor', 'bus': 'pin', 'at': 13},
+                {'name': 'DS18B20', 'driver': 'ds18b20Sensor.DS18B20Sensor', 'bus': 'onewire', 'at': 0},
+                {'name': 'BME280', 'driver': 'bme280Sensor.BME280Sensor', 'bus': 'i2c', 'at': 0x76},
+                )
+            registry = SensorRegistry(SENSORS, i2c=I2C(sda=Pin(4), scl=Pin(5)))
+            for entry, sensor in registry.sensors():
+                print(entry['name'], sensor.getValues())
+"""
+import os
+try:
+    import ujson as json
+except ImportError:
+    import json
+try:
+    from ubinascii import hexlify, unhexlify
+except ImportError:
+    from binascii import hexlify, unhexlify
+from machine import Pin
+
+BUSES = ('pin', 'onewire', 'i2c')
+
+class SensorRegistry:
+    def __init__(self, config, i2c=None, cachePath='sensors.json', cache=None):
+        for entry in config:
+            if entry['bus'] not in BUSES:
+                raise ValueError('unknown bus %s of %s' % (entry['bus'], entry['name']))
+            if entry['bus'] == 'i2c' and i2c is None:
+                raise ValueError('An I2C object is required for %s' % entry['name'])
+        self.config = config
+        self.i2c = i2c
+        self.cachePath = cachePath
+        self.scans = 0          # bus scans made, 0 when the cache was trusted
+        self._cache = self._load() if cache is None else cache
+        self._dirty = False
+        self._sensors = None    # [(entry, sensor)] of the present sensors
+
+    def _load(self):
+        try:
+            with open(self.cachePath) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp = self.cachePath + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._cache, f)
+        os.rename(tmp, self.cachePath)
+        self._dirty = False
+
+    """ Returns the I2C addresses, scans the bus when they are not cached or rescan is True """
+    def _i2cAddresses(self, rescan=False):
+        addrs = self._cache.get('i2c')
+        if addrs is None or rescan:
+            addrs = self.i2c.scan()
+            self.scans += 1
+            self._cache['i2c'] = addrs
+            self._dirty = True
+        return addrs
+
+    """ Returns the cached ROM codes of the 1-Wire bus on GPIO pin, None when not cached """
+    def _romCodes(self, pin):
+        roms = self._cache.get('onewire', {}).get(str(pin))
+        if roms is None:
+            return None
+        return [bytearray(unhexlify(rom)) for rom in roms]
+
+    def _storeRomCodes(self, pin, addrs):
+        self._cache.setdefault('onewire', {})[str(pin)] = [hexlify(rom).decode() for rom in addrs]
+        self._dirty = True
+
+    """ Imports the driver module and returns the class """
+    def _driver(self, entry):
+        module, cls = entry['driver'].rsplit('.', 1)
+        return getattr(__import__(module), cls)
+
+    """ Creates the sensor of entry or returns None when it is absent """
+    def _create(self, entry, rescan=False):
+        bus, at = entry['bus'], entry['at']
+        kwargs = dict(entry.get('kwargs', {}))
+        if bus == 'pin':
+            return self._driver(entry)(Pin(at), **kwargs)
+        if bus == 'i2c':
+            if at not in self._i2cAddresses(rescan):
+                return None
+            kwargs[entry.get('addressArg', 'address')] = at
+            return self._driver(entry)(i2c=self.i2c, **kwargs)
+        roms = None if rescan else self._romCodes(at)
+        if roms is not None and not roms:
+            return None     # no probes found at the last scan
+        sensor = self._driver(entry)(Pin(at), addrs=roms, **kwargs)
+        if roms is None:    # the driver scanned the bus
+            self.scans += 1
+            self._storeRomCodes(at, sensor.addrs)
+            if not sensor.addrs:
+                return None
+        return sensor
+
+    """
+    Creates the present sensors on the first call and returns
+    the list of (entry, sensor) in the order of the configuration
+    """
+    def sensors(self):
+        if self._sensors is not None:
+            return self._sensors
+        self._sensors = []
+        for entry in self.config:
+            try:
+                sensor = self._create(entry)
+            except OSError:
+                # cached addresses may be outdated, scan the bus and retry once
+                try:
+                    sensor = self._create(entry, rescan=entry['bus'] != 'pin')
+                except OSError as e:
+                    print('%s not available: %s' % (entry['name'], e))
+                    sensor = None
+            if sensor is not None:
+                self._sensors.append((entry, sensor))
+        if self._dirty:
+            self._save()
+        return self._sensors
+
+    """ Returns the dict of the cached addresses {'i2c': [addr], 'onewire': {'pin': [hex rom]}} """
+    def addresses(self):
+        return self._cache
+
+    """ Returns the sensor with the given name or None when it is absent """
+    def get(self, name):
+        for entry, sensor in self.sensors():
+            if entry['name'] == name:
+                return sensor
+        return None
+
+    """ Deletes the cache, the buses are scanned at the next boot """
+    def invalidate(self):
+        if self._cache:
+            self._cache = {}
+            try:
+                os.remove(self.cachePath)
+            except OSError:
+                pass
+
+    """ Scans the buses again at once and recreates the sensors """
+    def rescan(self):
+        self.invalidate()
+        self._sensors = None
+        return self.sensors()
@@ -0,0 +1,208 @@
+"""
+Module      sensorScheduler.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Queries several sensors cooperatively with uasyncio. Every sensor
+            driver splits a measurement into the steps
+                - startConversion()     triggers the conversion and returns at once
+                - conversionTime()      ms the sensor needs to complete the conversion
+                - collectValues(*args)  reads the result and returns the list of values
+            runCycle() starts the conversions of all sensors, awaits them in
+            parallel and collects the results. A cycle therefore lasts about
+            as long as the slowest conversion and not the sum of all of them,
+            and other tasks (e.g. blinking the led) keep running meanwhile.
+            A sensor failing with an exception gets the values None for this
+            cycle, the other sensors are not affected. failures[name] counts
+            the failures of a sensor since its last good measurement, e.g. to
+            tell a missing device from a transient error.
+
+            With budgetMs a cycle lasts at most budgetMs. The worst-case cost
+            of a sensor is costMs given to add() or its conversionTime() plus
+            the busTimeMs of the driver. The conversions overlap, the bus
+            transfers do not, so a cycle costs the longest conversion plus the
+            sum of the bus times. runCycle() admits the sensors in order as
+            long as their cost fits into the budget, sensors deferred in
+            earlier cycles first (round robin), and defers the others to the
+            next cycle. The deadline is budgetMs after the start of the cycle
+            for all sensors, a sensor started later gets only the rest of the
+            budget. A sensor not finished at the deadline is cancelled and
+            gets the values None. budgetStats() yields (name, costMs, runs,
+            deferrals, timeouts), misses counts the cycles that exceeded
+            the budget or had a timeout.
+
+            The module also provides
+                - waitIsOver(msCycle)   returns True when the period has elapsed
+                - sleepMs(ms)           awaitable sleep for uasyncio and asyncio
+                - waitForMs(coro, ms)   awaits coro, raises asyncio.TimeoutError after ms
+                - worstCaseMs(sensor)   conversionTime() plus busTimeMs of the driver
+
+Board       ESP8266
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from sensorScheduler import SensorScheduler
+            scheduler = SensorScheduler()
+            scheduler.add('DHT22', sensorDHT22)
+            scheduler.add('DS18B20', sensorDS18B20, 0)  # args for collectValues()
+            asyncio.run(scheduler.runCycle())     # returns the number of sensors measured
+            for name, sensor, values in scheduler.results():
+                print(name, values)
+
+            scheduler = SensorScheduler(budgetMs=500)   # at most 500 ms per cycle
+            scheduler.add('DHT22', sensorDHT22)
+            scheduler.add('DS18B20', sensorDS18B20, 0)  # 765 ms, raises ValueError
+"""
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+import time
+
+"""
+    Returns true when the specified time has elapsed
+    msCycle = [msPrevious, msCycle] is a globally defined list
+    which holds the previus ticks_ms and the ms to wait
+"""
+def waitIsOver(msCycle):
+    if time.ticks_diff(time.ticks_ms(), msCycle[0]) >= msCycle[1]:
+        msCycle[0] = time.ticks_ms()
+        return True
+    else:
+        return False
+
+""" Awaitable sleep of ms milliseconds, uasyncio knows sleep_ms(), asyncio does not """
+async def sleepMs(ms):
+    if hasattr(asyncio, 'sleep_ms'):
+        await asyncio.sleep_ms(ms)
+    else:
+        await asyncio.sleep(ms / 1000)
+
+""" Awaits coro for at most ms milliseconds, raises asyncio.TimeoutError when the time is over """
+async def waitForMs(coro, ms):
+    if hasattr(asyncio, 'wait_for_ms'):
+        return await asyncio.wait_for_ms(coro, ms)
+    return await asyncio.wait_for(coro, ms / 1000)
+
+""" Worst-case ms of a measurement: conversion and bus transfers """
+def worstCaseMs(sensor):
+    return sensor.conversionTime() + getattr(sensor, 'busTimeMs', 5)
+
+class SensorScheduler:
+    def __init__(self, budgetMs=None):
+        self._jobs = []     # [name, sensor, args, values]
+        self.budgetMs = budgetMs
+        self._budget = {}   # name -> [costMs or None, runs, deferrals, timeouts, deferred]
+        self.cycles = 0
+        self.misses = 0     # cycles over budget or with a timeout
+        self.failures = {}  # name -> consecutive failed measurements
+
+    """ Registers a sensor, args are passed to its collectValues() """
+    def add(self, name, sensor, *args, costMs=None):
+        self._declare(name, sensor, costMs)
+        self._jobs.append([name, sensor, args, None])
+
+    def _declare(self, name, sensor, cost):
+        self._budget[name] = [cost, 0, 0, 0, 0]
+        self.failures[name] = 0
+        if self.budgetMs is not None and self._cost(name, sensor) > self.budgetMs:
+            raise ValueError('%s costs %d ms, more than the budget of %d ms' %
+                             (name, self._cost(name, sensor), self.budgetMs))
+
+    def _cost(self, name, sensor):
+        cost = self._budget[name][0]
+        return worstCaseMs(sensor) if cost is None else cost
+
+    """
+    Returns the jobs that fit into the budget, deferred ones first,
+    and counts the deferrals of the others
+    """
+    def _admit(self, jobs):
+        if self.budgetMs is None:
+            return jobs
+        budget = self._budget
+        ordered = sorted(jobs, key=lambda job: -budget[job[0]][4])     # stable: registration order
+        admitted = []
+        conversion = bus = 0
+        for job in ordered:
+            b = budget[job[0]]
+            sensor = job[1]
+            busMs = getattr(sensor, 'busTimeMs', 5)
+            convMs = self._cost(job[0], sensor) - busMs
+            if max(conversion, convMs) + bus + busMs <= self.budgetMs:
+                conversion = max(conversion, convMs)
+                bus += busMs
+                admitted.append(job)
+                b[1] += 1
+                b[4] = 0
+            else:
+                b[2] += 1
+                b[4] += 1
+        return admitted
+
+    async def _measureBudgeted(self, job, deadline):
+        try:
+            ms = time.ticks_diff(deadline, time.ticks_ms())   # the rest of the budget
+            if ms <= 0:
+                raise asyncio.TimeoutError
+            await waitForMs(self._measure(job), ms)
+        except asyncio.TimeoutError:
+            job[3] = None
+            self._budget[job[0]][3] += 1
+            return False
+        return True
+
+    """ Measures the admitted jobs in parallel and returns them """
+    async def _runJobs(self, jobs):
+        admitted = self._admit(jobs)
+        if self.budgetMs is None:
+            await asyncio.gather(*[self._measure(job) for job in admitted])
+            return admitted
+        self.cycles += 1
+        t0 = time.ticks_ms()
+        deadline = time.ticks_add(t0, self.budgetMs)
+        done = await asyncio.gather(*[self._measureBudgeted(job, deadline) for job in admitted])
+        if time.ticks_diff(time.ticks_ms(), t0) > self.budgetMs or not all(done):
+            self.misses += 1
+        return admitted
+
+    """ Yields (name, costMs, runs, deferrals, timeouts) of all sensors """
+    def budgetStats(self):
+        for job in self._jobs:
+            b = self._budget[job[0]]
+            yield job[0], self._cost(job[0], job[1]), b[1], b[2], b[3]
+
+    def printBudget(self):
+        print('budget %s ms, %d cycles, %d deadline misses' % (self.budgetMs, self.cycles, self.misses))
+        print('sensor    cost ms      runs  deferred  timeouts')
+        for name, cost, runs, deferrals, timeouts in self.budgetStats():
+            print('%-8s %8d %9d %9d %9d' % (name, cost, runs, deferrals, timeouts))
+
+    async def _measure(self, job):
+        sensor = job[1]
+        try:
+            sensor.startConversion()
+            ms = sensor.conversionTime()
+            if ms > 0:
+                t0 = time.ticks_ms()
+                await sleepMs(ms)
+                recordWait = getattr(sensor, 'recordWait', None)    # see instrument.py
+                if recordWait is not None:
+                    recordWait(time.ticks_diff(time.ticks_ms(), t0))
+            job[3] = sensor.collectValues(*job[2])
+            self.failures[job[0]] = 0
+        except Exception:   # OSError of the bus, but a faulty driver must not end the cycle either
+            job[3] = None
+            self.failures[job[0]] += 1
+
+    """
+    Starts the conversions of all sensors and collects the results, returns
+    the number of sensors measured. Sensors deferred by the budget keep the
+    values of their last cycle.
+    """
+    async def runCycle(self):
+        return len(await self._runJobs(self._jobs))
+
+    """ Yields (name, sensor, values) of the last cycle in registration order, values is None for a failed sensor """
+    def results(self):
+        for job in self._jobs:
+            yield job[0], job[1], job[3]
@@ -5,6 +5,14 @@ Author      2023-01-04 Charles Geiser (https://www.dodeka.ch)
 Purpose     Reads a Sensirion SHT31 temperature and humidity sensor connected
             to the i2c bus and provides the methods
                 - getValues         returns a list of measurements [tC, tF, rH, dP]
+                - startConversion() sends a single shot measurement command
+                - conversionTime()  returns the ms to wait before collectValues()
+                - collectValues()   returns the list of the last measurement
+                - showValues()      prints the last measured values
+                - getFixedValues()  returns [tC * 100, rH * 100] without float math
+                - startPeriodic()   starts periodic acquisition with 0.5, 1, 2, 4 or 10 mps
+                - startART()        starts periodic acquisition in ART mode (4 mps)
+                - stopPeriodic()    stops periodic acquisition, back to single shot mode
                 - printValues()     prints the measured values to the terminal as
                                         tC = 23.2 °C
                                         tF = 73.8 °F
@@ -24,9 +32,12 @@ Usage       # Code in main program:
             sensorSHT31.printValues()
             v = sensorSHT31.getValues()
             print('Dewpoint is %4.1f 💧°C' % v[3])
+            sensorSHT31.startPeriodic(sht31Sensor.MPS_1)  # getValues() fetches the latest sample
 """
 from machine import I2C
-from math import log
+from psychrometrics import dewPoint, fahrenheit
+from i2cBus import busOf
+from compensation import sht31Fixed
 import time
 
 SHT31_I2CADDR = const(0x44)
@@ -35,7 +46,35 @@ R_HIGH   = const(1)
 R_MEDIUM = const(2)
 R_LOW    = const(3)
 
+MPS_0_5  = const(0)     # measurements per second in periodic mode
+MPS_1    = const(1)
+MPS_2    = const(2)
+MPS_4    = const(4)
+MPS_10   = const(10)
+
+# CRC-8 lookup table, polynomial 0x31 (x^8 + x^5 + x^4 + 1)
+_CRC8_TABLE = (
+    b'\x00\x31\x62\x53\xc4\xf5\xa6\x97\xb9\x88\xdb\xea\x7d\x4c\x1f\x2e'
+    b'\x43\x72\x21\x10\x87\xb6\xe5\xd4\xfa\xcb\x98\xa9\x3e\x0f\x5c\x6d'
+    b'\x86\xb7\xe4\xd5\x42\x73\x20\x11\x3f\x0e\x5d\x6c\xfb\xca\x99\xa8'
+    b'\xc5\xf4\xa7\x96\x01\x30\x63\x52\x7c\x4d\x1e\x2f\xb8\x89\xda\xeb'
+    b'\x3d\x0c\x5f\x6e\xf9\xc8\x9b\xaa\x84\xb5\xe6\xd7\x40\x71\x22\x13'
+    b'\x7e\x4f\x1c\x2d\xba\x8b\xd8\xe9\xc7\xf6\xa5\x94\x03\x32\x61\x50'
+    b'\xbb\x8a\xd9\xe8\x7f\x4e\x1d\x2c\x02\x33\x60\x51\xc6\xf7\xa4\x95'
+    b'\xf8\xc9\x9a\xab\x3c\x0d\x5e\x6f\x41\x70\x23\x12\x85\xb4\xe7\xd6'
+    b'\x7a\x4b\x18\x29\xbe\x8f\xdc\xed\xc3\xf2\xa1\x90\x07\x36\x65\x54'
+    b'\x39\x08\x5b\x6a\xfd\xcc\x9f\xae\x80\xb1\xe2\xd3\x44\x75\x26\x17'
+    b'\xfc\xcd\x9e\xaf\x38\x09\x5a\x6b\x45\x74\x27\x16\x81\xb0\xe3\xd2'
+    b'\xbf\x8e\xdd\xec\x7b\x4a\x19\x28\x06\x37\x64\x55\xc2\xf3\xa0\x91'
+    b'\x47\x76\x25\x14\x83\xb2\xe1\xd0\xfe\xcf\x9c\xad\x3a\x0b\x58\x69'
+    b'\x04\x35\x66\x57\xc0\xf1\xa2\x93\xbd\x8c\xdf\xee\x79\x48\x1b\x2a'
+    b'\xc1\xf0\xa3\x92\x05\x34\x67\x56\x78\x49\x1a\x2b\xbc\x8d\xde\xef'
+    b'\x82\xb3\xe0\xd1\x46\x77\x24\x15\x3b\x0a\x59\x68\xff\xce\x9d\xac'
+    )
+
 class SHT31Sensor:
+    minInterval = 0                 # ms between two measurements
+    busTimeMs = 1                   # worst-case ms on the bus: command and 6 bytes at 100 kHz
     _commands = {                   # commands: choose clock stretching true or false and
     	True: {                     #           one of the 3 repeatabilities
             R_HIGH   : b'\x2c\x06',
@@ -48,50 +87,185 @@ class SHT31Sensor:
             R_LOW    : b'\x24\x16'
             }
         }
+    _periodicCommands = {           # periodic mode commands: choose measurements per second and
+        MPS_0_5: {                  #                         one of the 3 repeatabilities
+            R_HIGH   : b'\x20\x32',
+            R_MEDIUM : b'\x20\x24',
+            R_LOW    : b'\x20\x2f'
+            },
+        MPS_1: {
+            R_HIGH   : b'\x21\x30',
+            R_MEDIUM : b'\x21\x26',
+            R_LOW    : b'\x21\x2d'
+            },
+        MPS_2: {
+            R_HIGH   : b'\x22\x36',
+            R_MEDIUM : b'\x22\x20',
+            R_LOW    : b'\x22\x2b'
+            },
+        MPS_4: {
+            R_HIGH   : b'\x23\x34',
+            R_MEDIUM : b'\x23\x22',
+            R_LOW    : b'\x23\x29'
+            },
+        MPS_10: {
+            R_HIGH   : b'\x27\x37',
+            R_MEDIUM : b'\x27\x21',
+            R_LOW    : b'\x27\x2a'
+            }
+        }
+    _cmdART   = b'\x2b\x32'       # periodic mode with accelerated response time
+    _cmdFetch = b'\xe0\x00'       # fetch data of periodic mode
+    _cmdBreak = b'\x30\x93'       # stop periodic mode
+    _durations = {                  # max. measurement duration in ms according datasheet
+        R_HIGH   : 16,
+        R_MEDIUM : 7,
+        R_LOW    : 5
+        }
 
     """
     Initializes a sensor object on the given I2C bus with 
     access via the specified address which defaults to 0x44 = 68
     """
     def __init__(self, i2c, addr=SHT31_I2CADDR):
-        self._i2c = i2c
+        self._i2c = busOf(i2c)      # shared bus manager with pooled buffers
         self._addr = addr
         self._values = [0,0,0,0]
+        self.history = None         # optional SensorHistory, filled by every measurement
+        self.capture = None         # optional RawCapture, gets every 6 byte frame
+        self._r = R_HIGH
+        self._periodic = False
 
     """
     Sends the given buffer object over I2C to the sensor.
     """
     def _send(self, buf):
-        self._i2c.writeto(self._addr, buf)
+        self._i2c.writeCmd(self._addr, buf)
 
     """
-    Read nBytes bytes from i2c object.
-    Returns a bytearray as result.
+    Read nBytes bytes from i2c object into a pooled buffer.
+    Returns a memoryview of the buffer, valid until the next read.
     """
     def _recv(self, nBytes):
-        return self._i2c.readfrom(self._addr, nBytes)
+        return self._i2c.readInto(self._addr, nBytes)
+
+    """
+    Read the 6 bytes of a completed measurement into a pooled
+    buffer and check the CRC of both words.
+    Raises OSError when a CRC does not match.
+    Returns a tuple (tCraw, rHraw).
+    """
+    def _readRawValues(self):
+        raw = self._recv(6)
+        if self.capture is not None:
+            self.capture.sht31(self._addr, raw)
+        if _CRC8_TABLE[_CRC8_TABLE[0xFF ^ raw[0]] ^ raw[1]] != raw[2] or \
+           _CRC8_TABLE[_CRC8_TABLE[0xFF ^ raw[3]] ^ raw[4]] != raw[5]:
+            raise OSError('SHT31 CRC mismatch')
+        return (raw[0] << 8) + raw[1], (raw[3] << 8) + raw[4]
+
+    """
+    Starts the periodic acquisition with mps measurements per second
+    (MPS_0_5, MPS_1, MPS_2, MPS_4 or MPS_10) and repeatability r.
+    Reads then fetch the latest sample without waiting. The first
+    sample is available after 1/mps seconds.
+    """
+    def startPeriodic(self, mps=MPS_1, r=R_HIGH):
+        if mps not in self._periodicCommands:
+            raise ValueError('Unexpected mps value {0}. Set mps to one of '
+                             'MPS_0_5, MPS_1, MPS_2, MPS_4 or MPS_10'.format(mps))
+        if r not in self._periodicCommands[mps]:
+            raise ValueError('Unexpected repeatability {0}. Set r to R_HIGH, R_MEDIUM or R_LOW'.format(r))
+        if self._periodic:
+            self.stopPeriodic()
+        self._send(self._periodicCommands[mps][r])
+        self._periodic = True
+
+    """
+    Starts the periodic acquisition with accelerated response time (4 mps)
+    """
+    def startART(self):
+        if self._periodic:
+            self.stopPeriodic()
+        self._send(self._cmdART)
+        self._periodic = True
+
+    """
+    Stops the periodic acquisition and returns to single shot mode
+    """
+    def stopPeriodic(self):
+        self._send(self._cmdBreak)
+        time.sleep_ms(1)
+        self._periodic = False
+
+    def isPeriodic(self):
+        return self._periodic
+
+    """
+    Fetches the latest sample of the periodic acquisition.
+    Raises OSError when no new sample is available since the last fetch.
+    """
+    def _fetchRawValues(self):
+        self._send(self._cmdFetch)
+        return self._readRawValues()
 
     """
     Read raw temperature and humidity from the sensor.
-    No CRC checking is done.
+    In periodic mode the latest sample is fetched without waiting.
     Returns a tuple (tCraw, rHraw).
     """
     def _getRawValues(self, r=R_HIGH, cs=True):
+        if self._periodic:
+            return self._fetchRawValues()
         self._send(self._commands[cs][r])
-        time.sleep_ms(50)
-        raw = self._recv(6)
-        return (raw[0] << 8) + raw[1], (raw[3] << 8) + raw[4]
+        time.sleep_ms(self._durations[r])
+        return self._readRawValues()
 
-    def getValues(self, repeatability=R_HIGH, clockStretch=True):
-        tCraw, rHraw = self._getRawValues(repeatability, clockStretch)
+    """
+    Sends the measurement command and returns without waiting.
+    Clock stretching is off by default, so the bus stays free
+    while the sensor converts. Does nothing in periodic mode.
+    """
+    def startConversion(self, repeatability=R_HIGH, clockStretch=False):
+        if self._periodic:
+            return
+        self._r = repeatability
+        self._send(self._commands[clockStretch][repeatability])
+
+    def conversionTime(self):
+        if self._periodic:
+            return 0
+        return self._durations[self._r]
+
+    def collectValues(self):
+        if self._periodic:
+            return self._computeValues(*self._fetchRawValues())
+        return self._computeValues(*self._readRawValues())
+
+    def _computeValues(self, tCraw, rHraw):
         self._values[0] = -45 + (175 * (tCraw / 65535))   # tC °C
-        self._values[1] = -49 + (315 * (tCraw / 65535))   # tF °F
+        self._values[1] = fahrenheit(self._values[0])     # tF °F
         self._values[2] = 100 * rHraw / 65535             # rH %
-        k = log(self._values[2] / 100) + (17.62 * self._values[0]) / (243.12 + self._values[0])
-        self._values[3] = 243.12 * k / (17.62 - k)       # t💧°C dewpoint
+        self._values[3] = dewPoint(self._values[0], self._values[2]) # t💧°C dewpoint
+        if self.history is not None:
+            self.history.add(self._values)
         return self._values
 
+    def getValues(self, repeatability=R_HIGH, clockStretch=True):
+        return self._computeValues(*self._getRawValues(repeatability, clockStretch))
+
+    """
+    Fixed-point variant of getValues() which uses integer arithmetic only.
+    Fills the caller supplied array('i', ...) of length 2 with
+    [tC * 100, rH * 100] and returns it.
+    """
+    def getFixedValues(self, result, repeatability=R_HIGH, clockStretch=True):
+        tCraw, rHraw = self._getRawValues(repeatability, clockStretch)
+        return sht31Fixed(tCraw, rHraw, result)
+
+    def showValues(self):
+        print('tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\n' % (self._values[0], self._values[1], self._values[2], self._values[3]))
+
     def printValues(self, repeatability=R_HIGH, clockStretch=True):
         self.getValues(repeatability=R_HIGH, clockStretch=True)
-        print('tC = %4.1f °C\ntF = %4.1f °F\nrH = %4.1f %%\ndP = %4.1f °💧\n' % (self._values[0], self._values[1], self._values[2], self._values[3]))
-    
\ No newline at end of file
+        self.showValues()
@@ -0,0 +1,239 @@
+"""
+Module      telemetryServer.py
+Author      2026-10-17 Charles Geiser (https://www.dodeka.ch)
+
+Purpose     Serves the last readings of the sensors over TCP as an uasyncio
+            task. A request never reads a sensor: the main program passes the
+            values of every measurement to update(name, values) and calls
+            publish() after the cycle, which formats both responses once into
+            preallocated buffers. Every request until the next publish() sends
+            the same buffer, so serving costs a socket write only.
+
+            The buffers are doubled: publish() formats into the pair no
+            response is being sent from and then swaps it to the front, so a
+            response still on its way to a slow client is never overwritten.
+            A pair counts as being sent until drain() has passed all of it to
+            the socket. Only if both pairs are still being sent, a client
+            slower than two publish() calls, the back pair is replaced by new
+            buffers, counted by reallocated.
+
+            A client sends one command per line and may keep the connection
+            open for further requests
+                b   binary response (see below)
+                j   JSON lines, one line per sensor
+                        {"name": "SHT31", "t": 1792199866, "values": [23.10, ...]}
+                    followed by an empty line, values is [] for a failed read
+                q   closes the connection
+            Other commands are answered with '?' and a newline. A line longer
+            than MAX_REQUEST bytes is answered with 'too long' and the
+            connection is closed, the request is read in chunks of at most
+            MAX_REQUEST bytes, so a client cannot fill the heap.
+
+            The binary response starts with HEADER_FORMAT
+                version     VERSION
+                count       number of sensor records
+                size        bytes of the records following the header
+            followed by a record per sensor with RECORD_FORMAT
+                id          index of the sensor in names
+                n           number of values, 0 for a failed read
+                t           time.time() of the measurement
+            and n int32 values scaled by 100 (fixed point, 2 decimals).
+
+            At most maxClients connections are served at once, further ones
+            get 'busy' and are closed. requests, clients and rejected count
+            the requests served, the connections accepted and refused,
+            tooLong the connections closed for a line too long.
+
+Board       ESP8266 with a WLAN connection, e.g. set up in boot.py
+Firmware    micropython from https://micropython.org
+
+Usage       # Code in main program:
+            from telemetryServer import TelemetryServer
+            telemetry = TelemetryServer(('DHT22', 'SHT31', 'BME280'), port=8266)
+            await telemetry.start()
+            ...
+            for name, sensor, values in scheduler.measured():
+                telemetry.update(name, values)
+            telemetry.publish()
+
+            # Code on a PC:
+            $ echo j | nc -q 1 192.168.1.50 8266
+"""
+import time
+try:
+    from ustruct import pack_into, calcsize
+except ImportError:
+    from struct import pack_into, calcsize
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+VERSION = const(1)
+HEADER_FORMAT = '<BBH'
+HEADER_SIZE = calcsize(HEADER_FORMAT)
+RECORD_FORMAT = '<BBI'
+RECORD_SIZE = calcsize(RECORD_FORMAT)
+MAX_VALUES = const(8)
+MAX_REQUEST = const(16)     # bytes of a request line, the newline included
+
+class TelemetryServer:
+    def __init__(self, names, port=8266, maxClients=4, host='0.0.0.0'):
+        if not names:
+            raise ValueError('at least one sensor name is required')
+        self.names = tuple(names)
+        self.port = port
+        self.host = host
+        self.maxClients = maxClients
+        self.requests = 0
+        self.clients = 0
+        self.rejected = 0
+        self.tooLong = 0
+        self.reallocated = 0
+        self._active = 0
+        self._server = None
+        self._values = [None] * len(self.names)    # last values of every sensor
+        self._times = [0] * len(self.names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        self._binarySize = HEADER_SIZE + len(self.names) * (RECORD_SIZE + 4 * MAX_VALUES)
+        # a value takes at most 14 characters, e.g. '-21474836.48, '
+        self._jsonSize = sum(40 + len(name) + 14 * MAX_VALUES for name in self.names) + 1
+        self._binary = [bytearray(self._binarySize), bytearray(self._binarySize)]
+        self._json = [bytearray(self._jsonSize), bytearray(self._jsonSize)]
+        self._sending = [0, 0]      # responses being sent from each pair
+        self._front = 1
+        self.publish()      # empty responses until the first measurement
+
+    """ Keeps the values of a measurement, None for a failed read, sensors not in names are ignored """
+    def update(self, name, values):
+        i = self._index.get(name)
+        if i is None:
+            return
+        if values is None:
+            self._values[i] = ()
+        else:
+            self._values[i] = tuple(values[:MAX_VALUES])    # the driver reuses its list
+        self._times[i] = int(time.time())
+
+    """ Formats the kept values into the response buffers, sensors never updated are left out """
+    def publish(self):
+        back = 1 - self._front
+        if self._sending[back]:
+            # still sent to a client slower than two publish() calls, leave it to that client
+            self._binary[back] = bytearray(self._binarySize)
+            self._json[back] = bytearray(self._jsonSize)
+            self._sending[back] = 0
+            self.reallocated += 1
+        binary = self._binary[back]
+        json = self._json[back]
+        offset = HEADER_SIZE
+        jsonLen = 0
+        count = 0
+        for i, values in enumerate(self._values):
+            if values is None:
+                continue
+            count += 1
+            pack_into(RECORD_FORMAT, binary, offset, i, len(values), self._times[i])
+            offset += RECORD_SIZE
+            for value in values:
+                pack_into('<i', binary, offset, round(value * 100))
+                offset += 4
+            line = ('{"name": "%s", "t": %d, "values": [%s]}\n' % (
+                self.names[i], self._times[i], ', '.join('%.2f' % v for v in values))).encode()
+            json[jsonLen:jsonLen + len(line)] = line
+            jsonLen += len(line)
+        pack_into(HEADER_FORMAT, binary, 0, VERSION, count, offset - HEADER_SIZE)
+        json[jsonLen] = 0x0A     # the empty line ends the response
+        self._binaryResponse = memoryview(binary)[:offset]
+        self._jsonResponse = memoryview(json)[:jsonLen + 1]
+        self._front = back
+
+    """ Starts listening, the connections are served by tasks of the running event loop """
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def _serve(self, reader, writer):
+        if self._active >= self.maxClients:
+            self.rejected += 1
+            writer.write(b'busy\n')
+            await self._close(writer)
+            return
+        self._active += 1
+        self.clients += 1
+        transport = getattr(writer, 'transport', None)
+        if transport is not None:
+            transport.set_write_buffer_limits(0)    # CPython, drain() waits until the socket took all
+        try:
+            await self._requests(reader, writer)
+        except OSError:
+            pass    # the client went away
+        finally:
+            self._active -= 1
+            await self._close(writer)
+
+    """
+    Answers the request lines of a connection until the client quits. Only
+    the first byte of a line is kept, the line is read in chunks of at most
+    MAX_REQUEST bytes and must end within MAX_REQUEST bytes.
+    """
+    async def _requests(self, reader, writer):
+        command = 0
+        n = 0   # bytes of the current line
+        while True:
+            data = await reader.read(MAX_REQUEST)
+            if not data:
+                return
+            for c in data:
+                if c == 0x0A:
+                    if not await self._answer(writer, command):
+                        return
+                    command = n = 0
+                    continue
+                if n == 0:
+                    command = c
+                n += 1
+                if n >= MAX_REQUEST:
+                    self.tooLong += 1
+                    writer.write(b'too long\n')
+                    return
+
+    """ Answers a command, returns False when the client quits """
+    async def _answer(self, writer, command):
+        if command == 0x62:     # b
+            await self._send(writer, self._binaryResponse)
+            self.requests += 1
+        elif command == 0x6A:   # j
+            await self._send(writer, self._jsonResponse)
+            self.requests += 1
+        elif command == 0x71:   # q
+            return False
+        else:
+            writer.write(b'?\n')
+            await writer.drain()
+        return True
+
+    """ Sends a response of the front pair, which publish() leaves alone until it is sent """
+    async def _send(self, writer, response):
+        front = self._front
+        binary = self._binary[front]
+        self._sending[front] += 1
+        try:
+            writer.write(response)
+            await writer.drain()
+        finally:
+            if self._binary[front] is binary:   # not replaced by publish() meanwhile
+                self._sending[front] -= 1
+
+    async def _close(self, writer):
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except OSError:
+            pass
@@ -50,64 +50,174 @@ Wiring      DHT11-Sensor                        DHT22-Sensor
                     '---------------------------'
 """
 
-from machine       import Pin, I2C
-from dht11Sensor   import DHT11Sensor
-from dht22Sensor   import DHT22Sensor
-from ds18b20Sensor import DS18B20Sensor
-from bme280Sensor  import BME280Sensor
-import sht31Sensor
 import time
+bootMs = time.ticks_ms()
+from machine       import Pin, I2C
 
-ledBuiltin = const(2)
-led = Pin(ledBuiltin, Pin.OUT)
-
-sensorDHT11 = DHT11Sensor(Pin(12))
-sensorDHT22 = DHT22Sensor(Pin(13))
-sensorDS18B20 = DS18B20Sensor(Pin(0))
-
-print('\n\nNumber of detected DS18B20-Sensors = %d' % sensorDS18B20.getNbrSensors())
+# The sensors of the board. A driver is only imported when its sensor is present, the
+# addresses found on the buses are cached in sensors.json (delete it after rewiring).
+# args are passed to collectValues(), every sensor is queried between every 5 s and
+# every 5 minutes depending on how much its values change (deadband {index of value: band}),
+# maxAge wraps the sensor in a CachedSensor, which returns the last good values on a failed read
+SENSORS = (
+    {'name': 'DHT11', 'driver': 'dht11Sensor.DHT11Sensor', 'bus': 'pin', 'at': 12,
+     'deadband': {0: 1.0, 2: 2.0}, 'maxAge': 60000},
+    {'name': 'DHT22', 'driver': 'dht22Sensor.DHT22Sensor', 'bus': 'pin', 'at': 13,
+     'deadband': {0: 0.2, 2: 1.0}, 'maxAge': 60000},
+    {'name': 'DS18B20', 'driver': 'ds18b20Sensor.DS18B20Sensor', 'bus': 'onewire', 'at': 0,
+     'args': (0,), 'deadband': {0: 0.1}},
+    {'name': 'SHT31', 'driver': 'sht31Sensor.SHT31Sensor', 'bus': 'i2c', 'at': 0x44,
+     'addressArg': 'addr', 'deadband': {0: 0.1, 2: 0.5}},
+    {'name': 'BME280', 'driver': 'bme280Sensor.BME280Sensor', 'bus': 'i2c', 'at': 0x76,
+     'deadband': {0: 0.1, 2: 1.0, 4: 0.2}},
+    )
+LOGGED = ('DHT11', 'DHT22', 'DS18B20', 'SHT31', 'BME280')  # order of the flash log record
 
 i2c = I2C(sda=Pin(4), scl=Pin(5))
-addrs = i2c.scan()
-print('\nDevice addresses found on I2C-bus: ')
-print('[{}]'.format(', '.join(hex(x) for x in addrs)))
 
-sensorSHT31 = sht31Sensor.SHT31Sensor(i2c) # default i2c address used 0x44
-sensorBME280 = BME280Sensor(i2c=i2c)       # default i2c address used 0x76
-sensorBME280.localAltitude = 405           # my local altitude above sea level
+# > 0: sample all sensors every DUTY_CYCLE_MS and deep-sleep in between (wire GPIO16 to RST),
+# the records are written to the flash log every 20 wakes, see dutyCycle.py.
+# The modules of the continuous mode below are not even imported then.
+DUTY_CYCLE_MS = 0
+if DUTY_CYCLE_MS and __name__ == '__main__':
+    from dutyCycle import DutyCycle
+    duty = DutyCycle(SENSORS, i2c, periodMs=DUTY_CYCLE_MS, flushEvery=20, logged=LOGGED, start=bootMs)
+    sensorBME280 = duty.registry.get('BME280')
+    if sensorBME280 is not None:
+        sensorBME280.localAltitude = 405    # my local altitude above sea level
+    duty.run()      # does not return, the board boots again after DUTY_CYCLE_MS
+
+# The modules of the optional features are imported after the sensors are found and only
+# when the feature is used, so the RAM of a board without them stays free.
+from sensorRegistry import SensorRegistry
+
+ledBuiltin = const(2)
+led = Pin(ledBuiltin, Pin.OUT)
 
-msSensorCycle = [0, 15000]  # holds previous ticks and period of cycle in milliseconds
+registry = SensorRegistry(SENSORS, i2c=i2c)
+print('\n\nSensors found: %s' % ', '.join(entry['name'] for entry, _ in registry.sensors()))
+if registry.scans:
+    print('Buses scanned, addresses stored in %s' % registry.cachePath)
+
+from sensorScheduler import waitIsOver, sleepMs
+from adaptiveScheduler import AdaptiveScheduler
+from readingFormatter import ReadingFormatter, HUMAN, CSV, JSON
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+sensorBME280 = registry.get('BME280')
+pressureTrend = None    # tendency and forecast of the BME280 readings
+if sensorBME280 is not None:
+    from pressureTrend import PressureTrend
+    pressureTrend = PressureTrend()
+    sensorBME280.localAltitude = 405    # my local altitude above sea level
+    sensorBME280.history = pressureTrend
+
+# the readings of a cycle are written to the terminal in one write, HUMAN as text,
+# CSV or JSON lines for a PC logging the serial port, see readingFormatter.py
+output = ReadingFormatter([entry['name'] for entry, _ in registry.sensors()], HUMAN)
+
+# a device on the I2C or 1-Wire bus failing MISSING_AFTER measurements in a row is
+# taken as missing and the buses are rescanned at the next boot. A single failure, e.g. a
+# DHT checksum error or a timeout of the budget, keeps sensors.json.
+MISSING_AFTER = 10
+onBus = [entry['name'] for entry, _ in registry.sensors() if entry['bus'] != 'pin']
+
+# True: count the calls, errors and latencies of the drivers, see instrument.py
+INSTRUMENT = True
+if INSTRUMENT:
+    from instrument import instrument, printStats
+msStatsCycle = [0, 300000]  # print the latency, error and rate statistics every 5 minutes
 
 ledPeriod = 1000    # blink builtin led every second
 ledPulsewidth = 50  # for 50ms
 
-""" 
-    Returns true when the specified time has elapsed
-    msCycle = [msPrevious, msCycle] is a globally defined list
-    which holds the previus ticks_ms and the ms to wait
-"""
-def waitIsOver(msCycle):
-    if (time.ticks_ms() - msCycle[0] >= msCycle[1]):
-        msCycle[0] = time.ticks_ms()
-        return True
-    else:
-        return False
-
-while True:
-    led.value(0 if (time.ticks_ms() % ledPeriod < ledPulsewidth) else 1)
-
-    if waitIsOver(msSensorCycle):
-        print('\nDHT11\n-----')
-        sensorDHT11.printValues()
-
-        print('DHT22\n-----')
-        sensorDHT22.printValues()
+# directory of the binary log of all readings, see host/readFlashLog.py, '': no flash log.
+# A full block of 146 records is written at once, the rest every 10 minutes: a reset loses the
+# cycles of the last 10 minutes at most, 120 records at the shortest period of 5 s
+FLASH_LOG = 'log'
+flashLog = None
+if FLASH_LOG:
+    from flashLog import FlashLog
+    flashLog = FlashLog(FLASH_LOG)
+msFlushCycle = [0, 600000]
+
+# > 0: serve the last readings on this TCP port (needs a WLAN connection, e.g. from boot.py),
+# try 'echo j | nc -q 1 <ip of the board> 8266', see telemetryServer.py
+TELEMETRY_PORT = 0
+telemetry = None
+if TELEMETRY_PORT:
+    from telemetryServer import TelemetryServer
+    telemetry = TelemetryServer(LOGGED, port=TELEMETRY_PORT)
+
+# a cycle takes at most 1 s, sensors that do not fit are deferred to the next cycle
+scheduler = AdaptiveScheduler(minMs=5000, maxMs=300000, budgetMs=1000)
+for entry, sensor in registry.sensors():
+    if INSTRUMENT:
+        instrument(sensor, entry['name'])
+    if 'maxAge' in entry:
+        from readCache import CachedSensor
+        sensor = CachedSensor(sensor, maxAge=entry['maxAge'])
+    scheduler.add(entry['name'], sensor, *entry.get('args', ()), deadband=entry['deadband'])
+
+""" Blinks the builtin led while the sensors are converting """
+async def blinkLed():
+    while True:
+        led.value(0 if (time.ticks_ms() % ledPeriod < ledPulsewidth) else 1)
+        await sleepMs(10)
+
+""" Prints the pressure tendency and the Zambretti forecast once 1 h of readings is in """
+def printForecast():
+    if pressureTrend is None:
+        return
+    code = pressureTrend.forecast()
+    if code is not None:
+        print('Pressure %.1f hPa, %+.2f hPa/h over 3 h, %+.2f hPa/h over 12 h: %s' % (
+            pressureTrend.pressure(), pressureTrend.slope(1), pressureTrend.slope(2),
+            pressureTrend.forecastText(code)))
 
-        print('DS18B20\n-------')
-        sensorDS18B20.printValues(0)
-
-        print('SHT31\n-----')
-        sensorSHT31.printValues()
-
-        print('BME280\n-----')
-        sensorBME280.printValues()
+"""
+Queries the sensors whose period has elapsed, writes their values and logs
+the last values of all of them, returns the number of sensors measured
+"""
+async def queryCycle():
+    measured = await scheduler.runCycle()
+    if measured:
+        output.begin()
+        for name, sensor, values in scheduler.measured():
+            output.add(name, values)
+            if values is None and name in onBus and scheduler.failures[name] >= MISSING_AFTER:
+                registry.invalidate()   # rescan the buses at the next boot
+            if telemetry is not None:
+                telemetry.update(name, values)
+        output.write()
+        if telemetry is not None:
+            telemetry.publish()
+        if flashLog is not None:
+            last = {name: values for name, _, values in scheduler.results()}
+            flashLog.append(time.time(), *[last.get(name) for name in LOGGED])
+    return measured
+
+async def querySensors():
+    while True:
+        await queryCycle()
+        if flashLog is not None and waitIsOver(msFlushCycle):
+            flashLog.flush()
+        if waitIsOver(msStatsCycle):
+            if INSTRUMENT:
+                printStats()
+            scheduler.printRates()
+            scheduler.printBudget()
+            printForecast()
+        await sleepMs(10)
+
+async def main():
+    if telemetry is not None:
+        await telemetry.start()
+    asyncio.create_task(blinkLed())
+    await querySensors()
+
+if __name__ == '__main__':
+    asyncio.run(main())